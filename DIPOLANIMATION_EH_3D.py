@@ -1,16 +1,16 @@
 import numpy as np
-import pyvista as pv
 import math
 import os
 import shutil
 import sys
-import imageio.v2 as imageio
-import re
+from functools import partial
 
-
-if os.path.exists("DipolAnimation"):
-    shutil.rmtree("DipolAnimation")  # Vorheriges Verzeichnis löschen, falls vorhanden
-os.mkdir("DipolAnimation")  # Verzeichnis für Animation erstellen
+import ausgabe
+import dipolfeld
+import feldlinien
+import geometriecache
+import geometriedatei
+import profil
 
 save_gif = True  # Bei Bedarf auf True setzen, um GIF zu speichern
 
@@ -29,6 +29,13 @@ _Lamda_viertel = _Wellenlaenge / 4.0
 _w = 2 * np.pi * _c / _Wellenlaenge  # Kreisfrequenz
 _Periode = 100  # Anzahl Zeitschritte pro Periode
 _animation_duration = 3.0  # Animationsdauer in Sekunden für eine Periode
+_Prozesse = 1  # Anzahl Prozesse für das Rendern der Frames (1 = seriell)
+GIF_optimieren = False  # Palette/Differenzrechtecke: in 3D ~4 % größer, daher aus
+_Ausgabeformat = "gif"  # "gif", "mp4" oder "webm" (Video direkt über ffmpeg)
+_Ausgabename = "EH-field-3D"  # Name der Ausgabedatei (ohne Endung)
+_Videocodec = None  # None: libx264 (mp4) bzw. libvpx-vp9 (webm)
+_CRF = 20  # Videoqualität (kleiner = besser)
+_Pixelformat = "yuv420p"  # Pixelformat des Videos
 _T = _Wellenlaenge / _c  # Periodendauer
 _dt = _T / _Periode  # Zeitschritt
 
@@ -51,6 +58,20 @@ _Grobfaktor2 = 0.25  # Schrittweitenfaktor für Feldlinienintegration
 _ZahlDerRechenschritte = int(_Punktzahl_max / _Grobfaktor2 + 100)
 _Linienabst = 8.0  # Abstand zwischen Feldlinien
 _Linien_pro_Welle = _Wellenlaenge / 4.0 / _Linienabst
+Adaptiv_Flag = False  # Feldlinien adaptiv (Dormand-Prince) statt mit festem RK4-Schritt
+_Toleranz = 1e-3  # lokaler Fehler pro Schritt bei adaptiver Integration
+Stromfunktion_Flag = False  # Feldlinien aus der Stromfunktion (nur Hertzdipol)
+Halbperioden_Flag = True  # 2. Halbperiode aus der 1. ableiten (E(t + T/2) = -E(t))
+_Threads = 1  # Threads der Rechenstufe (Frames gleichzeitig integrieren)
+_Pixeltoleranz = 0.25  # erlaubte Abweichung beim Ausdünnen (Ausgabepixel), 0 = aus
+PNG_Flag = False  # Einzelbilder zusätzlich nach DipolAnimation/ schreiben
+Szene_Flag = True  # PyVista-Szene nur einmal aufbauen, pro Frame Geometrie ersetzen
+Cache_Flag = True  # berechnete Feldlinien in Feldcache/ ablegen und wiederverwenden
+_Cachegroesse_max = 2**28  # Cache-Obergrenze in Bytes (älteste Einträge fallen weg)
+Geometrie_Stufe = None  # "berechnen": nur Geometriedatei schreiben, "rendern": lesen
+_Geometriedatei = "EH-field-3D.geom"  # Geometrie aller Frames (Rechen-/Renderstufe)
+_Framebereich = None  # nur diese Frames rendern, z. B. range(0, 50); None = alle
+Profil_Flag = False  # Zeiten je Stufe messen, Tabelle und Chrome-Trace (.trace.json)
 
 # Parameter für magnetische Feldlinien (H-Feld) in der xy-Ebene
 _radd = [
@@ -104,94 +125,14 @@ Farbe_S5 = "#999999"
 Farbe_fieldline_pos = "#008800"  # 008800"  # grün
 Farbe_fieldline_neg = "#0000AA"  # blau
 
-print(
-    "Important: Currently this application creates a directory named 'DipolAnimation' which contains the images for each timestep. They need to be converted into a gif afterwards"
-)
-
-
-# E-Feld berechnen
-def E_berechnen(t, x, y):
-    if Hertzdipol:
-        r2 = x * x + y * y
-        r = np.sqrt(r2)
-        if r == 0:
-            return (0.0, 0.0, 0.0)
-        tt = t - r / _c
-        p = _p0 * np.cos(_w * tt)
-        pd1 = -_w * _p0 * np.sin(_w * tt)
-        cosa = y / r
-        Efy = (_w**2 * p) / (_c2 * r)
-        Ep = Efy - pd1 / (_c * r2) - p / (r2 * r)
-        Er = 3 * pd1 / (_c * r2) - Efy + 3 * p / (r2 * r)
-        Er *= cosa
-        Ex = Er * (x / r)
-        Ey = Er * cosa + Ep
-        E = np.sqrt(Ex * Ex + Ey * Ey)
-        return (Ex, Ey, E)
-    elif Stabdipol:
-        Lplus = y + _Lamda_viertel
-        Lminus = y - _Lamda_viertel
-        rplus = np.sqrt(x * x + Lplus * Lplus)
-        rminus = np.sqrt(x * x + Lminus * Lminus)
-        if rplus == 0 or rminus == 0:
-            return (0.0, 0.0, 0.0)
-        tt1 = t - rplus / _c
-        tt2 = t - rminus / _c
-        sinplus = (1.0 / rplus) * np.cos(_w * tt1)
-        sinminus = (1.0 / rminus) * np.cos(_w * tt2)
-        Ey = (sinplus + sinminus) / 40.0  # _Stabfaktor = 40
-        if x == 0:
-            Ex = 0.0
-        else:
-            Ex = -((Lplus / x * sinplus) + (Lminus / x * sinminus)) / 40.0
-        E = np.sqrt(Ex * Ex + Ey * Ey)
-        return (Ex, Ey, E)
-
-
-def H_berechnen(t, x, y):
-    """Berechnet das magnetische Feld (H-Phi-Komponente) an Punkt (x,y) zur Zeit t."""
-    H = 0.0
-    if Hertzdipol:
-        r2 = x * x + y * y
-        r = np.sqrt(r2)
-        if r == 0:
-            return 0.0
-        tt = t - r / _c
-        p = _p0 * np.cos(_w * tt)
-        pd1 = -_w * _p0 * np.sin(_w * tt)
-        H = pd1 / (_Z0 * r) + (_w * p) / (_Z0 * _c * r)
-    elif Stabdipol:
-        # Vereinfachte Berechnung für Stabdipol (nur Betrag, H in xy-Ebene)
-        r = np.sqrt(x * x + y * y)
-        if r == 0:
-            return 0.0
-        # angenommen H proportional zu current_I und ~1/r
-        current_I = _p0 * np.sin(_w * t)  # Strom im Dipol (vereinfachtes Modell)
-        H = current_I / (2 * np.pi * r)
-    return H
-
-
-def S_berechnen(t, x, y):
-    """Berechnet den Poynting-Vektor S=(Sx, Sy) und |S| in der xy-Ebene an Punkt (x,y) zur Zeit t."""
-    # In dieser Simulation: S = E x H (mit E- und H-Feldkomponenten).
-    Ex, Ey, _ = E_berechnen(t, x, y)
-    H_phi = H_berechnen(t, x, y)
-    # E-Feld liegt in r-Ebene (Ex, Ey), H-Feld steht senkrecht dazu (aus der Ebene heraus für radiales E)
-    # Poynting zeigt radial vom Dipol weg: S = E x H * ê_richtung
-    # Vereinfachung: Sx = Ey * H_phi (entspricht z-Komponente von E x H), Sy = -Ex * H_phi.
-    Sx = Ey * H_phi  # positiv nach außen (x-Richtung)
-    Sy = -Ex * H_phi  # positiv nach außen (y-Richtung)
-    S = np.sqrt(Sx * Sx + Sy * Sy)
-    return (Sx, Sy, S)
+# Feldberechnung (vektorisiert, gemeinsam für alle Skripte in dipolfeld.py)
+_Feldparameter = dict(p0=_p0, Wellenlaenge=_Wellenlaenge, Stabdipol=not Hertzdipol)
+E_berechnen = partial(dipolfeld.E_berechnen, **_Feldparameter)
+H_berechnen = partial(dipolfeld.H_berechnen_3D, **_Feldparameter)
+S_berechnen = partial(dipolfeld.S_berechnen_3D, **_Feldparameter)
 
 
 # Hilfsfunktionen für Feldlinien-Berechnung
-def F(x_val, t):
-    """Hilfsfunktion F(x) für Hertzdipol (Nullstellenbestimmung auf x-Achse)."""
-    zw = -_w * (x_val / _c - t)
-    return np.cos(zw) - (x_val * _w / _c) * np.sin(zw)
-
-
 def FSt(x_val, t):
     """Hilfsfunktion FSt(x) für Stabdipol."""
     rpm2 = np.sqrt(x_val * x_val + _Lamda_viertel * _Lamda_viertel)
@@ -201,117 +142,6 @@ def FSt(x_val, t):
     return (2 / rpm2) * np.cos(_w * tt)
 
 
-def Nullstelle(x1, x2, t, func):
-    """Bisektionsverfahren zur Nullstellensuche von func im Intervall [x1, x2]."""
-    tol = 0.001
-    max_iter = 25
-    f1 = func(x1, t)
-    f2 = func(x2, t)
-    x_mid = None
-    if f1 == 0:
-        return x1
-    if f2 == 0:
-        return x2
-    for _ in range(max_iter):
-        x_mid = (x1 + x2) / 2.0
-        f_mid = func(x_mid, t)
-        if abs(x2 - x1) <= tol or f_mid == 0:
-            break
-        if f2 * f_mid > 0:
-            # Nullstelle liegt in [x1, x_mid]
-            x2 = x_mid
-            f2 = f_mid
-        else:
-            # Nullstelle liegt in [x_mid, x2]
-            x1 = x_mid
-            f1 = f_mid
-    return x_mid if x_mid is not None else (x1 + x2) / 2.0
-
-
-# Bestimme "Grenzlinien" (Nullstellen) auf der x-Achse, die Feldlinien trennen
-Zahl_der_Extrema = 0
-_Grenzlinie = []
-
-
-def Grenzlinien_bestimmen(t):
-    global Zahl_der_Extrema, _Grenzlinie
-    _Grenzlinie = []
-    if Hertzdipol:
-        Keulenzahl = 7
-        _Groessenfaktor2_val = 2 if False else _Groessenfaktor  # Pot3D_Flag nicht aktiv
-        Schrittweite = _Lamda_viertel / 4.0
-        x1 = _Linienabst / 2.0 + 3.0  # Start etwas jenseits Nahgrenze (Nahgrenze = 3)
-        x2 = x1 + Schrittweite
-        ij = 0
-        Fensterende = False
-        while not Fensterende:
-            f1 = F(x1, t)
-            f2 = F(x2, t)
-            if f1 * f2 <= 0:
-                nullst = Nullstelle(x1, x2, t, F)
-                _Grenzlinie.append(nullst)
-                ij += 1
-                Zahl_der_Extrema = ij
-            x1 = x2
-            x2 = x2 + Schrittweite
-            if ij > 0:
-                if (
-                    _Grenzlinie[ij - 1]
-                    > _Groessenfaktor2_val * Keulenzahl * _Lamda_viertel
-                ):
-                    Fensterende = True
-            if x1 > _Groessenfaktor2_val * Keulenzahl * _Lamda_viertel:
-                Fensterende = True
-            if ij >= 100:  # Sicherheit
-                Fensterende = True
-    if Stabdipol:
-        _Grenzlinie = []
-        ij = 0
-        tt = t
-        # Keulenzahl abhängig vom Zoomfaktor
-        if _Groessenfaktor < 1:
-            Keulenzahl = 4
-        elif _Groessenfaktor == 1:
-            Keulenzahl = 5
-        elif _Groessenfaktor == 2:
-            Keulenzahl = 7
-        elif _Groessenfaktor == 4:
-            Keulenzahl = 12
-        else:
-            Keulenzahl = 7
-        for n in range(Keulenzahl):
-            # Normiere Zeitphase in [0, π/_w]
-            while tt > np.pi / _w:
-                tt -= np.pi / _w
-            aa1 = (2 * n) * _Lamda_viertel + _c * tt
-            # (Alternative Berechnung mit (2*n+1) * Lamda/4 ist auskommentiert im Original)
-            if aa1 > _Lamda_viertel:
-                val = np.sqrt(aa1 * aa1 - _Lamda_viertel * _Lamda_viertel)
-                _Grenzlinie.append(val)
-                ij += 1
-                Zahl_der_Extrema = ij
-
-
-# Erzeuge Startpositionen für Feldlinien (x-Koordinaten auf der x-Achse)
-_xLinie = []
-
-
-def LinienStarts_bestimmen():
-    global _xLinie
-    _xLinie = [0]
-    j = 1
-    for n in range(Zahl_der_Extrema - 1):
-        Linienpos = _Grenzlinie[n] - _Linienabst / 2.0
-        iii = 0
-        while (Linienpos > 3.0) and (iii < _Linien_pro_Welle):
-            _xLinie.append(Linienpos)
-            j += 1
-            iii += 1
-            Linienpos -= _Linienabst
-    _xLinie[0] = j - 1
-    _xLinie.append(666666.0)  # Endmarkierung (wird nicht genutzt)
-
-
 def H_Linien_Radien(t):
     """Berechnet alle Radien, bei denen zum Zeitpunkt t magnetische Feldlinien im
     xy-Bild dargestellt werden."""
@@ -327,47 +157,99 @@ def H_Linien_Radien(t):
     return radii
 
 
-def E_Linie_berechnen(t, x_start):
-    pts = []
-    xx = x_start
-    yy = 0.0
-    Ex0, Ey0, E0 = E_berechnen(t, xx, yy)
-    Rechenrichtung = 1 if Ey0 > 0 else -1
-    Schritt = 0
-    while True:
-        rr2 = xx * xx + yy * yy
-        if not (
-            rr2 >= 9.0 and yy >= 0.0 and Schritt < _ZahlDerRechenschritte and xx > 1.0
-        ):
-            break
-        pts.append((xx, yy))
-        xx, yy = Folgepkt(xx, yy, Rechenrichtung, t)
-        Schritt += 1
-    pts.append((xx, yy))
-    Orientierung = -1 if Rechenrichtung > 0 else 1
-    return pts, Orientierung
+# Alle Feldlinien eines Zeitpunkts berechnen (gebündeltes RK4, adaptiv oder
+# über die Stromfunktion): reine Funktion ohne globalen Zustand, daher auch aus
+# mehreren Threads gleichzeitig aufrufbar (siehe feldlinien.Frame_Geometrie)
+_Verfahren = (
+    "Stromfunktion" if Stromfunktion_Flag else "adaptiv" if Adaptiv_Flag else "RK4"
+)
+Feldlinien_integrieren = partial(
+    feldlinien.Frame_Geometrie,
+    Groessenfaktor=_Groessenfaktor,
+    Linienabst=_Linienabst,
+    Verfahren=_Verfahren,
+    Grobfaktor2=_Grobfaktor2,
+    ZahlDerRechenschritte=_ZahlDerRechenschritte,
+    Toleranz=_Toleranz,
+    **_Feldparameter,
+)
 
 
-# Runge-Kutta Folgepunkt-Berechnung entlang einer Feldlinie
-def Folgepkt(x, y, Rechenrichtung, t):
-    Ex0, Ey0, E0 = E_berechnen(t, x, y)
-    if E0 == 0:
-        return (x, y)
-    d = _Grobfaktor2 / E0 * Rechenrichtung
-    dx1 = Ex0 * d
-    dy1 = Ey0 * d
-    Ex1, Ey1, E1 = E_berechnen(t, x + dx1 / 2.0, y + dy1 / 2.0)
-    dx2 = Ex1 * d
-    dy2 = Ey1 * d
-    Ex2, Ey2, E2 = E_berechnen(t, x + dx2 / 2.0, y + dy2 / 2.0)
-    dx3 = Ex2 * d
-    dy3 = Ey2 * d
-    Ex3, Ey3, E3 = E_berechnen(t, x + dx3, y + dy3)
-    dx4 = Ex3 * d
-    dy4 = Ey3 * d
-    x_new = x + (dx1 + 2 * dx2 + 2 * dx3 + dx4) / 6.0
-    y_new = y + (dy1 + 2 * dy2 + 2 * dy3 + dy4) / 6.0
-    return (x_new, y_new)
+def Feldlinien_geometrie(t, frame):
+    """Unausgedünnte Geometrie von ``frame`` (Zeitpunkt t), aus der
+    Geometriedatei, dem Geometrie-Cache oder neu integriert. Ohne globalen
+    Zustand, darf also aus mehreren Threads aufgerufen werden."""
+    if _Geometrie_Quelle is not None:
+        return _Geometrie_Quelle.frame(frame)
+    return Feldlinien_integrieren(t, cache=_Geometrie_Cache_E, frame=frame)
+
+
+def Feldlinien_berechnen(t, frame, Toleranz=0.0):
+    """Feldlinien von ``frame`` (Zeitpunkt t), ausgedünnt bis auf ``Toleranz``
+    in Simulationseinheiten."""
+    geometrie = Feldlinien_geometrie(t, frame)
+    with profil.Abschnitt("thinning"):
+        linien = feldlinien.Linien_vereinfachen(
+            geometrie["Linien"], Toleranz, _Punktstatistik
+        )
+    return linien, geometrie["Orientierungen"]
+
+
+def H_Radien(frame):
+    """Radien der H-Feldlinien von ``frame`` (aus der Geometriedatei oder neu;
+    schneller neu berechnet als aus dem Geometrie-Cache geladen)."""
+    if _Geometrie_Quelle is not None:
+        return _Geometrie_Quelle.frame(frame)["Radien"]
+    return H_Linien_Radien(frame * _dt)
+
+
+# Parameter, von denen Feldlinien bzw. H-Radien abhängen (Schlüssel des
+# Geometrie-Caches für die Feldlinien und Prüfung der Geometriedatei)
+_Cacheparameter_E = dict(
+    Inhalt="E-Linien",
+    p0=_p0,
+    Wellenlaenge=_Wellenlaenge,
+    Periode=_Periode,
+    Groessenfaktor=_Groessenfaktor,
+    Grobfaktor2=_Grobfaktor2,
+    Punktzahl_max=_Punktzahl_max,
+    Linienabst=_Linienabst,
+    Hertzdipol=Hertzdipol,
+    Stabdipol=Stabdipol,
+    Verfahren=_Verfahren,
+    Toleranz=_Toleranz if Adaptiv_Flag and not Stromfunktion_Flag else None,
+)
+_Cacheparameter_H = dict(
+    Inhalt="H-Radien",
+    Wellenlaenge=_Wellenlaenge,
+    Periode=_Periode,
+    Groessenfaktor=_Groessenfaktor,
+    radd=_radd,
+)
+_Geometrie_Cache_E = (
+    geometriecache.Geometrie_Cache(
+        # Linien je Startpunkt (außer Stromfunktion): alle Zoomstufen teilen sich
+        # einen Eintrag, der Groessenfaktor wählt nur die Startpunkte aus
+        dict(
+            _Cacheparameter_E,
+            Groessenfaktor=_Groessenfaktor if Stromfunktion_Flag else None,
+        ),
+        Groesse_max=_Cachegroesse_max,
+    )
+    if Cache_Flag
+    else None
+)
+# Renderstufe: Geometrie aller Frames aus der Datei der Rechenstufe
+_Geometrie_Quelle = (
+    geometriedatei.Geometrie_Datei(
+        _Geometriedatei, [_Cacheparameter_E, _Cacheparameter_H]
+    )
+    if Geometrie_Stufe == "rendern"
+    else None
+)
+# Geometrie der ersten Halbperiode (für Halbperioden_Flag)
+_Halbperioden_Cache = {} if Halbperioden_Flag else None
+_Punktstatistik = {}  # Punkte der Feldlinien vor/nach dem Ausdünnen
 
 
 def E_Linie_berechnen2(t, x_start):
@@ -413,248 +295,391 @@ def progress_bar(current, total, length=40):
     sys.stdout.flush()
 
 
-for frame in range(int(_Periode)):
-    # Initiale Berechnungen für t = 0
-    _t = (frame) * _dt  # 0.0  # aktuelle Zeit
-    progress_bar(frame + 1, _Periode)
-    Grenzlinien_bestimmen(_t)
-    LinienStarts_bestimmen()
-
-    # Feldlinien (nur obere Halbebene berechnen, Rest durch Spiegelung)
-    field_lines_data = []
-    field_lines_orient = []
-    for i in range(1, int(_xLinie[0]) + 1):
-        pts, orient = E_Linie_berechnen(_t, _xLinie[i])
-        field_lines_data.append(np.array(pts))
-        field_lines_orient.append(orient)
-
-    # Pfeil-Gitter für Energiestrom (nur 1. Quadrant berechnen, Rest später spiegeln)
-    xOff = 10.0  # Startversatz auf x-Achse
-    x_spacing = _xAbst / _Horizontalfaktor
-    y_spacing = _yAbst / _Horizontalfaktor
-    # Achsenbereich:
-    x_max = _Wellenlaenge * _Groessenfaktor
-    y_max = _Wellenlaenge * _Groessenfaktor
-    xGrenze = int(round(x_max / (x_spacing)))
-    yGrenze = int(round(y_max / (y_spacing)))
-    arrow_quadrant_pts = []  # (X, Y) Punkte im 1. Quadranten
-    arrow_quadrant_vecs = []  # (Sx, Sy) Werte im 1. Quadranten
-    arrow_quadrant_vals = []  # |S| Werte im 1. Quadranten
-    for jj in range(yGrenze):
-        for ii in range(xGrenze):
-            X = xOff + ii * x_spacing
-            Y = jj * y_spacing
-            Sx, Sy, S = S_berechnen(_t, X, Y)
-            arrow_quadrant_pts.append((X, Y))
-            arrow_quadrant_vecs.append((Sx, Sy))
-            arrow_quadrant_vals.append(S)
-
-    # Aufbau der PyVista-Szene
-    plotter = pv.Plotter(off_screen=True)
-    plotter.background_color = "white"
-    plotter.enable_lightkit(True)  # Beleuchtung für bessere 3D-Wahrnehmung
-    plotter.hide_axes()
-
-    # Kamera-Einstellungen für optimale 3D-Ansicht
-    radius = (
-        _Groessenfaktor * _Wellenlaenge * 1.5
-    )  # Größerer Kameraabstand für besseren Überblick
-    elev = math.radians(35.0)  # Steilerer Blickwinkel
-    azim = math.radians(60.0)  # Anderer Azimut für bessere Sicht auf beide Ebenen
-    cam_x = radius * math.cos(elev) * math.cos(azim)
-    cam_y = radius * math.cos(elev) * math.sin(azim)
-    cam_z = radius * math.sin(elev)
-    plotter.camera_position = [(cam_x, cam_y, cam_z), (0, 0, 0), (0, 0, 1)]
-
-    # Anti-Aliasing und Rendering-Qualität verbessern
-    plotter.render_window.SetMultiSamples(8)  # Anti-Aliasing
-    plotter.renderer.SetUseDepthPeeling(True)  # Bessere Transparenz-Darstellung
-    plotter.renderer.SetMaximumNumberOfPeels(8)
-    plotter.renderer.SetOcclusionRatio(0.0)
-
-    # Kamerasteuerung und Interaktivität verbessern
-    plotter.enable_3_lights()  # Bessere 3D-Beleuchtung
-    plotter.camera.zoom(0.8)  # Etwas herauszoomen für besseren Überblick
-    plotter.show_axes_all()  # Zeige Orientierungsachsen in der Ecke
-
-    # Laufzeitverhalten und Animation optimieren
-    plotter.render_window.SetDesiredUpdateRate(30.0)  # 30 FPS anstreben
-    plotter.enable_depth_peeling(10)  # Verbesserte Transparenzdarstellung
-    plotter.enable_anti_aliasing()  # Kantenglättung aktivieren
-
-    # Dipolstab und Ladungs-Markierungen
-    if Hertzdipol:
-        dipole_len = _Lamda_viertel / 8.0  # kurze Dipollänge
-    else:
-        dipole_len = _Lamda_viertel  # längere Stabdipollänge
-    # Dipol-Stab (Linie entlang z-Achse)
-    dipolarrow = False
-    if dipolarrow:
-        arrow_length = (_Lamda_viertel) * (
-            -np.sin(_w * _t + 1 / 10)
-        )  # Maximale Länge des Pfeils
-        dipol_line = pv.Arrow(
-            start=(0, 0, -arrow_length / 2),
-            direction=(0, 0, arrow_length),
-            scale=arrow_length,
-            tip_length=0.2,
-            shaft_radius=0.05,
-        )
-        plotter.add_mesh(
-            dipol_line,
-            color="black",
-            name="dipol_arrow",
-            line_width=15,
-        )
-    else:
-        dipol_line = pv.Line(
-            pointa=(0, 0, -dipole_len / 2), pointb=(0, 0, dipole_len / 2)
-        )
-        plotter.add_mesh(dipol_line, color="black", line_width=5, name="dipol_line")
-
-    # Plus/Minus-Kugeln an den Dipolenden
-    plus_color = "red"
-    minus_color = "blue"
-    # Kugelradius relativ klein wählen
-    sphere_radius = dipole_len * 0.6
-    sphere_top = pv.Sphere(center=(0, 0, dipole_len / 2), radius=sphere_radius)
-    sphere_bottom = pv.Sphere(center=(0, 0, -dipole_len / 2), radius=sphere_radius)
-    sphere_top_actor = plotter.add_mesh(sphere_top, color=plus_color, name="plus_mark")
-    sphere_bottom_actor = plotter.add_mesh(
-        sphere_bottom, color=minus_color, name="minus_mark"
+def Geometrie_Frames():
+    """Unausgedünnte Feldlinien und H-Radien aller Frames der Periode (für die
+    Rechenstufe)."""
+    geometrien = feldlinien.Frames_Geometrie(
+        lambda frame: Feldlinien_geometrie(frame * _dt, frame),
+        int(_Periode),
+        _Threads,
+        Halbperioden_Flag,
     )
+    for frame, geometrie in enumerate(geometrien):
+        progress_bar(frame + 1, _Periode)
+        yield dict(geometrie, Radien=H_Radien(frame))
+
+
+if __name__ == "__main__":
+    # Grafik erst beim Ausführen laden: Importiert man das Skript (z. B. für
+    # die Rechenfunktionen), bleibt es bei NumPy und den Hilfsmodulen
+    import pyvista as pv
+
+    if PNG_Flag:
+        print(
+            "Important: This application creates a directory named 'DipolAnimation' which contains the images for each timestep."
+        )
+        if os.path.exists("DipolAnimation"):
+            shutil.rmtree("DipolAnimation")  # Vorheriges Verzeichnis löschen
+        os.mkdir("DipolAnimation")  # Verzeichnis für Einzelbilder erstellen
+
+    # Zeitmessung je Stufe (Profil_Flag), Bericht und Trace am Ende
+    if Profil_Flag:
+        profil.aktivieren()
 
-    # Feldlinien (E-Feld) darstellen
-    field_line_polys = []
-    field_line_actors = []
-    if E_Feldlinien_Flag:
-        for pts, orient in zip(field_lines_data, field_lines_orient):
-            col = Farbe_fieldline_pos if orient > 0 else Farbe_fieldline_neg
-            X = pts[:, 0]
-            Z = pts[:, 1]
-            zeros = np.zeros_like(X)
-            # Hauptfeldlinie (oben rechts)
-            poly_main = pv.lines_from_points(np.column_stack((X, zeros, Z)))
-            # Links gespiegelt (oben links)
-            poly_left = pv.lines_from_points(np.column_stack((-X, zeros, Z)))
-            # Unten gespiegelt (unten rechts)
-            poly_bottom = pv.lines_from_points(np.column_stack((X, zeros, -Z)))
-            # Unten-links gespiegelt
-            poly_bottom_left = pv.lines_from_points(np.column_stack((-X, zeros, -Z)))
-            # Alle vier Linien hinzufügen
-            field_line_polys.extend(
-                [poly_main, poly_left, poly_bottom, poly_bottom_left]
+    # Dipol-Stab als (zeitabhängiger) Pfeil statt als Linie darstellen
+    dipolarrow = False
+
+    def Dipol_zeichnen(plotter, t):
+        """Zeichnet Dipolstab und Ladungs-Markierungen (nur der Pfeil hängt von
+        t ab)."""
+        if Hertzdipol:
+            dipole_len = _Lamda_viertel / 8.0  # kurze Dipollänge
+        else:
+            dipole_len = _Lamda_viertel  # längere Stabdipollänge
+        # Dipol-Stab (Linie entlang z-Achse)
+        if dipolarrow:
+            arrow_length = (_Lamda_viertel) * (
+                -np.sin(_w * t + 1 / 10)
+            )  # Maximale Länge des Pfeils
+            dipol_line = pv.Arrow(
+                start=(0, 0, -arrow_length / 2),
+                direction=(0, 0, arrow_length),
+                scale=arrow_length,
+                tip_length=0.2,
+                shaft_radius=0.05,
             )
-            field_line_actors.extend(
-                [
-                    plotter.add_mesh(poly_main, color=col, line_width=5),
-                    plotter.add_mesh(poly_left, color=col, line_width=5),
-                    plotter.add_mesh(poly_bottom, color=col, line_width=5),
-                    plotter.add_mesh(poly_bottom_left, color=col, line_width=5),
-                ]
+            plotter.add_mesh(
+                dipol_line,
+                color="black",
+                name="dipol_arrow",
+                line_width=15,
             )
+        else:
+            dipol_line = pv.Line(
+                pointa=(0, 0, -dipole_len / 2), pointb=(0, 0, dipole_len / 2)
+            )
+            plotter.add_mesh(dipol_line, color="black", line_width=5, name="dipol_line")
+
+        # Plus/Minus-Kugeln an den Dipolenden
+        plus_color = "red"
+        minus_color = "blue"
+        # Kugelradius relativ klein wählen
+        sphere_radius = dipole_len * 0.6
+        sphere_top = pv.Sphere(center=(0, 0, dipole_len / 2), radius=sphere_radius)
+        sphere_bottom = pv.Sphere(center=(0, 0, -dipole_len / 2), radius=sphere_radius)
+        plotter.add_mesh(sphere_top, color=plus_color, name="plus_mark")
+        plotter.add_mesh(sphere_bottom, color=minus_color, name="minus_mark")
+
+    def Pixelgroesse_3D(plotter, Abstand):
+        """Größe eines Bildpixels (Simulationseinheiten) im ``Abstand`` vor der
+        Kamera."""
+        hoehe = 2 * Abstand * math.tan(math.radians(plotter.camera.view_angle) / 2)
+        return hoehe / plotter.window_size[1]
+
+    def Szene_aufbauen(t):
+        """Erzeugt Plotter, Kamera, Beleuchtung und Dipol; die Feldlinien werden
+        erst von ``Szene_aktualisieren`` eingesetzt."""
+        plotter = pv.Plotter(off_screen=True)
+        plotter.background_color = "white"
+        plotter.enable_lightkit(True)  # Beleuchtung für bessere 3D-Wahrnehmung
+        plotter.hide_axes()
+
+        # Kamera-Einstellungen für optimale 3D-Ansicht
+        radius = (
+            _Groessenfaktor * _Wellenlaenge * 1.5
+        )  # Größerer Kameraabstand für besseren Überblick
+        elev = math.radians(35.0)  # Steilerer Blickwinkel
+        azim = math.radians(60.0)  # Anderer Azimut für bessere Sicht auf beide Ebenen
+        cam_x = radius * math.cos(elev) * math.cos(azim)
+        cam_y = radius * math.cos(elev) * math.sin(azim)
+        cam_z = radius * math.sin(elev)
+        plotter.camera_position = [(cam_x, cam_y, cam_z), (0, 0, 0), (0, 0, 1)]
+
+        # Anti-Aliasing und Rendering-Qualität verbessern
+        plotter.render_window.SetMultiSamples(8)  # Anti-Aliasing
+        plotter.renderer.SetUseDepthPeeling(True)  # Bessere Transparenz-Darstellung
+        plotter.renderer.SetMaximumNumberOfPeels(8)
+        plotter.renderer.SetOcclusionRatio(0.0)
+
+        # Kamerasteuerung und Interaktivität verbessern
+        plotter.enable_3_lights()  # Bessere 3D-Beleuchtung
+        plotter.camera.zoom(0.8)  # Etwas herauszoomen für besseren Überblick
+        plotter.show_axes_all()  # Zeige Orientierungsachsen in der Ecke
+
+        # Laufzeitverhalten und Animation optimieren
+        plotter.render_window.SetDesiredUpdateRate(30.0)  # 30 FPS anstreben
+        plotter.enable_depth_peeling(10)  # Verbesserte Transparenzdarstellung
+        plotter.enable_anti_aliasing()  # Kantenglättung aktivieren
+
+        Dipol_zeichnen(plotter, t)
+
+        # Pfeil-Quell-Geometrie für die Energiestrom-Glyphs
+        arrow_source = pv.Arrow(
+            start=(0, 0, 0),
+            direction=(1, 0, 0),
+            tip_length=0.5,
+            tip_radius=0.2,
+            shaft_radius=0.04,
+        )
+        # Ausdünnen der Feldlinien nach dem Pixel am nächsten möglichen Linienpunkt
+        naechster = plotter.camera.distance - _Wellenlaenge * _Groessenfaktor
+        return dict(
+            plotter=plotter,
+            Pfeilquelle=arrow_source,
+            Pfeile=None,
+            Toleranz=_Pixeltoleranz * Pixelgroesse_3D(plotter, naechster),
+        )
 
-    # Magnetfeldlinien (H-Feld) als rote Kreise in der xy-Ebene
-    H_line_actors = []
-    H_current_radii = []
-    if H_Feldlinien_Flag:
-        radii_list = H_Linien_Radien(_t)
-        for r in radii_list:
-            theta = np.linspace(0, 2 * np.pi, 73)
-            Xc = r * np.cos(theta)
-            Yc = r * np.sin(theta)
-            Zc = np.zeros_like(Xc)
-            circle = pv.lines_from_points(np.column_stack((Xc, Yc, Zc)), close=True)
-            # Magnetfeldlinien in orange-rot mit Transparenz für bessere 3D-Wahrnehmung
-            H_line_actors.append(
-                plotter.add_mesh(
-                    circle,
-                    color="#FF4500",  # Orange-Rot opacity=0.7,  # Leichte Transparenz
-                    line_width=5,  # Dickere Linien
-                    render_lines_as_tubes=True,  # 3D-Röhren statt flacher Linien
-                )
+    def Linien_setzen(szene, ebene, linien, farbe, **mesh_kwargs):
+        """Schreibt alle ``linien`` (Punkt-Arrays) als Polylinien-Zellen in das eine
+        PolyData der Ebene; die Farbe kommt aus dem Zell-Skalar ``Farbe``.
+
+        Beim ersten Aufruf wird Dataset und Actor angelegt, danach nur noch
+        Punkte, Verbindungen und Farben ersetzt. Leere Ebenen werden ausgeblendet.
+        """
+        poly, actor = szene.get(ebene, (None, None))
+        if not linien:
+            if actor is not None:
+                actor.visibility = False
+            return
+        # Flache Offset-Arrays: Linie k belegt die Punkte offsets[k]:offsets[k + 1]
+        offsets = np.zeros(len(linien) + 1, dtype=pv.ID_TYPE)
+        np.cumsum([len(punkte) for punkte in linien], out=offsets[1:])
+        if poly is None:
+            poly = pv.PolyData()
+        poly.points = np.concatenate(linien)
+        poly.lines = pv.CellArray.from_arrays(
+            offsets, np.arange(offsets[-1], dtype=pv.ID_TYPE)
+        )
+        poly.cell_data["Farbe"] = np.tile(
+            np.array(pv.Color(farbe).int_rgb, dtype=np.uint8), (len(linien), 1)
+        )
+        if actor is None:
+            actor = szene["plotter"].add_mesh(
+                poly, scalars="Farbe", rgb=True, preference="cell", **mesh_kwargs
             )
-        H_current_radii = radii_list.copy()
-
-    # Energiestrom-Pfeile (Poynting-Vektor) via Glyphs
-    pfeil_urspruenge = []  # Liste 3D-Punkte aller Pfeilursprünge (alle Quadranten)
-    pfeil_richtungen = []  # zugehörige 3D-Richtungsvektoren (werden skaliert berechnet)
-    pfeil_magnitude = []  # Betrag des Poynting-Vektors an den Punkten
-    # Spiegele Punkte und initiale Vektoren in alle vier Quadranten
-    for (X, Y), (Sx, Sy), S in zip(
-        arrow_quadrant_pts, arrow_quadrant_vecs, arrow_quadrant_vals
+            szene[ebene] = (poly, actor)
+        actor.visibility = True
+
+    def Szene_aktualisieren(
+        szene,
+        t,
+        field_lines_data,
+        field_lines_orient,
+        H_radien,
+        arrow_X,
+        arrow_Y,
+        arrow_S,
     ):
-        # Punkt rechts oben
-        pfeil_urspruenge.append([X, Y, 0.0])
-        pfeil_richtungen.append([0.0, 0.0, 0.0])  # Platzhalter, wird später gesetzt
-        pfeil_magnitude.append(S)
-        # Punkt links oben
-        pfeil_urspruenge.append([-X, Y, 0.0])
-        pfeil_richtungen.append([0.0, 0.0, 0.0])
-        pfeil_magnitude.append(S)
-        if Y != 0:
-            # Punkt rechts unten
-            pfeil_urspruenge.append([X, -Y, 0.0])
-            pfeil_richtungen.append([0.0, 0.0, 0.0])
-            pfeil_magnitude.append(S)
-            # Punkt links unten
-            pfeil_urspruenge.append([-X, -Y, 0.0])
-            pfeil_richtungen.append([0.0, 0.0, 0.0])
-            pfeil_magnitude.append(S)
-
-    pfeil_urspruenge = np.array(pfeil_urspruenge)
-    pfeil_richtungen = np.array(pfeil_richtungen)
-    pfeil_magnitude = np.array(pfeil_magnitude)
-
-    # PolyData für Pfeil-Glyphs erstellen
-    pfeil_polydata = pv.PolyData(pfeil_urspruenge)
-    # Wir definieren zwei Datenarrays 'vectors' (Richtungsvektor) und 'mag' (Skalierung) auf den Punkten
-    pfeil_polydata["vectors"] = pfeil_richtungen
-    pfeil_polydata["mag"] = np.zeros_like(
-        pfeil_magnitude
-    )  # initial noch null, wird in Animation gesetzt
-    # Erzeuge einmal einen Pfeil-Quell-Graph (Geometrie) mit gewünschten Proportionen
-    arrow_source = pv.Arrow(
-        start=(0, 0, 0),
-        direction=(1, 0, 0),
-        tip_length=0.5,
-        tip_radius=0.2,
-        shaft_radius=0.04,
-    )
-    # Initiales Glyph-Objekt (wird aber direkt in Animation erstes Frame aktualisiert)
-    pfeil_actor = None
-    if Energiestrom_Flag:
-        # Glyphs generieren für Pfeile
-        initial_glyphs = pfeil_polydata.glyph(
-            orient="vectors", scale="mag", factor=1.0, geom=arrow_source
+        """Überträgt die Feldlinien und Pfeile eines Frames in die Szene."""
+        if dipolarrow:
+            Dipol_zeichnen(szene["plotter"], t)  # Pfeillänge hängt von t ab
+
+        # Feldlinien (E-Feld), nach Orientierung getrennt in je ein PolyData
+        # und in alle vier Quadranten gespiegelt
+        for orientierung, ebene, farbe in (
+            (1, "E_pos", Farbe_fieldline_pos),
+            (-1, "E_neg", Farbe_fieldline_neg),
+        ):
+            E_Linien = []
+            if E_Feldlinien_Flag:
+                xz = [
+                    pts
+                    for pts, orient in zip(field_lines_data, field_lines_orient)
+                    if (orient > 0) == (orientierung > 0)
+                ]
+                # oben rechts, oben links, unten rechts, unten links
+                for sx, sz in ((1, 1), (-1, 1), (1, -1), (-1, -1)):
+                    E_Linien.extend(
+                        np.column_stack(
+                            (sx * pts[:, 0], np.zeros(len(pts)), sz * pts[:, 1])
+                        )
+                        for pts in xz
+                    )
+            Linien_setzen(szene, ebene, E_Linien, farbe, line_width=5)
+
+        # Magnetfeldlinien (H-Feld) als rote Kreise in der xy-Ebene
+        H_Linien = []
+        if H_Feldlinien_Flag:
+            theta = np.linspace(0, 2 * np.pi, 73)  # erster = letzter Punkt
+            kreis = np.column_stack(
+                (np.cos(theta), np.sin(theta), np.zeros_like(theta))
+            )
+            H_Linien = [r * kreis for r in H_radien]
+        # Magnetfeldlinien in orange-rot für bessere 3D-Wahrnehmung
+        Linien_setzen(
+            szene,
+            "H",
+            H_Linien,
+            "#FF4500",
+            line_width=5,  # Dickere Linien
+            render_lines_as_tubes=True,  # 3D-Röhren statt flacher Linien
         )
-        # Farben ggf. initial einfach alle grau (werden im Update gleich gesetzt)
-        pfeil_actor = plotter.add_mesh(initial_glyphs, color="#999999")
-
-    # plotter.reset_camera()
-    # Screenshot des Frames erzeugen und zum GIF hinzufügen
-    plotter.render()
-    plotter.reset_camera_clipping_range()
-    # plotter.save_graphic(f"DIPOL{frame}.pdf")
-    plotter.screenshot(
-        filename=f"./DipolAnimation/DIPOL{frame}.png",
-    )
-    plotter.close()
-
-
-# Natural sort key: extract numeric part from filename
-def numeric_key(filename):
-    match = re.search(r"(\d+)", filename)
-    return int(match.group(1)) if match else -1
 
+        # Energiestrom-Pfeile (Poynting-Vektor) via Glyphs
+        if Energiestrom_Flag:
+            # Spiegele Punkte und initiale Vektoren in alle vier Quadranten
+            pfeil_X, pfeil_Y, _, _ = dipolfeld.Quadranten_spiegeln(
+                arrow_X, arrow_Y, 0.0, 0.0
+            )
+            # 3D-Punkte aller Pfeilursprünge (alle Quadranten)
+            pfeil_urspruenge = np.column_stack(
+                (pfeil_X, pfeil_Y, np.zeros_like(pfeil_X))
+            )
+            # Betrag des Poynting-Vektors an den Punkten
+            pfeil_magnitude = np.repeat(arrow_S, np.where(arrow_Y != 0, 4, 2))
+
+            # PolyData für Pfeil-Glyphs mit 'vectors' (Richtung) und 'mag' (Skalierung)
+            pfeil_polydata = pv.PolyData(pfeil_urspruenge)
+            pfeil_polydata["vectors"] = np.zeros_like(pfeil_urspruenge)
+            pfeil_polydata["mag"] = np.zeros_like(pfeil_magnitude)
+            glyphs = pfeil_polydata.glyph(
+                orient="vectors", scale="mag", factor=1.0, geom=szene["Pfeilquelle"]
+            )
+            if szene["Pfeile"] is None:
+                szene["Pfeile"] = glyphs
+                # Farben einfach alle grau
+                szene["plotter"].add_mesh(glyphs, color="#999999")
+            else:
+                szene["Pfeile"].copy_from(glyphs)
+
+    # Persistente Szene (Szene_Flag), wird pro Prozess beim ersten Frame aufgebaut
+    _Szene = None
+
+    def Frame_rendern(frame):
+        """Rendert ``frame`` und gibt das Bild als RGB-Array zurück (mit PNG_Flag
+        zusätzlich als PNG in DipolAnimation/)."""
+        global _Szene
+        with profil.Abschnitt("frame", frame=frame):
+            # Initiale Berechnungen für t = 0
+            _t = (frame) * _dt  # 0.0  # aktuelle Zeit
+            progress_bar(frame + 1, _Periode)
+
+            # PyVista-Szene: einmal aufbauen und weiterverwenden oder pro Frame neu
+            if Szene_Flag and _Szene is not None:
+                szene = _Szene
+            else:
+                szene = Szene_aufbauen(_t)
+
+            # Feldlinien (nur obere Halbebene berechnen, Rest durch Spiegelung;
+            # in der zweiten Halbperiode aus der ersten übernommen)
+            field_lines_data, field_lines_orient = feldlinien.Frame_Feldlinien(
+                frame,
+                int(_Periode),
+                partial(Feldlinien_berechnen, _t, frame, szene["Toleranz"]),
+                _Halbperioden_Cache,
+            )
 
-images = []
-file_list = sorted(
-    [f for f in os.listdir("DipolAnimation") if f.endswith(".png")], key=numeric_key
-)
-for filename in file_list:
-    images.append(imageio.imread(os.path.join("DipolAnimation", filename)))
+            # Pfeil-Gitter für Energiestrom (nur 1. Quadrant berechnen, Rest spiegeln)
+            xOff = 10.0  # Startversatz auf x-Achse
+            x_spacing = _xAbst / _Horizontalfaktor
+            y_spacing = _yAbst / _Horizontalfaktor
+            # Achsenbereich:
+            x_max = _Wellenlaenge * _Groessenfaktor
+            y_max = _Wellenlaenge * _Groessenfaktor
+            xGrenze = int(round(x_max / (x_spacing)))
+            yGrenze = int(round(y_max / (y_spacing)))
+            # Ganzes Gitter im 1. Quadranten in einem Aufruf berechnen
+            arrow_X, arrow_Y = (
+                g.ravel()
+                for g in np.meshgrid(
+                    xOff + np.arange(xGrenze) * x_spacing,
+                    np.arange(yGrenze) * y_spacing,
+                )
+            )
+            with profil.Abschnitt("Poynting grid"):
+                arrow_Sx, arrow_Sy, arrow_S = S_berechnen(_t, arrow_X, arrow_Y)
+
+            with profil.Abschnitt("H radii"):
+                H_radien = H_Radien(frame) if H_Feldlinien_Flag else []
+            with profil.Abschnitt("artist update"):
+                Szene_aktualisieren(
+                    szene,
+                    _t,
+                    field_lines_data,
+                    field_lines_orient,
+                    H_radien,
+                    arrow_X,
+                    arrow_Y,
+                    arrow_S,
+                )
 
-imageio.mimsave(
-    "EH-field-3D.gif", images, fps=int(round(_Periode / _animation_duration)), loop=0
-)
+            # Screenshot des Frames erzeugen
+            plotter = szene["plotter"]
+            with profil.Abschnitt("rasterization"):
+                plotter.render()
+                plotter.reset_camera_clipping_range()
+            # plotter.save_graphic(f"DIPOL{frame}.pdf")
+            with profil.Abschnitt("screenshot"):
+                bild = plotter.screenshot(
+                    filename=f"./DipolAnimation/DIPOL{frame}.png" if PNG_Flag else None,
+                    return_img=True,
+                )
+            if Szene_Flag:
+                _Szene = szene
+            else:
+                plotter.close()
+        profil.Speicher_notieren()
+        return bild
+
+    if Geometrie_Stufe == "berechnen":
+        # Rechenstufe: Geometrie in eine Datei schreiben, nichts rendern
+        anzahl = geometriedatei.Geometrie_schreiben(
+            _Geometriedatei, Geometrie_Frames(), [_Cacheparameter_E, _Cacheparameter_H]
+        )
+        print(f"\nGeometry of {anzahl} frames written to {_Geometriedatei}")
+        if Profil_Flag:
+            profil.Abschluss(_Ausgabename + ".trace.json")
+        sys.exit()
+
+    # Zu rendernde Frames: ganze Periode oder nur _Framebereich
+    _Frames = range(int(_Periode)) if _Framebereich is None else _Framebereich
+
+    def Bereich_rendern(i):
+        """Rendert den i-ten der zu rendernden Frames."""
+        return Frame_rendern(_Frames[i])
+
+    # Frames in Reihenfolge direkt in den Encoder schreiben (konstanter Speicher)
+    if _Prozesse > 1:
+        # Frames auf mehrere Prozesse verteilen (jeder mit eigenem Plotter)
+        bilder = ausgabe.Frames_parallel_iterieren(
+            Bereich_rendern,
+            len(_Frames),
+            _Prozesse,
+            Halbperiode=Halbperioden_Flag and _Framebereich is None,
+        )
+    else:
+        bilder = map(Frame_rendern, _Frames)
+    _Dateiname = _Ausgabename + "." + _Ausgabeformat
+    if _Ausgabeformat == "gif":
+        strom = ausgabe.GIF_Strom(
+            _Dateiname,
+            fps=int(round(_Periode / _animation_duration)),
+            optimieren=GIF_optimieren,
+        )
+    else:
+        strom = ausgabe.Video_Strom(
+            _Dateiname,
+            fps=int(round(_Periode / _animation_duration)),
+            codec=_Videocodec,
+            crf=_CRF,
+            pix_fmt=_Pixelformat,
+        )
+    with strom:
+        for bild in bilder:
+            strom.anhaengen(bild)
+    ausgabe.Ausgabe_Bericht(_Dateiname, strom.anzahl, strom.kodierzeit)
+    if _Prozesse == 1 and _Punktstatistik.get("Punkte_vorher"):
+        print(
+            f"Field line vertices: {_Punktstatistik['Punkte_vorher']} -> "
+            f"{_Punktstatistik['Punkte_nachher']}"
+        )
+    if _Prozesse == 1 and Cache_Flag:
+        print(
+            f"Geometry cache: {_Geometrie_Cache_E.treffer} hits, "
+            f"{_Geometrie_Cache_E.fehltreffer} misses"
+        )
+    if Profil_Flag:
+        profil.Abschluss(_Ausgabename + ".trace.json")
+    if _Szene is not None:
+        _Szene["plotter"].close()
@@ -1,13 +1,11 @@
-import matplotlib
 import numpy as np
-import matplotlib.pyplot as plt
 import sys
-from matplotlib.animation import FuncAnimation
-from matplotlib.colors import ListedColormap, BoundaryNorm
-from mpl_toolkits.mplot3d import Axes3D
-from matplotlib.transforms import Bbox
-from matplotlib.patches import Circle
+from functools import partial
 
+import ausgabe
+import dipolfeld
+import geometriedatei
+import profil
 
 # Physikalische Konstanten und Parameter
 _c = 299792458  # Lichtgeschwindigkeit
@@ -25,6 +23,21 @@ _Periode = 100  # Anzahl Zeitschritte pro Periode
 _T = _Wellenlaenge / _c  # Periodendauer
 _dt = _T / _Periode  # Zeitschritt
 _animation_duration = 3  # Dauer der Animation in Sekunden
+_dpi = 300  # Auflösung der gespeicherten Frames
+_Prozesse = 1  # Anzahl Prozesse für das Rendern der Frames (1 = seriell)
+GIF_optimieren = True  # gemeinsame Palette, nur geänderte Bereiche, keine Doppel-Frames
+_Ausgabeformat = "gif"  # "gif", "mp4" oder "webm" (Video direkt über ffmpeg)
+_Ausgabename = "H-field_2D"  # Name der Ausgabedatei (ohne Endung)
+_Videocodec = None  # None: libx264 (mp4) bzw. libvpx-vp9 (webm)
+_CRF = 20  # Videoqualität (kleiner = besser)
+_Pixelformat = "yuv420p"  # Pixelformat des Videos
+Render_Benchmark = False  # nur Renderzeiten messen (savefig vs. Agg-Puffer)
+Hintergrund_Flag = True  # Achsen, Beschriftung und Titel nur einmal rastern
+Geometrie_Stufe = None  # "berechnen": nur Geometriedatei schreiben, "rendern": lesen
+_Geometriedatei = "H-field-2D.geom"  # Geometrie aller Frames (Rechen-/Renderstufe)
+_Framebereich = None  # nur diese Frames rendern, z. B. range(0, 50); None = alle
+Profil_Flag = False  # Zeiten je Stufe messen, Tabelle und Chrome-Trace (.trace.json)
+Anzeige_Flag = False  # nach dem Speichern im Fenster abspielen (plt.show)
 
 # Darstellungs- und Steuerungs-Flags
 Hertzdipol = True
@@ -98,97 +111,15 @@ Farbe_fieldline_pos = "#008800"  # grün (Linie von -Pol zu +Pol, Orientierung >
 Farbe_fieldline_neg = "#0000AA"  # blau (Linie von +Pol zu -Pol, Orientierung < 0)
 
 
-# E-Feld berechnen
-def E_berechnen(t, x, y):
-    if Hertzdipol:
-        r2 = x * x + y * y
-        r = np.sqrt(r2)
-        if r == 0:
-            return (0.0, 0.0, 0.0)
-        tt = t - r / _c
-        p = _p0 * np.cos(_w * tt)
-        pd1 = -_w * _p0 * np.sin(_w * tt)
-        cosa = y / r
-        Efy = (_w**2 * p) / (_c2 * r)
-        Ep = Efy - pd1 / (_c * r2) - p / (r2 * r)
-        Er = 3 * pd1 / (_c * r2) - Efy + 3 * p / (r2 * r)
-        Er *= cosa
-        Ex = Er * (x / r)
-        Ey = Er * cosa + Ep
-        E = np.sqrt(Ex * Ex + Ey * Ey)
-        return (Ex, Ey, E)
-    elif Stabdipol:
-        Lplus = y + _Lamda_viertel
-        Lminus = y - _Lamda_viertel
-        rplus = np.sqrt(x * x + Lplus * Lplus)
-        rminus = np.sqrt(x * x + Lminus * Lminus)
-        if rplus == 0 or rminus == 0:
-            return (0.0, 0.0, 0.0)
-        tt1 = t - rplus / _c
-        tt2 = t - rminus / _c
-        sinplus = (1.0 / rplus) * np.cos(_w * tt1)
-        sinminus = (1.0 / rminus) * np.cos(_w * tt2)
-        Ey = (sinplus + sinminus) / 40.0  # _Stabfaktor = 40
-        if x == 0:
-            Ex = 0.0
-        else:
-            Ex = -((Lplus / x * sinplus) + (Lminus / x * sinminus)) / 40.0
-        E = np.sqrt(Ex * Ex + Ey * Ey)
-        return (Ex, Ey, E)
-
-
-# H-Feld berechnen
-def H_berechnen(t, x, y):
-    H = 0.0
-    if Hertzdipol:
-        r2 = x * x + y * y
-        r = np.sqrt(r2)
-        if r == 0:
-            return 0.0
-        tt = t - r / _c
-        p = _p0 * np.cos(_w * tt)
-        pd1 = _w * _p0 * np.sin(_w * tt)  # (Vorzeichen angepasst für z+-Richtung)
-        pd2 = _w * _w * p
-        sina = x / r
-        H = (pd2 / (_c2 * r) * sina) + (pd1 / (_c * r2) * sina)
-        return H
-    elif Stabdipol:
-        rplus = np.sqrt(x * x + (y + _Lamda_viertel) ** 2)
-        rminus = np.sqrt(x * x + (y - _Lamda_viertel) ** 2)
-        if rplus == 0 or rminus == 0 or x == 0:
-            return 0.0
-        tt = t - rplus / _c
-        sinplus = np.cos(_w * tt)
-        tt = t - rminus / _c
-        sinminus = np.cos(_w * tt)
-        H = (sinplus + sinminus) / (x * 40.0)  # / _Stabfaktor
-        return H
-
-
-# Poynting-Vektor (Energiestromdichte) berechnen
-def S_berechnen(t, x, y):
-    Ex, Ey, E = E_berechnen(t, x, y)
-    H = H_berechnen(t, x, y)
-    Sx = Ey * H
-    Sy = Ex * H
-    S = np.sqrt(Sx * Sx + Sy * Sy)
-    return (Sx, Sy, S)
-
-
-# Energiedichte berechnen (elektrisch + magnetisch)
-def Energiedichte_berechnen(t, x, y):
-    Ex, Ey, E = E_berechnen(t, x, y)
-    H = H_berechnen(t, x, y)
-    return _epsilon0 * E * E + _my0 * H * H
+# Feldberechnung (vektorisiert, gemeinsam für alle Skripte in dipolfeld.py)
+_Feldparameter = dict(p0=_p0, Wellenlaenge=_Wellenlaenge, Stabdipol=not Hertzdipol)
+E_berechnen = partial(dipolfeld.E_berechnen, **_Feldparameter)
+H_berechnen = partial(dipolfeld.H_berechnen, **_Feldparameter)
+S_berechnen = partial(dipolfeld.S_berechnen, **_Feldparameter)
+Energiedichte_berechnen = partial(dipolfeld.Energiedichte_berechnen, **_Feldparameter)
 
 
 # Hilfsfunktionen für Feldlinien-Berechnung
-def F(x_val, t):
-    """Hilfsfunktion F(x) für Hertzdipol (Nullstellenbestimmung auf x-Achse)."""
-    zw = -_w * (x_val / _c - t)
-    return np.cos(zw) - (x_val * _w / _c) * np.sin(zw)
-
-
 def FSt(x_val, t):
     """Hilfsfunktion FSt(x) für Stabdipol."""
     rpm2 = np.sqrt(x_val * x_val + _Lamda_viertel * _Lamda_viertel)
@@ -198,33 +129,6 @@ def FSt(x_val, t):
     return (2 / rpm2) * np.cos(_w * tt)
 
 
-def Nullstelle(x1, x2, t, func):
-    """Bisektionsverfahren zur Nullstellensuche von func im Intervall [x1, x2]."""
-    tol = 0.001
-    max_iter = 25
-    f1 = func(x1, t)
-    f2 = func(x2, t)
-    x_mid = None
-    if f1 == 0:
-        return x1
-    if f2 == 0:
-        return x2
-    for _ in range(max_iter):
-        x_mid = (x1 + x2) / 2.0
-        f_mid = func(x_mid, t)
-        if abs(x2 - x1) <= tol or f_mid == 0:
-            break
-        if f2 * f_mid > 0:
-            # Nullstelle liegt in [x1, x_mid]
-            x2 = x_mid
-            f2 = f_mid
-        else:
-            # Nullstelle liegt in [x_mid, x2]
-            x1 = x_mid
-            f1 = f_mid
-    return x_mid if x_mid is not None else (x1 + x2) / 2.0
-
-
 # **Hilfsfunktion zur Berechnung der Radien der H-Feldlinien in der xy-Ebene**
 def H_Linien_Radien(t):
     """Berechnet alle Radien, bei denen zum Zeitpunkt t magnetische Feldlinien im
@@ -241,34 +145,28 @@ def H_Linien_Radien(t):
     return radii
 
 
-# Bestimme "Grenzlinien" (Nullstellen) auf der x-Achse, die Feldlinien trennen
-Zahl_der_Extrema = 0
-_Grenzlinie = []
-
-
-def Grenzlinien_bestimmen(t):
-    global Zahl_der_Extrema, _Grenzlinie
-    _Grenzlinie = []
-    if Hertzdipol:
-        Keulenzahl = 7
-        _Groessenfaktor2_val = 2 if False else _Groessenfaktor  # Pot3D_Flag nicht aktiv
-        Schrittweite = _Lamda_viertel / 4.0
-        x1 = _Linienabst / 2.0 + 3.0  # Start etwas jenseits Nahgrenze (Nahgrenze = 3)
-        x2 = x1 + Schrittweite
-        ij = 0
-        Fensterende = False
-        while not Fensterende:
-            f1 = F(x1, t)
-            f2 = F(x2, t)
-            if f1 * f2 <= 0:
-                nullst = Nullstelle(x1, x2, t, F)
-                _Grenzlinie.append(nullst)
-                ij += 1
-                Zahl_der_Extrema = ij
-            x1 = x2
-            x2 = x1 + Schrittweite
-            if x1 > _Wellenlaenge * _Groessenfaktor:
-                Fensterende = True
+# Parameter, von denen die H-Radien abhängen (Prüfung der Geometriedatei; die
+# Radien selbst sind schneller neu berechnet als aus Feldcache/ geladen)
+_Cacheparameter = dict(
+    Inhalt="H-Radien",
+    Wellenlaenge=_Wellenlaenge,
+    Periode=_Periode,
+    Groessenfaktor=_Groessenfaktor,
+    radd=_radd,
+)
+# Renderstufe: Geometrie aller Frames aus der Datei der Rechenstufe
+_Geometrie_Quelle = (
+    geometriedatei.Geometrie_Datei(_Geometriedatei, [_Cacheparameter])
+    if Geometrie_Stufe == "rendern"
+    else None
+)
+
+
+def H_Radien(frame):
+    """Radien der H-Feldlinien von ``frame`` (aus der Geometriedatei oder neu)."""
+    if _Geometrie_Quelle is not None:
+        return _Geometrie_Quelle.frame(frame)["Radien"]
+    return H_Linien_Radien(frame * _dt)
 
 
 # Runge-Kutta Folgepunkt-Berechnung entlang einer Feldlinie
@@ -299,154 +197,6 @@ def Folgepkt(x, y, Rechenrichtung, t):
     return x_new, y_new
 
 
-def LinienStarts_bestimmen():
-    global _xLinie
-    _xLinie = [0]
-    j = 1
-    for n in range(Zahl_der_Extrema - 1):
-        Linienpos = _Grenzlinie[n] - _Linienabst / 2.0
-        iii = 0
-        while (Linienpos > 3.0) and (iii < _Linien_pro_Welle):
-            _xLinie.append(Linienpos)
-            j += 1
-            iii += 1
-            Linienpos -= _Linienabst
-    _xLinie[0] = j - 1
-    _xLinie.append(666666.0)  # Endmarkierung (wird nicht genutzt)
-
-
-# Einrichtung der Grafik
-fig = plt.figure(figsize=(8, 6))
-ax = fig.add_subplot(111)  # 3D-Achse
-
-ax.set_aspect("equal")
-ax.set_xlim(-_Wellenlaenge * _Groessenfaktor, _Wellenlaenge * _Groessenfaktor)
-ax.set_ylim(-_Wellenlaenge * _Groessenfaktor, _Wellenlaenge * _Groessenfaktor)
-
-
-ax.set_xlabel(r"x / $\lambda$")
-ax.set_ylabel(r"y / $\lambda$")
-
-ax.set_title("Hertzian Dipole - H-Fieldlines")
-
-# Anpassung der Ticks für die x- und y-Achse
-ticks = np.arange(
-    -_Wellenlaenge * _Groessenfaktor,
-    _Wellenlaenge * _Groessenfaktor + 1,
-    _Wellenlaenge / 2,
-)
-ax.set_xticks(ticks)
-ax.set_xticklabels([f"{tick / _Wellenlaenge:.2f}" for tick in ticks])
-ax.set_yticks(ticks)
-ax.set_yticklabels([f"{tick / _Wellenlaenge:.2f}" for tick in ticks])
-
-# Initiale Berechnung für t=0
-_t = 0.0
-Grenzlinien_bestimmen(_t)
-LinienStarts_bestimmen()
-
-# Feldlinien-Daten (nur obere Halbebene berechnen, Rest wird durch Spiegelung gezeichnet)
-
-
-# Pfeil-Gitter (nur 1. Quadrant berechnen, Rest durch Spiegelung zeichnen)
-xOff = 10.0  # Startversatz in Simulationseinheiten
-x_spacing = _xAbst / _Horizontalfaktor
-y_spacing = _yAbst / _Horizontalfaktor
-# Bestimme Gittergröße (Anzahl Pfeile) aus Achsenbereich
-xGrenze = int(round(ax.get_xlim()[1] / (_xAbst / _Horizontalfaktor)))
-yGrenze = int(round(ax.get_ylim()[1] / (_yAbst / _Horizontalfaktor)))
-# Energiestrom-Daten (1. Quadrant)
-arrow_points = []
-arrow_vectors = []
-arrow_vals = []
-for jj in range(yGrenze):
-    for ii in range(xGrenze):
-        X = xOff + ii * x_spacing
-        Y = jj * y_spacing
-        Sx, Sy, S = S_berechnen(_t, X, Y)
-        arrow_points.append((X, Y))
-        arrow_vectors.append((Sx, Sy))
-        arrow_vals.append(S)
-# Spiegelung der Pfeile in alle vier Quadranten
-full_X = []
-full_Y = []
-full_U = []
-full_V = []
-full_S = []
-for (X, Y), (Sx, Sy), S in zip(arrow_points, arrow_vectors, arrow_vals):
-    # rechts oben
-    full_X.append(X)
-    full_Y.append(Y)
-    full_U.append(0.0)
-    full_V.append(0.0)
-    full_S.append(S)  # Platzhalter, wird unten berechnet
-    # links oben (X negiert)
-    full_X.append(-X)
-    full_Y.append(Y)
-    full_U.append(0.0)
-    full_V.append(0.0)
-    full_S.append(S)
-    if Y != 0:
-        # rechts unten (Y negiert)
-        full_X.append(X)
-        full_Y.append(-Y)
-        full_U.append(0.0)
-        full_V.append(0.0)
-        full_S.append(S)
-        # links unten (X und Y negiert)
-        full_X.append(-X)
-        full_Y.append(-Y)
-        full_U.append(0.0)
-        full_V.append(0.0)
-        full_S.append(S)
-
-# Zeichne anfängliche Feldlinien (und gespiegelte)
-
-mag_arrow_objects = []  # Liste für Pfeil-Objekte
-# **Zeichne magnetische Feldlinien (rot) in der xy-Ebene**
-H_line_plots = []  # Liste für H-Feldlinien-Objekte
-H_current_radii = []  # aktuelle Radien der H-Feldlinien
-if H_Feldlinien_Flag:
-    radii_list = H_Linien_Radien(_t)
-    for r in radii_list:
-        theta = np.linspace(0, 2 * np.pi, 73)
-        Xc = r * np.cos(theta)
-        Yc = r * np.sin(theta)
-        (ln_h,) = ax.plot(Xc, Yc, color="red", linewidth=1, zorder=2)
-        H_line_plots.append(ln_h)
-    H_current_radii = radii_list.copy()
-
-    for r in radii_list:
-        Hphi = H_berechnen(0, r, 0)
-        mark = "^" if Hphi > 0 else "v"
-        col = "red" if Hphi > 0 else "blue"
-
-        x0 = r  # Startpunkt dieser Feldlinie (y = 0)
-        # rechts
-        (arr_r,) = ax.plot(
-            x0, 0, marker=mark, markersize=6, color=col, linestyle="None"
-        )
-        # links (gespiegelte Linie)
-        (arr_l,) = ax.plot(
-            -x0, 0, marker=mark, markersize=6, color=col, linestyle="None"
-        )
-        mag_arrow_objects.extend([arr_r, arr_l])  # merken fürs spätere Update
-
-# Zeichne Dipol (schwarzer Strich) und Markierung für +/-
-dipole_objs = []
-dipole_objs = []
-
-# dipol zeichnen
-# Erstelle den Kreis und das Kreuz einmalig
-# circle = Circle((0, 0), radius=2, edgecolor="black", facecolor="white", zorder=5)
-# ax.add_patch(circle)
-
-# Linien für das Kreuz
-(cross_line1,) = ax.plot([], [], "kx", markersize=10, zorder=6)  # Diagonale 1
-# Punkt für den Kreis
-(circle_point,) = ax.plot([], [], "ko", markersize=10, zorder=6)  # Schwarzer Punkt
-
-
 def progress_bar(current, total, length=40):
     percent = int(100 * current / total)
     filled = int(length * current / total)
@@ -455,96 +205,226 @@ def progress_bar(current, total, length=40):
     sys.stdout.flush()
 
 
-def update(frame):
-    global _t, mag_arrow_objects
-    _t = frame * _dt
-    if _t > _T:
-        _t -= _T  # Zeitsprung (periodisch)
-
-    progress_bar(frame + 1, _Periode)
-    # Feldlinien neu berechnen
-    Grenzlinien_bestimmen(_t)
-    LinienStarts_bestimmen()
-
-    # **Magnetfeldlinien (H-Feld) neu berechnen und aktualisieren**
-    if H_Feldlinien_Flag:
-        new_radii = H_Linien_Radien(_t)
-        if (len(new_radii) != len(H_current_radii)) or (
-            sorted(new_radii) != sorted(H_current_radii)
-        ):
-            # Anzahl oder Position der H-Feldlinien hat sich geändert -> neu zeichnen
-            for ln in H_line_plots:
-                ln.remove()
-            H_line_plots.clear()
-            for r in new_radii:
-                theta = np.linspace(0, 2 * np.pi, 73)
-                Xc = r * np.cos(theta)
-                Yc = r * np.sin(theta)
-                (ln_h,) = ax.plot(Xc, Yc, color="red", linewidth=1, zorder=2)
-                H_line_plots.append(ln_h)
-
-            H_current_radii.clear()
-            H_current_radii.extend(new_radii)
-        else:
-            # Positionen der bestehenden H-Feldlinien aktualisieren
-            for i, r in enumerate(new_radii):
-                theta = np.linspace(0, 2 * np.pi, 73)
-                Xc = r * np.cos(theta)
-                Yc = r * np.sin(theta)
-                H_line_plots[i].set_data(Xc, Yc)
-    else:
-        # Magnetfeldlinien verbergen (keine Anzeige)
-        for ln in H_line_plots:
-            ln.remove()
-        H_line_plots.clear()
-        H_current_radii.clear()
-
-    for ar in mag_arrow_objects:
-        ar.remove()
-    mag_arrow_objects = []
-
-    for r in new_radii:
-        Hphi = H_berechnen(_t, r, 0)
-        mark1 = "^" if Hphi > 0 else "v"
-        mark2 = "v" if Hphi > 0 else "^"
-        col = "red" if Hphi > 0 else "blue"
-
-        x0 = r  # Startpunkt dieser Feldlinie (y = 0)
-        # rechts
-        (arr_r,) = ax.plot(
-            x0, 0, marker=mark1, markersize=6, color=col, linestyle="None"
+if __name__ == "__main__":
+    # Grafik erst beim Ausführen laden: Importiert man das Skript (z. B. für
+    # die Rechenfunktionen), bleibt es bei NumPy und den Hilfsmodulen
+    import matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+    from matplotlib.colors import ListedColormap, BoundaryNorm
+    from mpl_toolkits.mplot3d import Axes3D
+    from matplotlib.transforms import Bbox
+    from matplotlib.patches import Circle
+
+    # Zeitmessung je Stufe (Profil_Flag), Bericht und Trace am Ende
+    if Profil_Flag:
+        profil.aktivieren()
+
+    # Einrichtung der Grafik
+    fig = plt.figure(figsize=(8, 6))
+    ax = fig.add_subplot(111)  # 3D-Achse
+
+    ax.set_aspect("equal")
+    ax.set_xlim(-_Wellenlaenge * _Groessenfaktor, _Wellenlaenge * _Groessenfaktor)
+    ax.set_ylim(-_Wellenlaenge * _Groessenfaktor, _Wellenlaenge * _Groessenfaktor)
+
+    ax.set_xlabel(r"x / $\lambda$")
+    ax.set_ylabel(r"y / $\lambda$")
+
+    ax.set_title("Hertzian Dipole - H-Fieldlines")
+
+    # Anpassung der Ticks für die x- und y-Achse
+    ticks = np.arange(
+        -_Wellenlaenge * _Groessenfaktor,
+        _Wellenlaenge * _Groessenfaktor + 1,
+        _Wellenlaenge / 2,
+    )
+    ax.set_xticks(ticks)
+    ax.set_xticklabels([f"{tick / _Wellenlaenge:.2f}" for tick in ticks])
+    ax.set_yticks(ticks)
+    ax.set_yticklabels([f"{tick / _Wellenlaenge:.2f}" for tick in ticks])
+
+    # Initiale Berechnung für t=0
+    _t = 0.0
+
+    # Feldlinien-Daten (nur obere Halbebene berechnen, Rest wird durch Spiegelung gezeichnet)
+
+    # Pfeil-Gitter (nur 1. Quadrant berechnen, Rest durch Spiegelung zeichnen)
+    xOff = 10.0  # Startversatz in Simulationseinheiten
+    x_spacing = _xAbst / _Horizontalfaktor
+    y_spacing = _yAbst / _Horizontalfaktor
+    # Bestimme Gittergröße (Anzahl Pfeile) aus Achsenbereich
+    xGrenze = int(round(ax.get_xlim()[1] / (_xAbst / _Horizontalfaktor)))
+    yGrenze = int(round(ax.get_ylim()[1] / (_yAbst / _Horizontalfaktor)))
+    # Energiestrom-Daten (1. Quadrant, ganzes Gitter in einem Aufruf)
+    arrow_X, arrow_Y = (
+        g.ravel()
+        for g in np.meshgrid(
+            xOff + np.arange(xGrenze) * x_spacing, np.arange(yGrenze) * y_spacing
         )
-        # links (gespiegelte Linie)
-        (arr_l,) = ax.plot(
-            -x0, 0, marker=mark2, markersize=6, color=col, linestyle="None"
+    )
+    arrow_Sx, arrow_Sy, arrow_S = S_berechnen(_t, arrow_X, arrow_Y)
+    # Spiegelung der Pfeile in alle vier Quadranten (Richtungen als Platzhalter)
+    full_X, full_Y, full_U, full_V = dipolfeld.Quadranten_spiegeln(
+        arrow_X, arrow_Y, 0.0, 0.0
+    )
+    full_S = np.repeat(arrow_S, np.where(arrow_Y != 0, 4, 2))
+
+    # Zeichne anfängliche Feldlinien (und gespiegelte)
+
+    # **Magnetische Feldlinien (rot) in der xy-Ebene**
+    # Feste Artist-Pools, die pro Frame nur aktualisiert werden: ein Kreis je
+    # möglichem Radius (Kapazität = Maximum über eine Periode, überzählige Kreise
+    # unsichtbar) und ein Pfeilmarker-Artist je Kombination aus Vorzeichen von
+    # Hphi und Seite der x-Achse.
+    _theta = np.linspace(0, 2 * np.pi, 73)
+    _Kreis_cos, _Kreis_sin = np.cos(_theta), np.sin(_theta)
+    _Kreise_max = max(len(H_Radien(f)) for f in range(int(_Periode)))
+    H_line_plots = [
+        ax.plot([], [], color="red", linewidth=1, zorder=2, visible=False)[0]
+        for _ in range(_Kreise_max)
+    ]
+    mag_arrow_objects = {}  # (Hphi > 0, rechts) -> Pfeilmarker
+    for positiv, rechts in ((True, True), (True, False), (False, True), (False, False)):
+        mark = "^" if positiv == rechts else "v"  # links gespiegelte Richtung
+        col = "red" if positiv else "blue"
+        (mag_arrow_objects[positiv, rechts],) = ax.plot(
+            [], [], marker=mark, markersize=6, color=col, linestyle="None"
         )
-        mag_arrow_objects.extend([arr_r, arr_l])  # merken fürs spätere Update
-    # Aktualisiere Dipol-Markierungen (+/-) und zeichne Kreis oder Kreuz
 
-    Hphi = H_berechnen(_t, 0.1, 0)
+    def H_Linien_setzen(t, radien):
+        """Setzt Kreise und Pfeilmarker der H-Feldlinien für den Zeitpunkt t."""
+        radien = np.array(radien if H_Feldlinien_Flag else [])
+        for i, ln in enumerate(H_line_plots):
+            if i < len(radien):
+                ln.set_data(radien[i] * _Kreis_cos, radien[i] * _Kreis_sin)
+            ln.set_visible(i < len(radien))
+        positiv = H_berechnen(t, radien, 0) > 0
+        for (pos, rechts), ln in mag_arrow_objects.items():
+            x0 = radien[positiv == pos]  # Startpunkte dieser Feldlinien (y = 0)
+            ln.set_data(x0 if rechts else -x0, np.zeros(len(x0)))
+
+    H_Linien_setzen(_t, H_Radien(0))
+
+    # Zeichne Dipol (schwarzer Strich) und Markierung für +/-
+    dipole_objs = []
+    dipole_objs = []
+
+    # dipol zeichnen
+    # Erstelle den Kreis und das Kreuz einmalig
+    # circle = Circle((0, 0), radius=2, edgecolor="black", facecolor="white", zorder=5)
+    # ax.add_patch(circle)
+
+    # Linien für das Kreuz
+    (cross_line1,) = ax.plot([], [], "kx", markersize=10, zorder=6)  # Diagonale 1
+    # Punkt für den Kreis
+    (circle_point,) = ax.plot([], [], "ko", markersize=10, zorder=6)  # Schwarzer Punkt
+
+    def update(frame):
+        t = frame * _dt
+        if t > _T:
+            t -= _T  # Zeitsprung (periodisch)
+
+        progress_bar(frame + 1, _Periode)
+        # Magnetfeldlinien (H-Feld) und Pfeilmarker aktualisieren
+        with profil.Abschnitt("H radii"):
+            radien = H_Radien(frame)
+        with profil.Abschnitt("artist update"):
+            H_Linien_setzen(t, radien)
+
+        # Aktualisiere Dipol-Markierungen (+/-) und zeichne Kreis oder Kreuz
+
+        Hphi = H_berechnen(t, 0.1, 0)
+
+        if Hphi > 0:
+            # Kreis mit Punkt (Strom in +z-Richtung)
+            circle_point.set_data([0], [0])  # Punkt in der Mitte
+            cross_line1.set_data([], [])  # Kreuz unsichtbar
+        else:
+            # Kreis mit Kreuz (Strom in -z-Richtung)
+            circle_point.set_data([], [])  # Punkt unsichtbar
+            cross_line1.set_data([-0.35, 0.35], [-0.35, 0.35])  # Diagonale 1
+
+        return (
+            tuple(H_line_plots)
+            + (circle_point, cross_line1)
+            + tuple(mag_arrow_objects.values())
+        )
 
-    if Hphi > 0:
-        # Kreis mit Punkt (Strom in +z-Richtung)
-        circle_point.set_data([0], [0])  # Punkt in der Mitte
-        cross_line1.set_data([], [])  # Kreuz unsichtbar
+    # Zu rendernde Frames: ganze Periode oder nur _Framebereich
+    _Frames = range(int(_Periode)) if _Framebereich is None else _Framebereich
+
+    def Bereich_update(i):
+        """``update`` für den i-ten der zu rendernden Frames."""
+        return update(_Frames[i])
+
+    def Frame_rendern(i):
+        """Zeichnet den i-ten der zu rendernden Frames und liefert das Bild (für das
+        parallele Rendern)."""
+        Bereich_update(i)
+        return ausgabe.Figur_rgba(fig, _dpi)
+
+    if Geometrie_Stufe == "berechnen":
+        # Rechenstufe: Geometrie in eine Datei schreiben, nichts rendern
+        anzahl = geometriedatei.Geometrie_schreiben(
+            _Geometriedatei,
+            (dict(Radien=H_Radien(frame)) for frame in range(int(_Periode))),
+            [_Cacheparameter],
+        )
+        print(f"\nGeometry of {anzahl} frames written to {_Geometriedatei}")
+        if Profil_Flag:
+            profil.Abschluss(_Ausgabename + ".trace.json")
+        sys.exit()
+
+    if Render_Benchmark:
+        # Physik (update) und Rendern getrennt messen, nichts speichern
+        ausgabe.Rendern_messen(fig, update, int(_Periode), _dpi)
+        sys.exit()
+
+    # Animation automatisch als GIF-Datei speichern (optional)
+    print(f"\n Creating {_Ausgabeformat}...")
+    if _Ausgabeformat != "gif":
+        # Frames direkt an ffmpeg (ohne GIF-Zwischenschritt)
+        if _Prozesse > 1:
+            bilder = ausgabe.Frames_parallel_iterieren(
+                Frame_rendern, len(_Frames), _Prozesse
+            )
+        else:
+            bilder = ausgabe.Frames_zeichnen(
+                fig, Bereich_update, len(_Frames), _dpi, Hintergrund=Hintergrund_Flag
+            )
+        ausgabe.Video_speichern(
+            bilder,
+            _Ausgabename + "." + _Ausgabeformat,
+            fps=int(round(_Periode / _animation_duration)),
+            codec=_Videocodec,
+            crf=_CRF,
+            pix_fmt=_Pixelformat,
+        )
     else:
-        # Kreis mit Kreuz (Strom in -z-Richtung)
-        circle_point.set_data([], [])  # Punkt unsichtbar
-        cross_line1.set_data([-0.35, 0.35], [-0.35, 0.35])  # Diagonale 1
-
-    return tuple(H_line_plots) + (circle_point, cross_line1) + tuple(mag_arrow_objects)
-
-
-# Erstelle Animation
-anim = FuncAnimation(fig, update, frames=int(_Periode), interval=100, blit=False)
-
-# Animation automatisch als GIF-Datei speichern (optional)
-print("\n Creating gif...")
-anim.save(
-    "H-field_2D.gif",
-    writer="pillow",
-    fps=int(round(_Periode / _animation_duration)),
-    dpi=300,
-)
-print("\nAnimation saved as 'dipol_E_field.gif'")
-# plt.show()
+        if _Prozesse > 1:
+            # Frames auf mehrere Prozesse verteilen
+            bilder = ausgabe.Frames_parallel_rendern(
+                Frame_rendern, len(_Frames), _Prozesse, Halbperiode=False
+            )
+        else:
+            # Frames direkt aus dem Agg-Puffer (statt anim.save)
+            bilder = ausgabe.Frames_puffern(
+                fig, Bereich_update, len(_Frames), _dpi, Hintergrund=Hintergrund_Flag
+            )
+        ausgabe.GIF_speichern(
+            bilder,
+            _Ausgabename + ".gif",
+            fps=int(round(_Periode / _animation_duration)),
+            optimieren=GIF_optimieren,
+            Prozesse=_Prozesse,
+        )
+    print(f"\nAnimation saved as '{_Ausgabename}.{_Ausgabeformat}'")
+    if Profil_Flag:
+        profil.Abschluss(_Ausgabename + ".trace.json")
+    if Anzeige_Flag:
+        # Animation für die Anzeige erst nach dem Speichern anlegen: Mit
+        # blit=True markiert sie ihre Artists als animiert, canvas.draw()
+        # ließe sie dann weg
+        anim = FuncAnimation(fig, update, frames=int(_Periode), interval=100, blit=True)
+        plt.show()
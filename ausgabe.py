@@ -0,0 +1,647 @@
+"""Rendern und Speichern der Animations-Frames.
+
+Die Frames einer Animation hängen nur von ``frame * _dt`` ab und lassen sich
+daher auf mehrere Prozesse verteilen. Die Worker werden per ``fork``
+gestartet und übernehmen so den fertig aufgebauten Zustand des Skripts
+(Figur, Achsen, Parameter); die Bilder kommen in Frame-Reihenfolge zurück
+und werden in einem einzigen Encoder gespeichert.
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+import zlib
+from functools import partial
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+import profil
+
+
+def Figur_rgba(fig, dpi):
+    """Rastert ``fig`` wie der pillow-Writer von Matplotlib und liefert das Bild."""
+    buf = BytesIO()
+    with profil.Abschnitt("rasterization"):
+        fig.savefig(buf, format="rgba", dpi=dpi)
+    w, h = fig.get_size_inches()
+    im = Image.frombuffer(
+        "RGBA", (int(w * dpi), int(h * dpi)), buf.getbuffer(), "raw", "RGBA", 0, 1
+    )
+    if im.getextrema()[3][0] < 255:
+        return im
+    # Ohne Transparenz nach RGB wandeln (bessere Palette im GIF, wie bei pillow)
+    return im.convert("RGB")
+
+
+def Pixelgroesse(ax, dpi):
+    """Größe eines Ausgabepixels bei ``dpi`` in Dateneinheiten der Achse ``ax``
+    (die kleinere von x- und y-Richtung)."""
+    ax.apply_aspect()
+    box = ax.get_position()
+    breite, hoehe = ax.figure.get_size_inches() * dpi
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    return min(abs(x1 - x0) / (box.width * breite), abs(y1 - y0) / (box.height * hoehe))
+
+
+def Frames_zeichnen(fig, update, anzahl, dpi, Hintergrund=False):
+    """Rendert die Frames direkt über den Agg-Canvas, ohne ``anim.save``.
+
+    Ruft je Frame ``update(frame)`` und ``fig.canvas.draw()`` auf und liefert
+    eine RGB-Sicht (ohne Kopie) auf den Puffer des Canvas. Die Sicht gilt nur
+    bis zum nächsten Frame; zum Aufheben ``Frames_puffern`` benutzen. Als
+    Encoder passt alles mit ``anhaengen`` (``GIF_Strom``, ``Video_Strom``).
+    Als animiert markierte Artists (Blitting) zeichnet ``canvas.draw()`` nicht;
+    eine ``FuncAnimation`` mit ``blit=True`` daher erst danach anlegen. Mit
+    ``Hintergrund`` über ``Frames_ueberlagern``.
+    """
+    if Hintergrund:
+        yield from Frames_ueberlagern(fig, update, anzahl, dpi)
+        return
+    alte_dpi = fig.dpi
+    fig.set_dpi(dpi)
+    try:
+        for frame in range(anzahl):
+            with profil.Abschnitt("frame", frame=frame):
+                update(frame)
+                with profil.Abschnitt("rasterization"):
+                    fig.canvas.draw()
+            profil.Speicher_notieren()
+            yield np.asarray(fig.canvas.buffer_rgba())[..., :3]
+    finally:
+        fig.set_dpi(alte_dpi)
+
+
+def Frames_ueberlagern(fig, update, anzahl, dpi):
+    """Wie ``Frames_zeichnen``, rastert aber den statischen Teil der Figur
+    (Achsen, Beschriftung, Titel, ...) nur einmal.
+
+    Dynamisch sind die Artists, die ``update`` zurückgibt (wie bei
+    ``FuncAnimation`` mit ``blit=True``). Sie werden als animiert markiert,
+    der Rest einmal gezeichnet und als Hintergrund gesichert; je Frame wird
+    der Hintergrund zurückkopiert und nur die dynamischen Artists (nach
+    zorder) darüber gezeichnet.
+    """
+    alte_dpi = fig.dpi
+    fig.set_dpi(dpi)
+    animiert = set()
+    try:
+        hintergrund = None
+        for frame in range(anzahl):
+            with profil.Abschnitt("frame", frame=frame):
+                kuenstler = list(update(frame))
+                # Achsenrahmen gehören mit dazu, damit sie (zorder 2.5) wie beim
+                # vollen Zeichnen über angeschnittenen Linien liegen
+                rang = {}
+                for ax in {a.axes for a in kuenstler if a.axes is not None}:
+                    kuenstler.extend(ax.spines.values())
+                    rang.update((c, i) for i, c in enumerate(ax.get_children()))
+                # Reihenfolge wie in Axes.draw: zorder, dann Reihenfolge der Kinder
+                kuenstler.sort(key=lambda a: (a.get_zorder(), rang.get(a, 0)))
+                for a in kuenstler:
+                    if not a.get_animated():
+                        a.set_animated(True)
+                        animiert.add(a)
+                        hintergrund = None  # neuer dynamischer Artist
+                with profil.Abschnitt("rasterization"):
+                    if hintergrund is None:
+                        fig.canvas.draw()
+                        hintergrund = fig.canvas.copy_from_bbox(fig.bbox)
+                    else:
+                        fig.canvas.restore_region(hintergrund)
+                    for a in kuenstler:
+                        fig.draw_artist(a)
+            profil.Speicher_notieren()
+            yield np.asarray(fig.canvas.buffer_rgba())[..., :3]
+    finally:
+        for a in animiert:
+            a.set_animated(False)
+        fig.set_dpi(alte_dpi)
+
+
+def Frames_puffern(fig, update, anzahl, dpi, Hintergrund=False):
+    """Wie ``Frames_zeichnen``, kopiert die Bilder aber in ein einmal
+    angelegtes Array (anzahl, Höhe, Breite, 3)."""
+    puffer = None
+    frames = Frames_zeichnen(fig, update, anzahl, dpi, Hintergrund)
+    for frame, bild in enumerate(frames):
+        if puffer is None:
+            puffer = np.empty((anzahl,) + bild.shape, dtype=np.uint8)
+        puffer[frame] = bild
+    return puffer
+
+
+def Rendern_messen(fig, update, anzahl, dpi):
+    """Vergleicht den bisherigen Speicherpfad (``update`` + ``savefig`` je
+    Frame, wie ``anim.save`` mit dem pillow-Writer) mit ``Frames_zeichnen``
+    und ``Frames_ueberlagern``.
+
+    Gibt die Zeiten getrennt nach Physik (``update``) und Rendern aus und
+    den Anteil der Pixel, die vom savefig-Weg abweichen.
+    """
+    wege = ("savefig", "Agg", "Hintergrund")
+    zeiten = {weg: dict(update=0.0, render=0.0) for weg in wege}
+    abweichung = {weg: 0.0 for weg in wege}
+    referenz = []
+
+    def update_gemessen(frame):
+        start = time.perf_counter()
+        kuenstler = update(frame)
+        zeiten[weg]["update"] += time.perf_counter() - start
+        return kuenstler
+
+    def savefig_frames():
+        for frame in range(anzahl):
+            update_gemessen(frame)
+            yield Figur_rgba(fig, dpi)
+
+    for weg, frames in zip(
+        wege,
+        (
+            savefig_frames(),
+            Frames_zeichnen(fig, update_gemessen, anzahl, dpi),
+            Frames_ueberlagern(fig, update_gemessen, anzahl, dpi),
+        ),
+    ):
+        frame = 0
+        while True:
+            start = time.perf_counter()
+            bild = next(frames, None)
+            zeiten[weg]["render"] += time.perf_counter() - start
+            if bild is None:
+                break
+            # Komprimiert aufheben, der Vergleich soll nicht den Speicher füllen
+            bild = np.asarray(bild)[..., :3]
+            if weg == "savefig":
+                referenz.append(zlib.compress(bild.tobytes(), 1))
+            else:
+                vorher = np.frombuffer(zlib.decompress(referenz[frame]), np.uint8)
+                abweichung[weg] += np.mean(
+                    np.any(vorher.reshape(bild.shape) != bild, axis=-1)
+                )
+            frame += 1
+        zeiten[weg]["render"] -= zeiten[weg]["update"]
+
+    print(f"\nRendering {anzahl} frames at {dpi} dpi:")
+    for weg, z in zeiten.items():
+        print(
+            f"  {weg:11s} update {z['update']:6.2f} s, render {z['render']:6.2f} s "
+            f"({1000 * z['render'] / anzahl:.1f} ms/frame), "
+            f"{100 * abweichung[weg] / anzahl:.3f} % pixels differ"
+        )
+    return zeiten
+
+
+def Ausgabe_Bericht(dateiname, anzahl, sekunden):
+    """Gibt Frame-Zahl, Dateigröße und Kodierzeit einer gespeicherten Animation aus."""
+    groesse = os.path.getsize(dateiname) / 1e6
+    print(
+        f"\n{dateiname}: {anzahl} frames, {groesse:.2f} MB, encoded in {sekunden:.1f} s"
+    )
+
+
+def GIF_speichern(bilder, dateiname, fps, optimieren=False, Prozesse=1):
+    """Speichert Bilder (PIL-Bilder oder NumPy-Arrays) als GIF.
+
+    Ohne ``optimieren`` genau wie ``anim.save(..., writer="pillow")``, sonst
+    mit gemeinsamer Palette, Differenzrechtecken und zusammengefassten
+    doppelten Frames; die Quantisierung läuft dann auf ``Prozesse`` Kernen.
+    """
+    start = time.perf_counter()
+    with profil.Abschnitt("encode"):
+        if optimieren:
+            palette = Palette_bestimmen(bilder)
+            with GIF_Strom(dateiname, fps, palette=palette) as gif:
+                for indizes in Frames_quantisieren(bilder, palette, Prozesse):
+                    gif.anhaengen(indizes)
+        else:
+            bilder = [
+                b if isinstance(b, Image.Image) else Image.fromarray(b) for b in bilder
+            ]
+            bilder[0].save(
+                dateiname,
+                save_all=True,
+                append_images=bilder[1:],
+                duration=int(1000 / fps),
+                loop=0,
+            )
+    Ausgabe_Bericht(dateiname, len(bilder), time.perf_counter() - start)
+
+
+# Palettenindex für unveränderte Pixel in Differenzrechtecken
+_Transparent = 255
+
+
+def _RGB(bild):
+    if not isinstance(bild, Image.Image):
+        bild = Image.fromarray(bild)
+    return bild if bild.mode == "RGB" else bild.convert("RGB")
+
+
+def Palette_bestimmen(bilder, Stichprobe=8, Pixel_max=2_000_000):
+    """Bestimmt eine gemeinsame Palette (Array n x 3, n <= 255) aus bis zu
+    ``Stichprobe`` gleichmäßig verteilten Frames (höchstens ``Pixel_max``
+    Pixel davon).
+
+    Median-Cut teilt die Farben auf, jeder Eintrag wird dann aber auf den
+    häufigsten echten Farbton seines Würfels gesetzt, damit z. B. der weiße
+    Hintergrund exakt weiß bleibt. Index ``_Transparent`` bleibt frei.
+    """
+    auswahl = np.linspace(0, len(bilder) - 1, min(Stichprobe, len(bilder)))
+    pixel = np.concatenate([np.asarray(_RGB(bilder[int(round(k))])) for k in auswahl])
+    schritt = int(np.ceil(np.sqrt(pixel.shape[0] * pixel.shape[1] / Pixel_max)))
+    pixel = np.ascontiguousarray(pixel[::schritt, ::schritt])
+    wuerfel = Image.fromarray(pixel).quantize(
+        colors=255, method=Image.Quantize.MEDIANCUT
+    )
+    # Häufigsten Farbton je Würfel bestimmen
+    paare, anzahl = np.unique(
+        np.asarray(wuerfel).ravel().astype(np.int64) << 24 | _Farbcode(pixel).ravel(),
+        return_counts=True,
+    )
+    index = paare >> 24
+    reihenfolge = np.lexsort((anzahl, index))  # je Würfel aufsteigend nach Anzahl
+    letzte = np.r_[np.flatnonzero(np.diff(index[reihenfolge])), len(paare) - 1]
+    return _Farben(paare[reihenfolge[letzte]] & 0xFFFFFF)
+
+
+def _Farbcode(rgb):
+    rgb = rgb.astype(np.int64)
+    return rgb[..., 0] << 16 | rgb[..., 1] << 8 | rgb[..., 2]
+
+
+def _Farben(code):
+    return np.column_stack((code >> 16 & 255, code >> 8 & 255, code & 255)).astype(
+        np.uint8
+    )
+
+
+def Bild_quantisieren(bild, palette, Block=65536):
+    """Bildet jedes Pixel ohne Dithering auf den nächsten Farbton der
+    ``palette`` ab und liefert das Array der Indizes."""
+    code = _Farbcode(np.asarray(_RGB(bild)))
+    farben, rueck = np.unique(code.ravel(), return_inverse=True)
+    farben = _Farben(farben).astype(np.float32)
+    tabelle = palette.astype(np.float32)
+    # |f - p|^2 = |f|^2 - 2 f.p + |p|^2; |f|^2 ist für den Vergleich egal
+    laenge2 = (tabelle**2).sum(axis=1)
+    naechste = np.empty(len(farben), dtype=np.uint8)
+    for i in range(0, len(farben), Block):
+        abstand = laenge2 - 2.0 * (farben[i : i + Block] @ tabelle.T)
+        naechste[i : i + Block] = abstand.argmin(axis=1)
+    return naechste[rueck].reshape(code.shape)
+
+
+def Frames_quantisieren(bilder, palette, Prozesse=1):
+    """Quantisiert ``bilder`` in Reihenfolge, bei ``Prozesse`` > 1 parallel."""
+    quantisieren = partial(Bild_quantisieren, palette=palette)
+    if Prozesse <= 1:
+        yield from map(quantisieren, bilder)
+        return
+    kontext = multiprocessing.get_context("fork")
+    with kontext.Pool(Prozesse) as pool:
+        yield from pool.imap(quantisieren, bilder)
+
+
+def _GIF_zerlegen(bild):
+    """Kodiert ``bild`` mit Pillow als Einzelbild-GIF und zerlegt die Datei.
+
+    Liefert Breite/Höhe (4 Bytes), Farbtabelle, Graphic-Control-Flags,
+    Transparenzindex, Image-Deskriptor und die LZW-Bilddaten.
+    """
+    buf = BytesIO()
+    bild.save(buf, format="GIF", optimize=False)
+    daten = buf.getbuffer()
+    flags = daten[10]
+    pos = 13 + (3 << ((flags & 7) + 1) if flags & 0x80 else 0)
+    farbtabelle = bytes(daten[13:pos])
+    steuerung, transparent = 0, 0  # Graphic Control ohne Transparenz
+    while daten[pos] == 0x21:  # Erweiterungen überspringen
+        if daten[pos + 1] == 0xF9:
+            steuerung, transparent = daten[pos + 3], daten[pos + 6]
+        pos += 2
+        while daten[pos]:
+            pos += daten[pos] + 1
+        pos += 1
+    deskriptor = bytearray(daten[pos : pos + 10])
+    pos += 10
+    if deskriptor[9] & 0x80:  # lokale Farbtabelle
+        farbtabelle = bytes(daten[pos : pos + (3 << ((deskriptor[9] & 7) + 1))])
+        pos += len(farbtabelle)
+    elif farbtabelle:
+        deskriptor[9] = (deskriptor[9] & 0x40) | 0x80 | (flags & 7)
+    groesse = bytes(daten[6:10])
+    return groesse, farbtabelle, steuerung, transparent, deskriptor, daten[pos:-1]
+
+
+class GIF_Strom:
+    """Schreibt ein animiertes GIF Bild für Bild mit konstantem Speicherbedarf.
+
+    Ohne Palette wird jedes Bild von Pillow einzeln kodiert (gleiche
+    Quantisierung wie bei ``save_all``) und mit eigener Farbtabelle
+    angehängt. Mit ``optimieren`` oder einer ``palette`` (sonst aus dem
+    ersten Bild bestimmt) gibt es eine globale Farbtabelle, nur das
+    geänderte Rechteck eines Frames wird gespeichert (unveränderte Pixel
+    transparent) und identische Frames verlängern den vorigen. Im Speicher
+    liegen nur der vorige Frame und der noch nicht geschriebene.
+    """
+
+    def __init__(self, dateiname, fps, loop=0, optimieren=False, palette=None):
+        self._datei = open(dateiname, "wb")
+        self._dauer = int(1000 / fps / 10)  # in 1/100 s, wie bei Pillow
+        self._loop = loop
+        self._optimieren = optimieren or palette is not None
+        self._palette = palette
+        self._vorher = None  # Palettenindizes des vorigen Frames
+        self._ausstehend = None  # (Graphic-Control-Flags, Daten) des letzten Frames
+        self._ausstehend_dauer = 0
+        self.anzahl = 0
+        self.kodierzeit = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.schliessen()
+
+    def _Kopf_schreiben(self, groesse, farbtabelle):
+        flags = 0xF7 if farbtabelle else 0x00  # globale Tabelle mit 256 Farben
+        self._datei.write(b"GIF89a" + groesse + bytes([flags, 0, 0]) + farbtabelle)
+        self._datei.write(
+            b"\x21\xff\x0bNETSCAPE2.0\x03\x01"
+            + self._loop.to_bytes(2, "little")
+            + b"\x00"
+        )
+
+    def _Frame_schreiben(self, steuerung, transparent, dauer, daten):
+        self._datei.write(
+            b"\x21\xf9\x04"
+            + bytes([steuerung])
+            + dauer.to_bytes(2, "little")
+            + bytes([transparent, 0])
+        )
+        self._datei.write(daten)
+
+    def _ausstehend_schreiben(self):
+        if self._ausstehend is not None:
+            steuerung, daten = self._ausstehend
+            self._Frame_schreiben(
+                steuerung, _Transparent, self._ausstehend_dauer, daten
+            )
+            self._ausstehend = None
+
+    def anhaengen(self, bild):
+        """Hängt ein Bild als nächsten Frame an: NumPy-Array, PIL-Bild oder
+        (im optimierten Modus) bereits quantisierte Palettenindizes."""
+        start = time.perf_counter()
+        with profil.Abschnitt("encode"):
+            if self._optimieren:
+                self._optimiert_anhaengen(bild)
+            else:
+                groesse, farbtabelle, steuerung, transparent, deskriptor, daten = (
+                    _GIF_zerlegen(_RGB(bild))
+                )
+                if self.anzahl == 0:
+                    self._Kopf_schreiben(groesse, b"")
+                self._Frame_schreiben(
+                    steuerung,
+                    transparent,
+                    self._dauer,
+                    deskriptor + farbtabelle + daten,
+                )
+        self.anzahl += 1
+        self.kodierzeit += time.perf_counter() - start
+
+    def _optimiert_anhaengen(self, bild):
+        if self._palette is None:
+            self._palette = Palette_bestimmen([bild])
+        if isinstance(bild, np.ndarray) and bild.ndim == 2:
+            indizes = bild
+        else:
+            indizes = Bild_quantisieren(bild, self._palette)
+        if self._vorher is None:
+            y0, x0 = 0, 0
+            teil = indizes
+        else:
+            geaendert = indizes != self._vorher
+            if not geaendert.any():
+                # Doppelter Frame: vorigen einfach länger zeigen
+                self._ausstehend_dauer += self._dauer
+                return
+            zeilen = np.flatnonzero(geaendert.any(axis=1))
+            spalten = np.flatnonzero(geaendert.any(axis=0))
+            y0, y1 = zeilen[0], zeilen[-1] + 1
+            x0, x1 = spalten[0], spalten[-1] + 1
+            teil = np.where(
+                geaendert[y0:y1, x0:x1], indizes[y0:y1, x0:x1], _Transparent
+            ).astype(np.uint8)
+        hoehe, breite = teil.shape
+        p_bild = Image.frombytes("P", (breite, hoehe), np.ascontiguousarray(teil))
+        # Volle Tabelle mit 256 Farben, damit Pillow 8-Bit-Codes schreibt
+        tabelle = np.zeros((256, 3), dtype=np.uint8)
+        tabelle[: len(self._palette)] = self._palette
+        p_bild.putpalette(tabelle.tobytes())
+        groesse, farbtabelle, _, _, pillow_deskriptor, daten = _GIF_zerlegen(p_bild)
+        if self._vorher is None:
+            self._Kopf_schreiben(groesse, farbtabelle)
+        self._ausstehend_schreiben()
+        # Image-Deskriptor mit Versatz, ohne lokale Farbtabelle (Interlace wie Pillow)
+        deskriptor = (
+            b"\x2c"
+            + b"".join(int(v).to_bytes(2, "little") for v in (x0, y0, breite, hoehe))
+            + bytes([pillow_deskriptor[9] & 0x40])
+        )
+        # Disposal 1 (stehen lassen) und Transparenz für unveränderte Pixel
+        self._ausstehend = (0x05, deskriptor + daten)
+        self._ausstehend_dauer = self._dauer
+        self._vorher = indizes
+
+    def schliessen(self):
+        """Schreibt den letzten Frame und den GIF-Trailer und schließt die Datei."""
+        if not self._datei.closed:
+            self._ausstehend_schreiben()
+            self._datei.write(b";")
+            self._datei.close()
+
+
+# Standard-Codecs je Dateiendung für Video_Strom
+_Videocodecs = {".mp4": "libx264", ".webm": "libvpx-vp9"}
+
+
+class Video_Strom:
+    """Schreibt RGB-Frames direkt in einen ffmpeg-Prozess (MP4, WebM, ...).
+
+    Benutzt das ffmpeg von ``imageio-ffmpeg``; die Frames gehen roh über eine
+    Pipe an den Encoder, ohne GIF-Zwischenschritt. Gleiche Schnittstelle wie
+    ``GIF_Strom``.
+    """
+
+    def __init__(self, dateiname, fps, codec=None, crf=20, pix_fmt="yuv420p"):
+        self._dateiname = dateiname
+        self._fps = fps
+        self._codec = codec or _Videocodecs.get(
+            os.path.splitext(dateiname)[1].lower(), "libx264"
+        )
+        self._crf = crf
+        self._pix_fmt = pix_fmt
+        self._ffmpeg = None
+        self.anzahl = 0
+        self.kodierzeit = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.schliessen()
+
+    def anhaengen(self, bild):
+        """Hängt ein Bild (NumPy-Array oder PIL-Bild) als nächsten Frame an."""
+        start = time.perf_counter()
+        rgb = np.ascontiguousarray(np.asarray(_RGB(bild)))
+        if self._ffmpeg is None:
+            import imageio_ffmpeg
+
+            parameter = ["-crf", str(self._crf)]
+            if self._codec == "libvpx-vp9":
+                parameter += ["-b:v", "0"]  # reine Qualitätssteuerung über CRF
+            self._ffmpeg = imageio_ffmpeg.write_frames(
+                self._dateiname,
+                (rgb.shape[1], rgb.shape[0]),
+                fps=self._fps,
+                codec=self._codec,
+                quality=None,
+                pix_fmt_out=self._pix_fmt,
+                macro_block_size=2,  # yuv420p braucht gerade Maße
+                output_params=parameter,
+            )
+            self._ffmpeg.send(None)
+        with profil.Abschnitt("encode"):
+            self._ffmpeg.send(rgb)
+        self.anzahl += 1
+        self.kodierzeit += time.perf_counter() - start
+
+    def schliessen(self):
+        """Beendet den Encoder und wartet, bis die Datei geschrieben ist."""
+        if self._ffmpeg is not None:
+            start = time.perf_counter()
+            with profil.Abschnitt("encode"):
+                self._ffmpeg.close()
+            self._ffmpeg = None
+            self.kodierzeit += time.perf_counter() - start
+
+
+def Video_speichern(bilder, dateiname, fps, **optionen):
+    """Schreibt ``bilder`` (beliebige Folge) über ``Video_Strom`` und gibt den
+    Bericht aus. ``optionen`` gehen an ``Video_Strom`` (codec, crf, pix_fmt)."""
+    with Video_Strom(dateiname, fps, **optionen) as video:
+        for bild in bilder:
+            video.anhaengen(bild)
+    Ausgabe_Bericht(dateiname, video.anzahl, video.kodierzeit)
+
+
+def _Gruppe_rendern(render_frame, gruppe):
+    return [render_frame(frame) for frame in gruppe]
+
+
+def Frame_Gruppen(anzahl, Halbperiode=False):
+    """Teilt die Frames in Aufgaben auf; mit ``Halbperiode`` landen k und k + anzahl/2
+    im selben Worker, damit dessen Halbperioden-Cache greift."""
+    if Halbperiode and anzahl % 2 == 0:
+        return [(k, k + anzahl // 2) for k in range(anzahl // 2)]
+    return [(k,) for k in range(anzahl)]
+
+
+def Frames_parallel_rendern(render_frame, anzahl, Prozesse, Halbperiode=False):
+    """Ruft ``render_frame(frame)`` für alle Frames in einem Prozesspool auf.
+
+    ``render_frame`` muss eine Funktion auf Modulebene sein. Gibt die
+    Ergebnisse als Liste in Frame-Reihenfolge zurück.
+    """
+    gruppen = Frame_Gruppen(anzahl, Halbperiode)
+    ergebnisse = [None] * anzahl
+    kontext = multiprocessing.get_context("fork")
+    with kontext.Pool(Prozesse) as pool:
+        for gruppe, bilder in zip(
+            gruppen, pool.imap(partial(_Gruppe_rendern, render_frame), gruppen)
+        ):
+            for frame, bild in zip(gruppe, bilder):
+                ergebnisse[frame] = bild
+    return ergebnisse
+
+
+def _Frames_liefern(render_frame, frames, schlange):
+    """Worker von ``Frames_parallel_iterieren``: rendert ``frames`` der Reihe
+    nach und legt ``(frame, bild)`` in ``schlange`` ab (blockiert, wenn sie
+    voll ist)."""
+    try:
+        for frame in frames:
+            schlange.put((frame, render_frame(frame)))
+    except BaseException:
+        schlange.put((None, traceback.format_exc()))
+
+
+def _Frame_holen(schlange, prozess):
+    """Nächstes Ergebnis aus ``schlange``; Fehler im Worker werden hier
+    ausgelöst, auch wenn ``prozess`` ohne Ergebnis beendet wurde."""
+    while True:
+        try:
+            frame, bild = schlange.get(timeout=1.0)
+        except queue.Empty:
+            if not prozess.is_alive():
+                raise RuntimeError(
+                    f"Renderprozess {prozess.pid} beendet "
+                    f"(Exit-Code {prozess.exitcode})."
+                ) from None
+            continue
+        if frame is None:
+            raise RuntimeError(f"Fehler im Renderprozess:\n{bild}")
+        return bild
+
+
+def Frames_parallel_iterieren(
+    render_frame, anzahl, Prozesse, Halbperiode=False, Vorlauf=2
+):
+    """Wie ``Frames_parallel_rendern``, liefert die Ergebnisse aber einzeln in
+    Frame-Reihenfolge, statt alle zu sammeln.
+
+    Die Gruppen aus ``Frame_Gruppen`` werden reihum fest auf die Worker
+    verteilt; jeder rendert seine Frames aufsteigend, also mit
+    ``Halbperiode`` k und später k + anzahl/2 (Halbperioden-Cache greift).
+    Jeder Worker läuft höchstens ``Vorlauf`` Bilder voraus, ein langsamer
+    Encoder hält die Worker an, statt Bilder im Hauptprozess zu stapeln.
+    """
+    gruppen = Frame_Gruppen(anzahl, Halbperiode)
+    Prozesse = max(1, min(Prozesse, len(gruppen)))
+    besitzer = [0] * anzahl
+    auftraege = [[] for _ in range(Prozesse)]
+    for i, gruppe in enumerate(gruppen):
+        for frame in gruppe:
+            besitzer[frame] = i % Prozesse
+            auftraege[i % Prozesse].append(frame)
+    kontext = multiprocessing.get_context("fork")
+    schlangen = [kontext.Queue(Vorlauf) for _ in range(Prozesse)]
+    prozesse = [
+        kontext.Process(
+            target=_Frames_liefern,
+            args=(render_frame, sorted(frames), schlange),
+            daemon=True,
+        )
+        for frames, schlange in zip(auftraege, schlangen)
+    ]
+    for prozess in prozesse:
+        prozess.start()
+    try:
+        for frame in range(anzahl):
+            nummer = besitzer[frame]
+            yield _Frame_holen(schlangen[nummer], prozesse[nummer])
+    finally:
+        for prozess in prozesse:
+            if prozess.is_alive():
+                prozess.terminate()
+            prozess.join()
+        for schlange in schlangen:
+            schlange.close()
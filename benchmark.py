@@ -0,0 +1,336 @@
+"""Reproduzierbare Zeitmessungen der rechen- und renderintensiven Teile.
+
+Gemessen werden bei festen Konfigurationen:
+
+- Feldauswertung ``E_berechnen``, ``H_berechnen``, ``S_berechnen`` auf einem
+  Gitter (Punkte/s)
+- ``Folgepkt`` (RK4-Schritte/s) und ``E_Linie_berechnen`` (eine Linie)
+- ``Frame_Geometrie``: alle Feldlinien eines Frames (Schritte/s, Linien je Frame)
+- Grenzlinien und Startpunkte (``Grenzlinien_berechnen`` und
+  ``Linienstarts_berechnen``) für eine ganze Periode
+- ein ``update(frame)`` der beiden 2D-Skripte und ein Frame des 3D-Skripts
+  (Aufbau über ``varianten.Skript_laden``, ohne Cache und Halbperiode)
+- GIF- und MP4-Kodierung von 2D-Frames
+
+Jede Messung läuft einmal zum Aufwärmen und dann ``Wiederholungen`` Mal; die
+kürzeste Zeit zählt. Die Ergebnisse werden als JSON gespeichert und können mit
+einer früher gespeicherten Basis verglichen werden; wird ein Teil um mehr als
+``Schwelle`` langsamer, endet ``python benchmark.py`` mit Status 1. Basis und
+Messung sollten vom selben Rechner stammen.
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from functools import partial
+
+import numpy as np
+
+import ausgabe
+import dipole
+import dipolfeld
+import feldlinien
+import varianten
+
+_Wiederholungen = 5
+_Schwelle = 0.25  # erlaubte Verlangsamung gegenüber der Basis (0.25 = 25 %)
+_Ergebnisdatei = "benchmark.json"
+
+# Feste Konfiguration: Zeitpunkt, Gitter und Feldlinien wie in den Skripten
+_Wellenlaenge = dipolfeld._Wellenlaenge
+_T = _Wellenlaenge / dipolfeld._c
+_t = 0.3 * _T
+_Gitterpunkte = 512  # je Achse
+_Groessenfaktor = 2
+_Schritte_Folgepkt = 2000
+_x_Start = 50.0  # Startpunkt der einzelnen Feldlinie
+_Phasen = 100  # Frames für Grenzlinien und Startpunkte
+_Kodierframes = 16
+
+# Skriptkonstanten für update/Frame: seriell, ohne Cache und ohne Halbperiode,
+# damit jeder Aufruf wirklich rechnet
+_Skriptwerte_3D = dict(
+    _Periode=64,
+    _Prozesse=1,
+    _Groessenfaktor=_Groessenfaktor,
+    Hertzdipol=True,
+    Stabdipol=False,
+    Cache_Flag=False,
+    Geometrie_Stufe=None,
+    Adaptiv_Flag=False,
+    Stromfunktion_Flag=False,
+    Halbperioden_Flag=False,
+)
+_Skriptwerte_E = dict(_Skriptwerte_3D, _dpi=100, Render_Benchmark=False)
+_nur_E = ("Adaptiv_Flag", "Stromfunktion_Flag", "Halbperioden_Flag", "Cache_Flag")
+_Skriptwerte_H = {
+    name: wert for name, wert in _Skriptwerte_E.items() if name not in _nur_E
+}
+_Frame = 7  # gemessener Frame der Skripte
+
+_Benchmarks = {}
+
+
+def _Benchmark(funktion):
+    """Registriert ``funktion``: sie bereitet die Messung vor und gibt
+    ``(aufruf, Menge, Einheit, Zusatzangaben)`` zurück."""
+    _Benchmarks[funktion.__name__.lstrip("_")] = funktion
+    return funktion
+
+
+def _Gitter():
+    x = np.linspace(
+        -_Wellenlaenge * _Groessenfaktor, _Wellenlaenge * _Groessenfaktor, _Gitterpunkte
+    )
+    return np.meshgrid(x + 0.5, x + 0.5)
+
+
+@_Benchmark
+def _E_berechnen():
+    X, Y = _Gitter()
+    return partial(dipolfeld.E_berechnen, _t, X, Y), X.size, "points/s", {}
+
+
+@_Benchmark
+def _H_berechnen():
+    X, Y = _Gitter()
+    return partial(dipolfeld.H_berechnen, _t, X, Y), X.size, "points/s", {}
+
+
+@_Benchmark
+def _S_berechnen():
+    X, Y = _Gitter()
+    return partial(dipolfeld.S_berechnen, _t, X, Y), X.size, "points/s", {}
+
+
+@_Benchmark
+def _Folgepkt():
+    def aufruf():
+        x, y = _x_Start, 0.0
+        for _ in range(_Schritte_Folgepkt):
+            x, y = feldlinien.Folgepkt(x, y, 1, _t, dipolfeld.E_berechnen)
+
+    return aufruf, _Schritte_Folgepkt, "steps/s", {}
+
+
+@_Benchmark
+def _E_Linie_berechnen():
+    pts, _ = feldlinien.E_Linie_berechnen(_t, _x_Start)
+    aufruf = partial(feldlinien.E_Linie_berechnen, _t, _x_Start)
+    return aufruf, len(pts) - 1, "steps/s", {"Punkte": len(pts)}
+
+
+@_Benchmark
+def _Frame_Geometrie():
+    aufruf = partial(feldlinien.Frame_Geometrie, _t, _Groessenfaktor)
+    linien = aufruf()["Linien"]
+    schritte = sum(len(pts) - 1 for pts in linien)
+    return aufruf, schritte, "steps/s", {"Linien": len(linien)}
+
+
+@_Benchmark
+def _Grenzlinien_Linienstarts():
+    def aufruf():
+        for k in range(_Phasen):
+            grenzlinien = feldlinien.Grenzlinien_berechnen(
+                k * _T / _Phasen, _Groessenfaktor
+            )
+            feldlinien.Linienstarts_berechnen(grenzlinien)
+
+    return aufruf, _Phasen, "frames/s", {}
+
+
+def _Skript(animation, werte):
+    """Baut das Skript zu ``animation`` auf (Pfad unabhängig vom
+    Arbeitsverzeichnis, siehe ``dipole.Skriptpfad``)."""
+    skript = dipole.Skriptpfad(animation)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return varianten.Skript_laden(varianten.Parameter(skript, **werte))
+
+
+def _ohne_Ausgabe(funktion, *argumente):
+    """``funktion(*argumente)`` ohne Fortschrittsbalken und Berichte."""
+
+    def aufruf():
+        with contextlib.redirect_stdout(io.StringIO()):
+            funktion(*argumente)
+
+    return aufruf
+
+
+@_Benchmark
+def _update_E_2D():
+    skript = _Skript("e2d", _Skriptwerte_E)
+    return _ohne_Ausgabe(skript.update, _Frame), 1, "frames/s", {}
+
+
+@_Benchmark
+def _update_H_2D():
+    skript = _Skript("h2d", _Skriptwerte_H)
+    return _ohne_Ausgabe(skript.update, _Frame), 1, "frames/s", {}
+
+
+@_Benchmark
+def _Frame_EH_3D():
+    skript = _Skript("eh3d", _Skriptwerte_3D)
+    return _ohne_Ausgabe(skript.Frame_rendern, _Frame), 1, "frames/s", {}
+
+
+def _Kodierbilder():
+    skript = _Skript("e2d", _Skriptwerte_E)
+    bilder = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for frame in range(_Kodierframes):
+            skript.update(frame)
+            bilder.append(np.asarray(ausgabe.Figur_rgba(skript.fig, skript._dpi)))
+    return bilder
+
+
+@_Benchmark
+def _GIF_kodieren():
+    bilder = _Kodierbilder()
+    dateiname = os.path.join(tempfile.mkdtemp(), "benchmark.gif")
+
+    aufruf = _ohne_Ausgabe(
+        partial(ausgabe.GIF_speichern, optimieren=True), bilder, dateiname, 20
+    )
+    return (
+        aufruf,
+        len(bilder),
+        "frames/s",
+        {"Pixel": bilder[0].shape[0] * bilder[0].shape[1]},
+    )
+
+
+@_Benchmark
+def _MP4_kodieren():
+    bilder = _Kodierbilder()
+    dateiname = os.path.join(tempfile.mkdtemp(), "benchmark.mp4")
+
+    aufruf = _ohne_Ausgabe(ausgabe.Video_speichern, bilder, dateiname, 20)
+    return (
+        aufruf,
+        len(bilder),
+        "frames/s",
+        {"Pixel": bilder[0].shape[0] * bilder[0].shape[1]},
+    )
+
+
+def Messen(aufruf, Wiederholungen=_Wiederholungen):
+    """Kürzeste und mittlere Laufzeit von ``aufruf()`` nach einem Aufwärmlauf."""
+    aufruf()
+    zeiten = []
+    for _ in range(Wiederholungen):
+        start = time.perf_counter()
+        aufruf()
+        zeiten.append(time.perf_counter() - start)
+    return min(zeiten), statistics.median(zeiten)
+
+
+def Benchmarks_ausfuehren(namen=None, Wiederholungen=_Wiederholungen):
+    """Führt die Benchmarks ``namen`` (alle, wenn None) aus und gibt das
+    Ergebnis-Dict (wie in der JSON-Datei) zurück."""
+    namen = list(_Benchmarks) if namen is None else namen
+    unbekannt = [name for name in namen if name not in _Benchmarks]
+    if unbekannt:
+        raise ValueError(
+            f"Unbekannte Benchmarks {', '.join(unbekannt)} "
+            f"(vorhanden: {', '.join(_Benchmarks)})."
+        )
+    ergebnisse = {}
+    for name in namen:
+        aufruf, menge, einheit, zusatz = _Benchmarks[name]()
+        bestzeit, median = Messen(aufruf, Wiederholungen)
+        ergebnisse[name] = dict(
+            Sekunden=bestzeit,
+            Median=median,
+            Rate=menge / bestzeit,
+            Einheit=einheit,
+            **zusatz,
+        )
+        print(
+            f"{name:28s} {bestzeit * 1e3:10.2f} ms {menge / bestzeit:14.1f} {einheit}"
+        )
+    return dict(
+        Zeitpunkt=datetime.datetime.now().isoformat(timespec="seconds"),
+        Python=platform.python_version(),
+        NumPy=np.__version__,
+        Plattform=platform.platform(),
+        Wiederholungen=Wiederholungen,
+        Ergebnisse=ergebnisse,
+    )
+
+
+def Vergleichen(messung, basis, Schwelle=_Schwelle):
+    """Vergleicht zwei Ergebnis-Dicts und gibt die Namen der Teile zurück, die
+    um mehr als ``Schwelle`` langsamer geworden sind."""
+    langsamer = []
+    print(f"\n{'':28s} {'baseline':>10s} {'now':>10s} {'ratio':>7s}")
+    for name, neu in messung["Ergebnisse"].items():
+        alt = basis["Ergebnisse"].get(name)
+        if alt is None:
+            print(f"{name:28s} {'-':>10s} {neu['Sekunden'] * 1e3:8.2f}ms")
+            continue
+        verhaeltnis = neu["Sekunden"] / alt["Sekunden"]
+        zu_langsam = verhaeltnis > 1 + Schwelle
+        if zu_langsam:
+            langsamer.append(name)
+        print(
+            f"{name:28s} {alt['Sekunden'] * 1e3:8.2f}ms {neu['Sekunden'] * 1e3:8.2f}ms "
+            f"{verhaeltnis:7.2f}{'  SLOWER' if zu_langsam else ''}"
+        )
+    return langsamer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time the field, tracing, seeding, rendering and encoding paths."
+    )
+    parser.add_argument(
+        "namen",
+        nargs="*",
+        help=f"benchmarks to run (default: all of {', '.join(_Benchmarks)})",
+    )
+    parser.add_argument(
+        "-o", "--output", default=_Ergebnisdatei, help="JSON file for the results"
+    )
+    parser.add_argument(
+        "--baseline", help="JSON file of an earlier run to compare with"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=_Schwelle,
+        help="allowed slowdown against the baseline (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=_Wiederholungen,
+        help="timed runs per benchmark",
+    )
+    args = parser.parse_args()
+    basis = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as datei:
+            basis = json.load(datei)
+    messung = Benchmarks_ausfuehren(args.namen or None, args.repeat)
+    with open(args.output, "w", encoding="utf-8") as datei:
+        json.dump(messung, datei, indent=2)
+    print(f"\nResults written to {args.output}")
+    if basis is not None:
+        langsamer = Vergleichen(messung, basis, args.threshold)
+        if langsamer:
+            print(
+                f"\n{len(langsamer)} slower than the baseline: {', '.join(langsamer)}"
+            )
+            sys.exit(1)
@@ -0,0 +1,146 @@
+"""Gemeinsamer Aufruf für Animationen, Sweeps und Konvertierung.
+
+    python dipole.py render e2d|h2d|eh3d [-s NAME=WERT ...] [--name NAME]
+    python dipole.py constants e2d|h2d|eh3d
+    python dipole.py sweep varianten.json
+    python dipole.py convert [DIR] [-j JOBS] [--force]
+
+``render`` führt das Skript aus wie ``python DIPOLANIMATION_....py``; mit
+``-s`` lassen sich Konstanten ändern wie in einem Sweep (siehe varianten.py),
+z. B. ``-s _Periode=20 -s Geometrie_Stufe=berechnen``. Werte werden als
+Python-Literal gelesen, sonst als Text. Ohne ``--name`` bleibt der
+Ausgabename des Skripts.
+
+Die Module eines Befehls werden erst geladen, wenn er feststeht: ``--help``
+kommt ohne NumPy aus, Matplotlib bzw. PyVista lädt erst das Skript beim
+Rendern und MoviePy erst die Konvertierung.
+"""
+
+import argparse
+import ast
+import os
+
+_Verzeichnis = os.path.dirname(os.path.abspath(__file__))
+_Skripte = {
+    "e2d": "DIPOLANIMATION_E_ARROWS.py",
+    "h2d": "DIPOLANIMATION_H_ARROWS.py",
+    "eh3d": "DIPOLANIMATION_EH_3D.py",
+}
+
+
+def Skriptpfad(animation):
+    """Pfad des Skripts zu ``animation`` (``"e2d"``, ``"h2d"`` oder ``"eh3d"``)."""
+    return os.path.join(_Verzeichnis, _Skripte[animation])
+
+
+def _Wert(text):
+    """``"20"`` -> 20, ``"True"`` -> True, ``"berechnen"`` -> ``"berechnen"``."""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def _Zuweisung(text):
+    name, gleich, wert = text.partition("=")
+    if not gleich or not name.isidentifier():
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+    return name, _Wert(wert)
+
+
+def Rendern(animation, werte=None, name=None):
+    """Rendert ``animation`` mit den geänderten Konstanten ``werte`` im
+    aktuellen Prozess und gibt die Laufzeit in Sekunden zurück."""
+    import varianten
+
+    skript = Skriptpfad(animation)
+    werte = dict(werte or {})
+    if name is None:
+        werte.setdefault(
+            "_Ausgabename",
+            ast.literal_eval(varianten.Konstanten(skript)["_Ausgabename"]),
+        )
+    return varianten.Variante_rendern(varianten.Parameter(skript, name, **werte))
+
+
+def _Befehl_render(args):
+    sekunden = Rendern(args.animation, dict(args.set), args.name)
+    print(f"\n{args.animation}: {sekunden:.1f} s")
+
+
+def _Befehl_constants(args):
+    import varianten
+
+    for name, wert in varianten.Konstanten(Skriptpfad(args.animation)).items():
+        print(f"{name} = {wert}")
+
+
+def _Befehl_sweep(args):
+    import varianten
+
+    varianten.Varianten_rendern(varianten.Varianten_laden(args.datei))
+
+
+def _Befehl_convert(args):
+    import gif2mp4
+
+    gif2mp4.convert_all_gifs_in_dir(args.root, workers=args.jobs, force=args.force)
+
+
+def _Parser():
+    parser = argparse.ArgumentParser(
+        prog="dipole", description="Dipole field animations."
+    )
+    befehle = parser.add_subparsers(dest="befehl", required=True)
+
+    render = befehle.add_parser("render", help="render one animation")
+    render.add_argument("animation", choices=_Skripte)
+    render.add_argument(
+        "-s",
+        "--set",
+        type=_Zuweisung,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="change a constant of the script (repeatable)",
+    )
+    render.add_argument(
+        "--name", help="output name (default: the script's _Ausgabename)"
+    )
+    render.set_defaults(ausfuehren=_Befehl_render)
+
+    konstanten = befehle.add_parser(
+        "constants", help="list the constants that -s can change"
+    )
+    konstanten.add_argument("animation", choices=_Skripte)
+    konstanten.set_defaults(ausfuehren=_Befehl_constants)
+
+    sweep = befehle.add_parser("sweep", help="render many variants in one process")
+    sweep.add_argument("datei", help="JSON file with the variants")
+    sweep.set_defaults(ausfuehren=_Befehl_sweep)
+
+    convert = befehle.add_parser("convert", help="convert GIFs below DIR to MP4")
+    convert.add_argument(
+        "root", nargs="?", default=None, help="directory (default: current)"
+    )
+    convert.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="number of parallel conversions",
+    )
+    convert.add_argument(
+        "--force", action="store_true", help="also convert up-to-date files"
+    )
+    convert.set_defaults(ausfuehren=_Befehl_convert)
+    return parser
+
+
+def main(argv=None):
+    args = _Parser().parse_args(argv)
+    args.ausfuehren(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""Gemeinsame, vektorisierte Feldberechnung für Hertzdipol und Stabdipol.
+
+Alle Funktionen nehmen für ``t``, ``x`` und ``y`` Skalare oder NumPy-Arrays
+beliebiger (gegeneinander broadcastbarer) Form entgegen und liefern Werte
+derselben Form zurück. Singuläre Punkte (r = 0, x = 0 beim Stabdipol) werden
+über Masken auf 0 gesetzt, genau wie in den früheren skalaren Versionen mit
+``if r == 0``. Mit ``out=`` können vorab angelegte Arrays übergeben werden;
+die letzten Rechenschritte schreiben die Ergebnisse direkt hinein.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+import profil
+
+# Physikalische Konstanten
+_c = 299792458  # Lichtgeschwindigkeit
+_c2 = 8.9876e16  # Lichtgeschwindigkeit^2
+_epsilon0 = 8.8542e-12
+_my0 = 1.2566e-6
+_Z0 = 376.7303134
+
+# Standardwerte der Dipol-Parameter (wie in den Animationsskripten)
+_p0 = 100.0  # Amplitude des Dipolvektors
+_Wellenlaenge = 256.0  # Wellenlaenge (Simulationseinheiten)
+_Stabfaktor = 40.0
+
+
+def _ziele(out, form, anzahl):
+    """Zielarrays der Endergebnisse: ``out`` bzw. ``anzahl`` neue Arrays der
+    Form ``form``; die letzten Rechenschritte schreiben direkt hinein."""
+    if out is None:
+        return tuple(np.empty(form) for _ in range(anzahl))
+    return out
+
+
+def _ergebnis(werte, out):
+    """Gibt ``out`` bzw. die Ergebnisse zurück (Skalare für 0-d Eingaben)."""
+    if out is not None:
+        return out
+    return tuple(w[()] for w in werte)
+
+
+def _E_skalar(t, x, y, p0, w, Stabdipol):
+    """Skalarer Pfad von E_berechnen (spart den Array-Overhead bei Einzelpunkten)."""
+    if not Stabdipol:
+        r2 = x * x + y * y
+        r = math.sqrt(r2)
+        if r == 0:
+            return (0.0, 0.0, 0.0)
+        wtt = w * (t - r / _c)
+        p = p0 * math.cos(wtt)
+        pd1 = -w * p0 * math.sin(wtt)
+        cosa = y / r
+        Efy = (w**2 * p) / (_c2 * r)
+        Ep = Efy - pd1 / (_c * r2) - p / (r2 * r)
+        Er = 3 * pd1 / (_c * r2) - Efy + 3 * p / (r2 * r)
+        Er *= cosa
+        Ex = Er * (x / r)
+        Ey = Er * cosa + Ep
+    else:
+        Lamda_viertel = 2 * math.pi * _c / w / 4.0
+        Lplus = y + Lamda_viertel
+        Lminus = y - Lamda_viertel
+        rplus = math.sqrt(x * x + Lplus * Lplus)
+        rminus = math.sqrt(x * x + Lminus * Lminus)
+        if rplus == 0 or rminus == 0:
+            return (0.0, 0.0, 0.0)
+        sinplus = (1.0 / rplus) * math.cos(w * (t - rplus / _c))
+        sinminus = (1.0 / rminus) * math.cos(w * (t - rminus / _c))
+        Ey = (sinplus + sinminus) / _Stabfaktor
+        if x == 0:
+            Ex = 0.0
+        else:
+            Ex = -((Lplus / x * sinplus) + (Lminus / x * sinminus)) / _Stabfaktor
+    return (Ex, Ey, math.sqrt(Ex * Ex + Ey * Ey))
+
+
+# E-Feld berechnen
+def E_berechnen(t, x, y, p0=_p0, Wellenlaenge=_Wellenlaenge, Stabdipol=False, out=None):
+    """Berechnet (Ex, Ey, |E|) an den Punkten (x, y) zur Zeit t.
+
+    ``out`` ist optional ein Tupel aus drei Arrays für Ex, Ey und |E|.
+    """
+    w = 2 * np.pi * _c / Wellenlaenge
+    if out is None and all(isinstance(v, (int, float)) for v in (t, x, y)):
+        # Ohne Zähler: Skalare Aufrufe zählen die Linienverfolger je Linie
+        return _E_skalar(t, x, y, p0, w, Stabdipol)
+    t = np.asarray(t, dtype=float)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    form = np.broadcast(t, x, y)
+    profil.zaehlen("E evaluations", form.size)
+    Ex_ziel, Ey_ziel, E_ziel = _ziele(out, form.shape, 3)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if not Stabdipol:
+            r2 = x * x + y * y
+            r = np.sqrt(r2)
+            singulaer = r == 0
+            wtt = w * (t - r / _c)
+            p = p0 * np.cos(wtt)
+            pd1 = -w * p0 * np.sin(wtt)
+            cosa = y / r
+            Efy = (w**2 * p) / (_c2 * r)
+            Ep = Efy - pd1 / (_c * r2) - p / (r2 * r)
+            Er = 3 * pd1 / (_c * r2) - Efy + 3 * p / (r2 * r)
+            Er *= cosa
+            Ex = np.multiply(Er, x / r, out=Ex_ziel)
+            Ey = np.add(Er * cosa, Ep, out=Ey_ziel)
+        else:
+            Lamda_viertel = Wellenlaenge / 4.0
+            Lplus = y + Lamda_viertel
+            Lminus = y - Lamda_viertel
+            rplus = np.sqrt(x * x + Lplus * Lplus)
+            rminus = np.sqrt(x * x + Lminus * Lminus)
+            singulaer = (rplus == 0) | (rminus == 0)
+            sinplus = (1.0 / rplus) * np.cos(w * (t - rplus / _c))
+            sinminus = (1.0 / rminus) * np.cos(w * (t - rminus / _c))
+            Ey = np.divide(sinplus + sinminus, _Stabfaktor, out=Ey_ziel)
+            Ex = np.divide(
+                (Lplus / x * sinplus) + (Lminus / x * sinminus),
+                -_Stabfaktor,
+                out=Ex_ziel,
+            )
+            np.copyto(Ex, 0.0, where=x == 0)
+        np.copyto(Ex, 0.0, where=singulaer)
+        np.copyto(Ey, 0.0, where=singulaer)
+    E = np.sqrt(Ex * Ex + Ey * Ey, out=E_ziel)
+    return _ergebnis((Ex, Ey, E), out)
+
+
+# H-Feld berechnen (2D-Skripte)
+def H_berechnen(t, x, y, p0=_p0, Wellenlaenge=_Wellenlaenge, Stabdipol=False, out=None):
+    """Berechnet die H-Komponente senkrecht zur Zeichenebene an (x, y) zur Zeit t."""
+    t = np.asarray(t, dtype=float)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    w = 2 * np.pi * _c / Wellenlaenge
+    form = np.broadcast(t, x, y)
+    profil.zaehlen("H evaluations", form.size)
+    (H,) = _ziele(None if out is None else (out,), form.shape, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if not Stabdipol:
+            r2 = x * x + y * y
+            r = np.sqrt(r2)
+            singulaer = r == 0
+            wtt = w * (t - r / _c)
+            p = p0 * np.cos(wtt)
+            pd1 = w * p0 * np.sin(wtt)  # (Vorzeichen angepasst für z+-Richtung)
+            pd2 = w * w * p
+            sina = x / r
+            np.add(pd2 / (_c2 * r) * sina, pd1 / (_c * r2) * sina, out=H)
+        else:
+            Lamda_viertel = Wellenlaenge / 4.0
+            rplus = np.sqrt(x * x + (y + Lamda_viertel) ** 2)
+            rminus = np.sqrt(x * x + (y - Lamda_viertel) ** 2)
+            singulaer = (rplus == 0) | (rminus == 0) | (x == 0)
+            sinplus = np.cos(w * (t - rplus / _c))
+            sinminus = np.cos(w * (t - rminus / _c))
+            np.divide(sinplus + sinminus, x * _Stabfaktor, out=H)
+        np.copyto(H, 0.0, where=singulaer)
+    return _ergebnis((H,), None if out is None else (out,))[0]
+
+
+# H-Feld in der xy-Ebene berechnen (3D-Skript)
+def H_berechnen_3D(
+    t, x, y, p0=_p0, Wellenlaenge=_Wellenlaenge, Stabdipol=False, out=None
+):
+    """Berechnet H-Phi in der xy-Ebene an (x, y) zur Zeit t (Variante des 3D-Skripts)."""
+    t = np.asarray(t, dtype=float)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    w = 2 * np.pi * _c / Wellenlaenge
+    form = np.broadcast(t, x, y)
+    profil.zaehlen("H evaluations", form.size)
+    (H,) = _ziele(None if out is None else (out,), form.shape, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.sqrt(x * x + y * y)
+        if not Stabdipol:
+            wtt = w * (t - r / _c)
+            p = p0 * np.cos(wtt)
+            pd1 = -w * p0 * np.sin(wtt)
+            np.add(pd1 / (_Z0 * r), (w * p) / (_Z0 * _c * r), out=H)
+        else:
+            # Vereinfachtes Modell: H proportional zu current_I und ~1/r
+            current_I = p0 * np.sin(w * t)
+            np.divide(current_I, 2 * np.pi * r, out=H)
+        np.copyto(H, 0.0, where=r == 0)
+    return _ergebnis((H,), None if out is None else (out,))[0]
+
+
+# Poynting-Vektor (Energiestromdichte) berechnen
+def S_berechnen(t, x, y, p0=_p0, Wellenlaenge=_Wellenlaenge, Stabdipol=False, out=None):
+    """Berechnet (Sx, Sy, |S|) an (x, y) zur Zeit t (Variante der 2D-Skripte)."""
+    Ex, Ey, _ = E_berechnen(t, x, y, p0, Wellenlaenge, Stabdipol)
+    H = H_berechnen(t, x, y, p0, Wellenlaenge, Stabdipol)
+    Sx, Sy, S = _ziele(out, np.broadcast(Ey, H).shape, 3)
+    np.multiply(Ey, H, out=Sx)
+    np.multiply(Ex, H, out=Sy)
+    np.sqrt(Sx * Sx + Sy * Sy, out=S)
+    return _ergebnis((Sx, Sy, S), out)
+
+
+def S_berechnen_3D(
+    t, x, y, p0=_p0, Wellenlaenge=_Wellenlaenge, Stabdipol=False, out=None
+):
+    """Berechnet (Sx, Sy, |S|) in der xy-Ebene an (x, y) zur Zeit t (Variante des 3D-Skripts)."""
+    Ex, Ey, _ = E_berechnen(t, x, y, p0, Wellenlaenge, Stabdipol)
+    H_phi = H_berechnen_3D(t, x, y, p0, Wellenlaenge, Stabdipol)
+    Sx, Sy, S = _ziele(out, np.broadcast(Ey, H_phi).shape, 3)
+    np.multiply(Ey, H_phi, out=Sx)  # positiv nach außen (x-Richtung)
+    np.multiply(-Ex, H_phi, out=Sy)  # positiv nach außen (y-Richtung)
+    np.sqrt(Sx * Sx + Sy * Sy, out=S)
+    return _ergebnis((Sx, Sy, S), out)
+
+
+# Energiedichte berechnen (elektrisch + magnetisch)
+def Energiedichte_berechnen(
+    t, x, y, p0=_p0, Wellenlaenge=_Wellenlaenge, Stabdipol=False, out=None
+):
+    """Berechnet die Energiedichte eps0*E^2 + my0*H^2 an (x, y) zur Zeit t."""
+    _, _, E = E_berechnen(t, x, y, p0, Wellenlaenge, Stabdipol)
+    H = H_berechnen(t, x, y, p0, Wellenlaenge, Stabdipol)
+    (u,) = _ziele(None if out is None else (out,), np.broadcast(E, H).shape, 1)
+    np.add(_epsilon0 * E * E, _my0 * H * H, out=u)
+    return _ergebnis((u,), None if out is None else (out,))[0]
+
+
+def Quadranten_spiegeln(X, Y, U, V):
+    """Spiegelt Vektoren aus dem 1. Quadranten in alle vier Quadranten.
+
+    Reihenfolge je Punkt wie in den Skripten: rechts oben, links oben und, falls
+    Y != 0, rechts unten und links unten. Gibt (X, Y, U, V) als flache Arrays zurück.
+    """
+    X, Y, U, V = (np.ravel(a) for a in np.broadcast_arrays(X, Y, U, V))
+    XX = np.stack([X, -X, X, -X], axis=-1)
+    YY = np.stack([Y, Y, -Y, -Y], axis=-1)
+    UU = np.stack([U, -U, U, -U], axis=-1)
+    VV = np.stack([V, V, -V, -V], axis=-1)
+    behalten = np.ones(XX.shape, dtype=bool)
+    behalten[Y == 0, 2:] = False
+    return XX[behalten], YY[behalten], UU[behalten], VV[behalten]
+
+
+# Stokes-Stromfunktion des Hertzdipols (E-Feldlinien = Höhenlinien)
+def Stromfunktion_berechnen(t, x, y, p0=_p0, Wellenlaenge=_Wellenlaenge, out=None):
+    """Berechnet Psi = sin^2(theta) * (p(tt) / r + p'(tt) / c) mit tt = t - r/c.
+
+    Es gilt E_r = dPsi/dtheta / (r^2 sin(theta)) und
+    E_theta = -dPsi/dr / (r sin(theta)); die E-Feldlinien in der
+    Meridianebene sind also Höhenlinien von Psi. Bei r = 0 wird 0 geliefert.
+    """
+    t = np.asarray(t, dtype=float)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    w = 2 * np.pi * _c / Wellenlaenge
+    form = np.broadcast(t, x, y)
+    profil.zaehlen("stream function evaluations", form.size)
+    (Psi,) = _ziele(None if out is None else (out,), form.shape, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = x * x + y * y
+        r = np.sqrt(r2)
+        wtt = w * (t - r / _c)
+        p = p0 * np.cos(wtt)
+        pd1 = -w * p0 * np.sin(wtt)
+        np.multiply(x * x / r2, p / r + pd1 / _c, out=Psi)
+        np.copyto(Psi, 0.0, where=r == 0)
+    return _ergebnis((Psi,), None if out is None else (out,))[0]
+
+
+# Nullstellen von F(u, phi) = cos(phi - u) - u * sin(phi - u) mit u = k*x und
+# phi = w*t: dort beginnen auf der x-Achse die Grenzlinien des Hertzdipols.
+# F hängt nur von u und phi ab, die Tabelle gilt also für jede Wellenlänge.
+_Phasen = 2048  # Stützstellen der Nullstellentabelle pro Halbperiode
+_Rasterweite = 0.01  # Suchraster in u beim Aufbau der Tabelle
+_Nullstellen_Tabellen = {}  # (u_max, Phasen) -> Nullstellen je Phase, NaN-aufgefüllt
+_Tabellen_Sperre = threading.Lock()  # Aufbau auch aus mehreren Threads nur einmal
+
+
+def _F_Grenzlinie(u, phi):
+    zw = phi - u
+    return np.cos(zw) - u * np.sin(zw)
+
+
+def _Newton_Grenzlinie(u, phi, schritte, unten=None, oben=None):
+    """Newton-Schritte mit der analytischen Ableitung dF/du = u * cos(phi - u)."""
+    for _ in range(schritte):
+        zw = phi - u
+        Fu = u * np.cos(zw)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            schritt = (np.cos(zw) - u * np.sin(zw)) / Fu
+        u = u - np.where(np.isfinite(schritt), schritt, 0.0)
+        if unten is not None:
+            u = np.clip(u, unten, oben)
+    return u
+
+
+def Nullstellen_Tabelle(u_max, Phasen=_Phasen):
+    """Alle Nullstellen von F in (0, u_max] für ``Phasen`` Phasen in [0, pi).
+
+    Wegen F(u, phi + pi) = -F(u, phi) genügt eine halbe Periode. Die
+    Vorzeichenwechsel auf einem feinen u-Raster liefern die Klammern, einige
+    Newton-Schritte (auf die Klammer begrenzt) die Nullstellen. Ergebnis ist
+    ein (Phasen, n)-Array, jede Zeile aufsteigend und mit NaN aufgefüllt; es
+    wird pro (u_max, Phasen) nur einmal berechnet.
+    """
+    schluessel = (u_max, Phasen)
+    if schluessel in _Nullstellen_Tabellen:
+        return _Nullstellen_Tabellen[schluessel]
+    with _Tabellen_Sperre:
+        if schluessel in _Nullstellen_Tabellen:
+            return _Nullstellen_Tabellen[schluessel]
+        phi = np.arange(Phasen) * (np.pi / Phasen)
+        u = np.arange(1, int(np.ceil(u_max / _Rasterweite)) + 1) * _Rasterweite
+        zeilen, nullst = [], []
+        for start in range(0, Phasen, 256):  # blockweise, begrenzt den Speicher
+            werte = _F_Grenzlinie(u, phi[start : start + 256, np.newaxis])
+            i, j = np.nonzero(np.signbit(werte[:, :-1]) != np.signbit(werte[:, 1:]))
+            f1, f2 = werte[i, j], werte[i, j + 1]
+            u0 = u[j] - f1 * _Rasterweite / (f2 - f1)  # Sekante als Startwert
+            zeilen.append(i + start)
+            nullst.append(_Newton_Grenzlinie(u0, phi[i + start], 4, u[j], u[j + 1]))
+        zeilen, nullst = np.concatenate(zeilen), np.concatenate(nullst)
+        anzahl = np.bincount(zeilen, minlength=Phasen)
+        tabelle = np.full((Phasen, max(anzahl.max(), 1)), np.nan)
+        spalte = np.arange(len(zeilen)) - (np.cumsum(anzahl) - anzahl)[zeilen]
+        tabelle[zeilen, spalte] = nullst
+        _Nullstellen_Tabellen[schluessel] = tabelle
+    return _Nullstellen_Tabellen[schluessel]
+
+
+def Grenzlinien_Hertzdipol(t, x_min, x_max, Wellenlaenge=_Wellenlaenge):
+    """Nullstellen von F auf der x-Achse in [x_min, x_max] zur Zeit t (aufsteigend).
+
+    Ersetzt die Rastersuche mit Bisektion: Die Nullstellen der beiden
+    benachbarten Tabellenphasen werden mit zwei Newton-Schritten auf die
+    exakte Phase nachgeführt und doppelte Treffer zusammengefasst. Die
+    Tabelle reicht bis zur nächsten ganzen Zahl über k * x_max, damit sie
+    auch für andere Wellenlängen und Fenster wiederverwendet wird.
+    """
+    k = 2 * np.pi / Wellenlaenge
+    tabelle = Nullstellen_Tabelle(float(np.floor(k * x_max) + 2))
+    Phasen = len(tabelle)
+    phi = (k * _c * t) % np.pi
+    j = int(phi / np.pi * Phasen) % Phasen
+    # Zeile j + 1 am Periodenende ist Zeile 0 (Phase um pi verschoben)
+    u = np.concatenate((tabelle[j], tabelle[(j + 1) % Phasen]))
+    u = np.sort(_Newton_Grenzlinie(u[~np.isnan(u)], phi, 2))
+    u = u[
+        np.concatenate(([True], np.diff(u) > 1e-4))
+    ]  # echte Nullstellen: Abstand >> 1e-4
+    u = u[(u >= k * x_min) & (u <= k * x_max)]
+    return (u / k).tolist()
@@ -0,0 +1,798 @@
+"""Berechnung elektrischer Feldlinien in der oberen Halbebene.
+
+Enthält die skalare Referenz (``Folgepkt``/``E_Linie_berechnen``, eine Linie
+nach der anderen) und den gebündelten RK4-Integrator ``E_Linien_berechnen``,
+der alle Linien eines Frames gleichzeitig Schritt für Schritt vorantreibt.
+Optional integriert ``E_Linien_adaptiv_berechnen`` mit Dormand-Prince 5(4)
+und Schrittweitensteuerung (wenige große Schritte im glatten Fernfeld).
+Für den Hertzdipol liefert ``E_Linien_Stromfunktion`` dieselben Linien ganz
+ohne Integration als Höhenlinien der Stromfunktion auf einem Gitter.
+``Linien_vereinfachen`` dünnt die Punkte vor dem Zeichnen auf die
+Ausgabeauflösung aus. Die übrigen Hälften/Quadranten entstehen beim
+Zeichnen durch Spiegelung.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import contourpy
+import numpy as np
+
+import dipolfeld
+import profil
+
+# Parameter für Feldlinien-Berechnung (Standardwerte der Skripte)
+_Punktzahl_max = 3500
+_Grobfaktor2 = 0.25  # Schrittweitenfaktor für Feldlinienintegration
+_ZahlDerRechenschritte = int(_Punktzahl_max / _Grobfaktor2 + 100)
+# Unterhalb dieser Zahl aktiver Linien ist der skalare Pfad schneller als Arrays
+_Skalar_Schwelle = 16
+
+
+# Runge-Kutta Folgepunkt-Berechnung entlang einer Feldlinie
+def Folgepkt(x, y, Rechenrichtung, t, E_berechnen, Grobfaktor2=_Grobfaktor2):
+    Ex0, Ey0, E0 = E_berechnen(t, x, y)
+    if E0 == 0:
+        return (x, y)
+    d = Grobfaktor2 / E0 * Rechenrichtung
+    dx1 = Ex0 * d
+    dy1 = Ey0 * d
+    Ex1, Ey1, E1 = E_berechnen(t, x + dx1 / 2.0, y + dy1 / 2.0)
+    dx2 = Ex1 * d
+    dy2 = Ey1 * d
+    Ex2, Ey2, E2 = E_berechnen(t, x + dx2 / 2.0, y + dy2 / 2.0)
+    dx3 = Ex2 * d
+    dy3 = Ey2 * d
+    Ex3, Ey3, E3 = E_berechnen(t, x + dx3, y + dy3)
+    dx4 = Ex3 * d
+    dy4 = Ey3 * d
+    x_new = x + (dx1 + 2 * dx2 + 2 * dx3 + dx4) / 6.0
+    y_new = y + (dy1 + 2 * dy2 + 2 * dy3 + dy4) / 6.0
+    return (x_new, y_new)
+
+
+# Berechnet eine Feldlinie (Liste von (x,y)-Punkten) ab Startpunkt (x_start, 0)
+def E_Linie_berechnen(
+    t,
+    x_start,
+    E_berechnen=dipolfeld.E_berechnen,
+    Grobfaktor2=_Grobfaktor2,
+    ZahlDerRechenschritte=_ZahlDerRechenschritte,
+):
+    pts = []
+    xx = x_start
+    yy = 0.0
+    Ex0, Ey0, E0 = E_berechnen(t, xx, yy)
+    Rechenrichtung = 1 if Ey0 > 0 else -1
+    Schritt = 0
+    while True:
+        rr2 = xx * xx + yy * yy
+        if not (
+            rr2 >= 9.0 and yy >= 0.0 and Schritt < ZahlDerRechenschritte and xx > 1.0
+        ):
+            break
+        pts.append((xx, yy))
+        xx, yy = Folgepkt(xx, yy, Rechenrichtung, t, E_berechnen, Grobfaktor2)
+        Schritt += 1
+    pts.append((xx, yy))
+    profil.zaehlen("E evaluations", 1 + 4 * Schritt)
+    Orientierung = -1 if Rechenrichtung > 0 else 1
+    return pts, Orientierung
+
+
+def _RK4_Schritt(feld, x, y, Rechenrichtung, Grobfaktor2):
+    """Ein RK4-Schritt (wie Folgepkt) für alle übergebenen Linien gleichzeitig."""
+    Ex0, Ey0, E0 = feld(x, y)
+    # Schrittweite ~ 1/E; Punkte mit E0 == 0 bleiben stehen (d = 0)
+    d = np.divide(Grobfaktor2, E0, out=np.zeros_like(E0), where=E0 != 0)
+    d *= Rechenrichtung
+    dx1 = Ex0 * d
+    dy1 = Ey0 * d
+    Ex1, Ey1, _ = feld(x + dx1 / 2.0, y + dy1 / 2.0)
+    dx2 = Ex1 * d
+    dy2 = Ey1 * d
+    Ex2, Ey2, _ = feld(x + dx2 / 2.0, y + dy2 / 2.0)
+    dx3 = Ex2 * d
+    dy3 = Ey2 * d
+    Ex3, Ey3, _ = feld(x + dx3, y + dy3)
+    dx4 = Ex3 * d
+    dy4 = Ey3 * d
+    x_new = x + (dx1 + 2 * dx2 + 2 * dx3 + dx4) / 6.0
+    y_new = y + (dy1 + 2 * dy2 + 2 * dy3 + dy4) / 6.0
+    return x_new, y_new
+
+
+def _Linien_zusammensetzen(spuren_idx, spuren_x, spuren_y, anzahl):
+    """Sortiert die pro Schritt gesammelten Punkte nach Linie (ragged Arrays)."""
+    idx = np.concatenate(spuren_idx)
+    reihenfolge = np.argsort(idx, kind="stable")
+    pts = np.column_stack((np.concatenate(spuren_x), np.concatenate(spuren_y)))
+    pts = pts[reihenfolge]
+    grenzen = np.cumsum(np.bincount(idx, minlength=anzahl))[:-1]
+    return np.split(pts, grenzen)
+
+
+def _Linie_fortsetzen(
+    t, xx, yy, Rechenrichtung, Schritt, E_berechnen, Grobfaktor2, ZahlDerRechenschritte
+):
+    """Setzt eine Linie skalar fort, deren Punkt (xx, yy) die Abbruchprüfung bestanden hat."""
+    pts = []
+    while True:
+        xx, yy = Folgepkt(xx, yy, Rechenrichtung, t, E_berechnen, Grobfaktor2)
+        Schritt += 1
+        pts.append((xx, yy))
+        if not (
+            xx * xx + yy * yy >= 9.0
+            and yy >= 0.0
+            and Schritt < ZahlDerRechenschritte
+            and xx > 1.0
+        ):
+            profil.zaehlen("E evaluations", 4 * len(pts))
+            return np.array(pts)
+
+
+def E_Linien_berechnen(
+    t,
+    x_starts,
+    p0=dipolfeld._p0,
+    Wellenlaenge=dipolfeld._Wellenlaenge,
+    Stabdipol=False,
+    Grobfaktor2=_Grobfaktor2,
+    ZahlDerRechenschritte=_ZahlDerRechenschritte,
+    statistik=None,
+):
+    """Berechnet alle Feldlinien ab den Startpunkten (x_start, 0) im Gleichschritt.
+
+    Jede RK4-Stufe ist eine Array-Operation über alle noch aktiven Linien.
+    Linien, die eine Abbruchbedingung von E_Linie_berechnen erreichen
+    (r^2 < 9, y < 0, x <= 1, Schrittgrenze), werden ausmaskiert. Sind nur
+    noch wenige Linien aktiv, werden sie skalar zu Ende gerechnet.
+    ``statistik`` (dict) zählt optional die RK4-Schritte ("Schritte", je
+    Linie in "Schritte_je_Linie").
+
+    Gibt (Liste von (n_i, 2)-Punktarrays, Liste der Orientierungen) zurück.
+    """
+    feld = partial(
+        dipolfeld.E_berechnen,
+        t,
+        p0=p0,
+        Wellenlaenge=Wellenlaenge,
+        Stabdipol=Stabdipol,
+    )
+    xx = np.array(x_starts, dtype=float).ravel()
+    anzahl = xx.size
+    if anzahl == 0:
+        return [], []
+    yy = np.zeros_like(xx)
+    _, Ey0, _ = feld(xx, yy)
+    Rechenrichtung = np.where(Ey0 > 0, 1.0, -1.0)
+    Orientierung = np.where(Rechenrichtung > 0, -1, 1)
+
+    aktiv = np.arange(anzahl)
+    spuren_idx, spuren_x, spuren_y = [], [], []
+    Schritt = 0
+    while True:
+        # Aktuellen Punkt jeder aktiven Linie speichern (auch den Endpunkt)
+        spuren_idx.append(aktiv)
+        spuren_x.append(xx)
+        spuren_y.append(yy)
+        if Schritt >= ZahlDerRechenschritte:
+            break
+        weiter = (xx * xx + yy * yy >= 9.0) & (yy >= 0.0) & (xx > 1.0)
+        if not weiter.all():
+            aktiv = aktiv[weiter]
+            if aktiv.size == 0:
+                break
+            xx = xx[weiter]
+            yy = yy[weiter]
+            Rechenrichtung = Rechenrichtung[weiter]
+        if aktiv.size < _Skalar_Schwelle:
+            E_skalar = partial(
+                dipolfeld.E_berechnen,
+                p0=p0,
+                Wellenlaenge=Wellenlaenge,
+                Stabdipol=Stabdipol,
+            )
+            for i, x, y, R in zip(aktiv, xx, yy, Rechenrichtung):
+                rest = _Linie_fortsetzen(
+                    t,
+                    float(x),
+                    float(y),
+                    float(R),
+                    Schritt,
+                    E_skalar,
+                    Grobfaktor2,
+                    ZahlDerRechenschritte,
+                )
+                spuren_idx.append(np.full(len(rest), i))
+                spuren_x.append(rest[:, 0])
+                spuren_y.append(rest[:, 1])
+            break
+        xx, yy = _RK4_Schritt(feld, xx, yy, Rechenrichtung, Grobfaktor2)
+        Schritt += 1
+
+    linien = _Linien_zusammensetzen(spuren_idx, spuren_x, spuren_y, anzahl)
+    if statistik is not None:
+        schritte = [len(pts) - 1 for pts in linien]  # ein Punkt je Schritt
+        statistik["Schritte"] = statistik.get("Schritte", 0) + sum(schritte)
+        statistik.setdefault("Schritte_je_Linie", []).extend(schritte)
+    return linien, [int(o) for o in Orientierung]
+
+
+# Dormand-Prince 5(4) Koeffizienten (mit Dense Output nach Hairer/Shampine)
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+)
+_DP_B = (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84)
+_DP_E = (
+    -71 / 57600,
+    0.0,
+    71 / 16695,
+    -71 / 1920,
+    17253 / 339200,
+    -22 / 525,
+    1 / 40,
+)
+_DP_P = (
+    (
+        1.0,
+        -8048581381 / 2820520608,
+        8663915743 / 2820520608,
+        -12715105075 / 11282082432,
+    ),
+    (0.0, 0.0, 0.0, 0.0),
+    (
+        0.0,
+        131558114200 / 32700410799,
+        -68118460800 / 10900136933,
+        87487479700 / 32700410799,
+    ),
+    (0.0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072),
+    (
+        0.0,
+        127303824393 / 49829197408,
+        -318862633887 / 49829197408,
+        701980252875 / 199316789632,
+    ),
+    (0.0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844),
+    (0.0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423),
+)
+
+# Parameter für die adaptive Integration (Längen in Simulationseinheiten)
+_Toleranz = 1e-3  # erlaubter lokaler Fehler pro Schritt
+_Ausgabeabstand = 1.0  # Punktabstand der ausgegebenen Linie (über Dense Output)
+_Schritt_max = 16.0  # größte Schrittweite, damit keine Ereignisse übersprungen werden
+
+
+def _DP_Schritt(richtung, x, y, h, k1):
+    """Ein Dormand-Prince-Schritt der Länge h; gibt (x, y, Stufen, Fehler) zurück."""
+    ks = [k1]
+    for a in _DP_A[1:]:
+        xi = x + h * sum(aj * k[0] for aj, k in zip(a, ks))
+        yi = y + h * sum(aj * k[1] for aj, k in zip(a, ks))
+        ks.append(richtung(xi, yi))
+    x_neu = x + h * sum(b * k[0] for b, k in zip(_DP_B, ks))
+    y_neu = y + h * sum(b * k[1] for b, k in zip(_DP_B, ks))
+    ks.append(richtung(x_neu, y_neu))  # FSAL: erste Stufe des nächsten Schritts
+    fehler_x = h * sum(e * k[0] for e, k in zip(_DP_E, ks))
+    fehler_y = h * sum(e * k[1] for e, k in zip(_DP_E, ks))
+    return x_neu, y_neu, ks, max(abs(fehler_x), abs(fehler_y))
+
+
+def _DP_Interpolant(x, y, h, ks):
+    """Dense Output: liefert eine Funktion theta -> (x, y) für theta in [0, 1]."""
+    qx = [h * sum(P[m] * k[0] for P, k in zip(_DP_P, ks)) for m in range(4)]
+    qy = [h * sum(P[m] * k[1] for P, k in zip(_DP_P, ks)) for m in range(4)]
+
+    def punkt(theta):
+        px = py = 0.0
+        for m in range(3, -1, -1):
+            px = (px + qx[m]) * theta
+            py = (py + qy[m]) * theta
+        return x + px, y + py
+
+    return punkt
+
+
+def E_Linie_adaptiv_berechnen(
+    t,
+    x_start,
+    E_berechnen=dipolfeld.E_berechnen,
+    Grobfaktor2=_Grobfaktor2,
+    ZahlDerRechenschritte=_ZahlDerRechenschritte,
+    Toleranz=_Toleranz,
+    Ausgabeabstand=_Ausgabeabstand,
+    Schritt_max=_Schritt_max,
+    statistik=None,
+):
+    """Integriert eine Feldlinie ab (x_start, 0) adaptiv mit Dormand-Prince 5(4).
+
+    Integriert wird nach der Bogenlänge entlang E/|E|; die Schrittgrenze von
+    E_Linie_berechnen entspricht der Bogenlänge ZahlDerRechenschritte *
+    Grobfaktor2. Die Abbruchstellen (y = 0, r = 3, x = 1) werden über den
+    Dense Output exakt bestimmt statt überschritten. ``statistik`` (dict)
+    sammelt optional die Zahl der Feldauswertungen und Schritte.
+
+    Gibt wie E_Linie_berechnen (Punktliste, Orientierung) zurück.
+    """
+    auswertungen = 0
+
+    def richtung(x, y):
+        nonlocal auswertungen
+        auswertungen += 1
+        Ex, Ey, E = E_berechnen(t, x, y)
+        if E == 0:
+            return (0.0, 0.0)
+        return (Rechenrichtung * Ex / E, Rechenrichtung * Ey / E)
+
+    def im_gebiet(x, y):
+        return x * x + y * y >= 9.0 and y >= 0.0 and x > 1.0
+
+    xx = x_start
+    yy = 0.0
+    Ex0, Ey0, E0 = E_berechnen(t, xx, yy)
+    Rechenrichtung = 1 if Ey0 > 0 else -1
+    Orientierung = -1 if Rechenrichtung > 0 else 1
+    pts = [(xx, yy)]
+    s = 0.0
+    s_max = ZahlDerRechenschritte * Grobfaktor2
+    s_ausgabe = Ausgabeabstand
+    h = min(Ausgabeabstand, Schritt_max)
+    schritte = 0
+    k1 = richtung(xx, yy) if im_gebiet(xx, yy) else None
+    while k1 is not None:
+        h = min(h, s_max - s)
+        x_neu, y_neu, ks, fehler = _DP_Schritt(richtung, xx, yy, h, k1)
+        verhaeltnis = fehler / Toleranz
+        if verhaeltnis > 1.0 and h > 1e-6:
+            h *= max(0.2, 0.9 * verhaeltnis**-0.2)
+            continue
+        schritte += 1
+        punkt = _DP_Interpolant(xx, yy, h, ks)
+        # Abbruch innerhalb des Schritts: Übergang per Bisektion auf dem Interpolanten
+        theta_ende = 1.0
+        ende = s + h >= s_max or not im_gebiet(x_neu, y_neu)
+        if not im_gebiet(x_neu, y_neu):
+            lo, hi = 0.0, 1.0
+            for _ in range(50):
+                mitte = 0.5 * (lo + hi)
+                if im_gebiet(*punkt(mitte)):
+                    lo = mitte
+                else:
+                    hi = mitte
+            theta_ende = hi
+        while s_ausgabe < s + theta_ende * h:
+            pts.append(punkt((s_ausgabe - s) / h))
+            s_ausgabe += Ausgabeabstand
+        if ende:
+            pts.append(punkt(theta_ende) if theta_ende < 1.0 else (x_neu, y_neu))
+            break
+        xx, yy, k1 = x_neu, y_neu, ks[-1]
+        s += h
+        h = min(Schritt_max, h * min(10.0, 0.9 * max(verhaeltnis, 1e-10) ** -0.2))
+    profil.zaehlen("E evaluations", auswertungen + 1)
+    if statistik is not None:
+        statistik["Feldauswertungen"] = (
+            statistik.get("Feldauswertungen", 0) + auswertungen + 1
+        )
+        statistik["Schritte"] = statistik.get("Schritte", 0) + schritte
+    return pts, Orientierung
+
+
+def E_Linien_adaptiv_berechnen(
+    t,
+    x_starts,
+    p0=dipolfeld._p0,
+    Wellenlaenge=dipolfeld._Wellenlaenge,
+    Stabdipol=False,
+    Grobfaktor2=_Grobfaktor2,
+    ZahlDerRechenschritte=_ZahlDerRechenschritte,
+    Toleranz=_Toleranz,
+    Ausgabeabstand=_Ausgabeabstand,
+    statistik=None,
+):
+    """Wie E_Linien_berechnen, aber jede Linie adaptiv (E_Linie_adaptiv_berechnen).
+
+    ``statistik`` erhält zusätzlich die Zahl der DP45-Schritte je Linie
+    ("Schritte_je_Linie").
+    """
+    E_skalar = partial(
+        dipolfeld.E_berechnen, p0=p0, Wellenlaenge=Wellenlaenge, Stabdipol=Stabdipol
+    )
+    linien = []
+    orientierungen = []
+    for x_start in x_starts:
+        vorher = 0 if statistik is None else statistik.get("Schritte", 0)
+        pts, orient = E_Linie_adaptiv_berechnen(
+            t,
+            float(x_start),
+            E_skalar,
+            Grobfaktor2,
+            ZahlDerRechenschritte,
+            Toleranz,
+            Ausgabeabstand,
+            statistik=statistik,
+        )
+        if statistik is not None:
+            statistik.setdefault("Schritte_je_Linie", []).append(
+                statistik["Schritte"] - vorher
+            )
+        linien.append(np.array(pts))
+        orientierungen.append(orient)
+    return linien, orientierungen
+
+
+# Parameter für die Stromfunktions-Methode
+_Gitterabstand = 1.0  # Gitterweite für die Stromfunktion (Simulationseinheiten)
+
+
+def E_Linien_Stromfunktion(
+    t,
+    x_starts,
+    Fenster,
+    p0=dipolfeld._p0,
+    Wellenlaenge=dipolfeld._Wellenlaenge,
+    Stabdipol=False,
+    Gitterabstand=_Gitterabstand,
+    Grobfaktor2=_Grobfaktor2,
+    ZahlDerRechenschritte=_ZahlDerRechenschritte,
+    statistik=None,
+):
+    """Bestimmt die Feldlinien ab (x_start, 0) als Höhenlinien der Stromfunktion.
+
+    Die Stromfunktion wird einmal vektorisiert auf einem Gitter über dem
+    1. Quadranten bis ``Fenster`` (halbe Bildbreite, mindestens aber bis zum
+    äußersten Startpunkt) ausgewertet. Für jeden
+    Startpunkt wird die Höhenlinie zum Niveau Psi(x_start, 0) gesucht und das
+    Stück, das bei (x_start, 0) beginnt, zurückgegeben. Die Gebiete, in denen
+    E_Linie_berechnen abbricht (r < 3, x < 1), sind ausmaskiert. Beginnt
+    kein Stück innerhalb von ``2 * Gitterabstand`` am Startpunkt, wird diese
+    Linie mit E_Linien_berechnen (``Grobfaktor2``, ``ZahlDerRechenschritte``)
+    integriert (Zähler "stream function fallbacks"); nur diese Linien gehen
+    in ``statistik`` ein.
+
+    Gibt wie E_Linien_berechnen (Liste von Punktarrays, Orientierungen) zurück.
+    """
+    if Stabdipol:
+        raise ValueError("Die Stromfunktion ist nur für den Hertzdipol verfügbar.")
+    x_starts = np.array(x_starts, dtype=float).ravel()
+    if x_starts.size == 0:
+        return [], []
+    _, Ey0, _ = dipolfeld.E_berechnen(t, x_starts, 0.0, p0, Wellenlaenge)
+    Orientierung = [-1 if ey > 0 else 1 for ey in Ey0]
+    niveaus = dipolfeld.Stromfunktion_berechnen(t, x_starts, 0.0, p0, Wellenlaenge)
+
+    # Das Gitter muss auch die Startpunkte außerhalb des Bildes abdecken
+    rand = max(Fenster, x_starts.max()) * 1.05
+    achse = np.arange(0.0, rand + Gitterabstand, Gitterabstand)
+    X, Y = np.meshgrid(achse, achse)
+    Psi = dipolfeld.Stromfunktion_berechnen(t, X, Y, p0, Wellenlaenge)
+    Psi = np.ma.masked_where((X * X + Y * Y < 9.0) | (X < 1.0), Psi)
+    generator = contourpy.contour_generator(
+        achse, achse, Psi, line_type=contourpy.LineType.Separate
+    )
+
+    linien = []
+    ersatz = []  # Indizes der Startpunkte ohne passendes Stück
+    for x_start, niveau in zip(x_starts, niveaus):
+        stuecke = generator.lines(niveau)
+        start = np.array([x_start, 0.0])
+        bestes = None
+        abstand = np.inf
+        for stueck in stuecke:
+            for kandidat in (stueck, stueck[::-1]):
+                d = np.hypot(*(kandidat[0] - start))
+                if d < abstand:
+                    bestes, abstand = kandidat, d
+        if abstand > 2 * Gitterabstand:
+            ersatz.append(len(linien))
+        linien.append(np.asarray(bestes))
+    if ersatz:
+        profil.zaehlen("stream function fallbacks", len(ersatz))
+        rk4_linien, rk4_orientierungen = E_Linien_berechnen(
+            t,
+            x_starts[ersatz],
+            p0,
+            Wellenlaenge,
+            Stabdipol,
+            Grobfaktor2,
+            ZahlDerRechenschritte,
+            statistik=statistik,
+        )
+        for i, pts, orient in zip(ersatz, rk4_linien, rk4_orientierungen):
+            linien[i] = pts
+            Orientierung[i] = orient
+    return linien, Orientierung
+
+
+def Linien_vereinfachen(linien, Toleranz, statistik=None):
+    """Dünnt alle ``linien`` gemeinsam mit Ramer-Douglas-Peucker aus.
+
+    Es bleiben nur so viele Punkte, dass die vereinfachte Linie höchstens
+    ``Toleranz`` (Simulationseinheiten, typischerweise ein Bruchteil eines
+    Ausgabepixels) von der ursprünglichen abweicht; Anfangs- und Endpunkt
+    bleiben immer erhalten. Alle Intervalle einer Rekursionsebene werden für
+    alle Linien zusammen mit NumPy bearbeitet. ``statistik`` (dict) zählt
+    optional die Punkte vorher und nachher.
+    """
+    laengen = np.array([len(pts) for pts in linien], dtype=np.intp)
+    if statistik is not None:
+        statistik["Punkte_vorher"] = statistik.get("Punkte_vorher", 0) + int(
+            laengen.sum()
+        )
+    if Toleranz <= 0 or not (laengen > 2).any():
+        if statistik is not None:
+            statistik["Punkte_nachher"] = statistik.get("Punkte_nachher", 0) + int(
+                laengen.sum()
+            )
+        return list(linien)
+
+    punkte = np.concatenate([np.asarray(pts, dtype=float) for pts in linien])
+    anfang = np.cumsum(laengen) - laengen
+    ende = anfang + laengen - 1
+    behalten = np.zeros(len(punkte), dtype=bool)
+    behalten[anfang[laengen > 0]] = True
+    behalten[ende[laengen > 0]] = True
+
+    # Offene Intervalle (a, b) mit inneren Punkten, über alle Linien
+    a, b = anfang[laengen > 2], ende[laengen > 2]
+    while len(a):
+        innen = b - a - 1
+        erster = np.cumsum(innen) - innen  # Beginn jedes Intervalls in idx
+        intervall = np.repeat(np.arange(len(a)), innen)
+        idx = np.arange(innen.sum()) - erster[intervall] + a[intervall] + 1
+        # Abstand jedes inneren Punkts von der Sehne (Strecke, nicht Gerade)
+        A = punkte[a][intervall]
+        d = punkte[b][intervall] - A
+        q = punkte[idx] - A
+        l2 = (d * d).sum(axis=1)
+        s = np.clip((q * d).sum(axis=1) / np.where(l2 > 0, l2, 1.0), 0.0, 1.0)
+        abstand = np.hypot(*(q - s[:, None] * d).T)
+        # Weitester Punkt je Intervall
+        maxima = np.maximum.reduceat(abstand, erster)
+        treffer = np.flatnonzero(abstand == maxima[intervall])
+        _, erste = np.unique(intervall[treffer], return_index=True)
+        m = idx[treffer[erste]]
+        teilen = maxima > Toleranz
+        m, a, b = m[teilen], a[teilen], b[teilen]
+        behalten[m] = True
+        a, b = np.concatenate((a, m)), np.concatenate((m, b))
+        offen = b - a > 1
+        a, b = a[offen], b[offen]
+
+    linie = np.repeat(np.arange(len(laengen)), laengen)
+    anzahl = np.bincount(linie[behalten], minlength=len(laengen))
+    if statistik is not None:
+        statistik["Punkte_nachher"] = statistik.get("Punkte_nachher", 0) + int(
+            anzahl.sum()
+        )
+    return np.split(punkte[behalten], np.cumsum(anzahl)[:-1])
+
+
+def Frames_Geometrie(berechnen, Periode, Threads=1, Halbperiode=True):
+    """Liefert ``berechnen(frame)`` (Geometrie-Dict) für alle Frames in Reihenfolge.
+
+    Die Frames werden in ``Threads`` Threads gleichzeitig berechnet;
+    ``berechnen`` darf dafür keinen gemeinsamen veränderlichen Zustand
+    benutzen (wie ``Frame_Geometrie``), NumPy gibt in den Array-Operationen
+    den GIL frei. Mit ``Halbperiode`` (und gerader ``Periode``) wird nur die
+    erste Halbperiode berechnet, die zweite übernimmt deren Linien mit
+    umgekehrter Orientierung.
+    """
+    halb = Periode // 2 if Halbperiode and Periode % 2 == 0 else Periode
+    erste = []
+    with ThreadPoolExecutor(max_workers=Threads) as pool:
+        for geometrie in pool.map(berechnen, range(halb)):
+            if halb < Periode:
+                erste.append(geometrie)
+            yield geometrie
+    for geometrie in erste:
+        yield dict(geometrie, Orientierungen=[-o for o in geometrie["Orientierungen"]])
+
+
+def Frame_Feldlinien(frame, Periode, berechnen, cache=None):
+    """Liefert (Linien, Orientierungen) für ``frame`` unter Ausnutzung von E(t + T/2) = -E(t).
+
+    Frames der zweiten Halbperiode übernehmen die Geometrie des Frames
+    ``frame - Periode/2`` mit umgekehrter Orientierung; Farben und Pfeilmarker
+    ergeben sich beim Zeichnen daraus. ``berechnen()`` rechnet die Linien des
+    Frames neu, ``cache`` (dict) hält die Geometrie der ersten Halbperiode.
+    Ohne ``cache`` oder bei ungerader Periode wird jeder Frame neu berechnet.
+    """
+    halb = Periode // 2
+    if cache is None or Periode % 2:
+        return berechnen()
+    if frame >= halb and frame - halb in cache:
+        linien, orient = cache.pop(frame - halb)
+        return linien, [-o for o in orient]
+    linien, orient = berechnen()
+    if frame < halb:
+        cache[frame] = (linien, orient)
+    return linien, orient
+
+
+# Startpunkte und Geometrie eines Frames als reine Funktionen: alle Eingaben
+# als Argumente, keine globalen Zwischenergebnisse. Mehrere Frames können so
+# gleichzeitig (z. B. in einem ThreadPoolExecutor) berechnet werden.
+_Nahgrenze = 3.0  # Feldlinien beginnen erst jenseits dieses Abstands vom Dipol
+
+
+def Grenzlinien_berechnen(
+    t,
+    Groessenfaktor,
+    Linienabst=8.0,
+    Wellenlaenge=dipolfeld._Wellenlaenge,
+    Stabdipol=False,
+):
+    """Nullstellen auf der x-Achse, die die Feldlinienbereiche trennen (aufsteigend).
+
+    Hertzdipol: Nullstellen von F (siehe ``dipolfeld.Grenzlinien_Hertzdipol``)
+    ab knapp jenseits der Nahgrenze bis etwa ``Groessenfaktor * 7`` Viertelwellen
+    (höchstens 100). Stabdipol: geschlossene Formel je Keule.
+    """
+    Lamda_viertel = Wellenlaenge / 4.0
+    if not Stabdipol:
+        Schrittweite = Lamda_viertel / 4.0
+        x1 = Linienabst / 2.0 + _Nahgrenze
+        Fensterende = Groessenfaktor * 7 * Lamda_viertel
+        # Gleicher Suchbereich wie das frühere Raster mit Bisektion: das letzte
+        # Intervall beginnt noch vor dem Fensterende
+        x_ende = x1 + (np.floor((Fensterende - x1) / Schrittweite) + 1) * Schrittweite
+        return dipolfeld.Grenzlinien_Hertzdipol(t, x1, x_ende, Wellenlaenge)[:100]
+    # Keulenzahl abhängig vom Zoomfaktor
+    Keulenzahl = {1: 5, 2: 7, 4: 12}.get(Groessenfaktor, 4 if Groessenfaktor < 1 else 7)
+    Halbperiode = Wellenlaenge / (2 * dipolfeld._c)  # pi / w
+    tt = t
+    while tt > Halbperiode:  # Zeitphase in [0, pi/w]
+        tt -= Halbperiode
+    grenzlinien = []
+    for n in range(Keulenzahl):
+        aa1 = (2 * n) * Lamda_viertel + dipolfeld._c * tt
+        if aa1 > Lamda_viertel:
+            grenzlinien.append(
+                float(np.sqrt(aa1 * aa1 - Lamda_viertel * Lamda_viertel))
+            )
+    return grenzlinien
+
+
+def Linienstarts_berechnen(
+    grenzlinien, Linienabst=8.0, Wellenlaenge=dipolfeld._Wellenlaenge
+):
+    """x-Koordinaten der Startpunkte auf der x-Achse.
+
+    Von jeder Grenzlinie außer der letzten aus geht es in Schritten von
+    ``Linienabst`` nach innen (erster Start ``Linienabst / 2`` vor der
+    Grenzlinie), höchstens ``Wellenlaenge / 4 / Linienabst`` Linien je
+    Bereich und nur jenseits der Nahgrenze.
+    """
+    Linien_pro_Welle = Wellenlaenge / 4.0 / Linienabst
+    starts = []
+    for grenze in grenzlinien[:-1]:
+        Linienpos = grenze - Linienabst / 2.0
+        anzahl = 0
+        while Linienpos > _Nahgrenze and anzahl < Linien_pro_Welle:
+            starts.append(Linienpos)
+            anzahl += 1
+            Linienpos -= Linienabst
+    return starts
+
+
+def Linien_integrieren(
+    t,
+    starts,
+    Verfahren="RK4",
+    Fenster=None,
+    Grobfaktor2=_Grobfaktor2,
+    ZahlDerRechenschritte=_ZahlDerRechenschritte,
+    Toleranz=_Toleranz,
+    p0=dipolfeld._p0,
+    Wellenlaenge=dipolfeld._Wellenlaenge,
+    Stabdipol=False,
+):
+    """Feldlinien ab den Startpunkten ``starts`` mit ``Verfahren`` (siehe
+    ``Frame_Geometrie``; ``Fenster`` nur für ``"Stromfunktion"``).
+
+    Bei RK4 und adaptiv hängt jede Linie nur von t und ihrem Startpunkt ab.
+    Gibt ``{"Linien": [...], "Orientierungen": [...]}`` zurück.
+    """
+    feld = dict(p0=p0, Wellenlaenge=Wellenlaenge, Stabdipol=Stabdipol)
+    statistik = {}
+    with profil.Abschnitt("line integration", Verfahren=Verfahren):
+        if Verfahren == "Stromfunktion":
+            linien, orientierungen = E_Linien_Stromfunktion(
+                t,
+                starts,
+                Fenster=Fenster,
+                Grobfaktor2=Grobfaktor2,
+                ZahlDerRechenschritte=ZahlDerRechenschritte,
+                statistik=statistik,
+                **feld,
+            )
+        elif Verfahren == "adaptiv":
+            linien, orientierungen = E_Linien_adaptiv_berechnen(
+                t,
+                starts,
+                Grobfaktor2=Grobfaktor2,
+                ZahlDerRechenschritte=ZahlDerRechenschritte,
+                Toleranz=Toleranz,
+                statistik=statistik,
+                **feld,
+            )
+        elif Verfahren == "RK4":
+            linien, orientierungen = E_Linien_berechnen(
+                t,
+                starts,
+                Grobfaktor2=Grobfaktor2,
+                ZahlDerRechenschritte=ZahlDerRechenschritte,
+                statistik=statistik,
+                **feld,
+            )
+        else:
+            raise ValueError(
+                f"Unbekanntes Verfahren {Verfahren!r} (RK4, adaptiv oder "
+                "Stromfunktion)."
+            )
+    profil.zaehlen("field lines", len(linien))
+    # Integrationsschritte, nicht Punkte: adaptiv gibt interpolierte Punkte
+    # aus, die Stromfunktion integriert nur die Ersatz-Linien
+    profil.zaehlen("integration steps", statistik.get("Schritte", 0))
+    profil.verteilen("steps per line", statistik.get("Schritte_je_Linie", ()))
+    return dict(Linien=linien, Orientierungen=orientierungen)
+
+
+def Frame_Geometrie(
+    t,
+    Groessenfaktor,
+    Linienabst=8.0,
+    Verfahren="RK4",
+    Grobfaktor2=_Grobfaktor2,
+    ZahlDerRechenschritte=_ZahlDerRechenschritte,
+    Toleranz=_Toleranz,
+    p0=dipolfeld._p0,
+    Wellenlaenge=dipolfeld._Wellenlaenge,
+    Stabdipol=False,
+    cache=None,
+    frame=None,
+):
+    """Alle Feldlinien (obere Halbebene) zum Zeitpunkt t, ohne globalen Zustand.
+
+    ``Verfahren`` ist ``"RK4"`` (E_Linien_berechnen), ``"adaptiv"``
+    (E_Linien_adaptiv_berechnen) oder ``"Stromfunktion"``
+    (E_Linien_Stromfunktion, Fenster ``Wellenlaenge * Groessenfaktor``).
+    Gibt ``{"Linien": [...], "Orientierungen": [...]}`` zurück, wie der
+    Geometrie-Cache es speichert.
+
+    Mit ``cache`` (``geometriecache.Geometrie_Cache``) kommen die Linien von
+    ``frame`` aus dem Cache, bei RK4 und adaptiv je Startpunkt: Der
+    ``Groessenfaktor`` bestimmt dann nur, welche Startpunkte gebraucht werden,
+    ein größerer Zoom ergänzt den Eintrag eines kleineren und umgekehrt. Den
+    ``Groessenfaktor`` nimmt man in diesem Fall nicht in den Cacheschlüssel.
+    """
+    with profil.Abschnitt("root finding"):
+        grenzlinien = Grenzlinien_berechnen(
+            t, Groessenfaktor, Linienabst, Wellenlaenge, Stabdipol
+        )
+    with profil.Abschnitt("seeding"):
+        starts = Linienstarts_berechnen(grenzlinien, Linienabst, Wellenlaenge)
+    integrieren = partial(
+        Linien_integrieren,
+        t,
+        Verfahren=Verfahren,
+        Fenster=Wellenlaenge * Groessenfaktor,
+        Grobfaktor2=Grobfaktor2,
+        ZahlDerRechenschritte=ZahlDerRechenschritte,
+        Toleranz=Toleranz,
+        p0=p0,
+        Wellenlaenge=Wellenlaenge,
+        Stabdipol=Stabdipol,
+    )
+    if cache is None:
+        return integrieren(starts)
+    if Verfahren == "Stromfunktion":  # Linien hängen vom Fenster (Zoom) ab
+        return cache.holen(frame, partial(integrieren, starts))
+    return cache.holen_je_Start(frame, starts, integrieren)
@@ -0,0 +1,238 @@
+"""Inhaltsadressierter Plattencache für die berechnete Geometrie der Frames.
+
+Die Feldlinien (Punkte und Orientierungen) eines Frames hängen nur von den physikalischen Parametern und der Frame-Nummer ab,
+nicht von Farben, Titel, ``dpi`` oder Kamera. Der Schlüssel ist daher ein
+SHA-256 über diese Parameter und die Frame-Nummer; jeder Eintrag ist eine
+komprimierte ``.npz``-Datei. Gespeichert wird die Geometrie vor dem
+Ausdünnen, damit eine andere Auflösung denselben Eintrag benutzen kann.
+Das Verzeichnis ``Feldcache/`` liegt neben diesem Modul, unabhängig vom
+Arbeitsverzeichnis.
+Wird ``Groesse_max`` überschritten, fallen die am längsten nicht benutzten
+Einträge weg (LRU über die Änderungszeit der Dateien). Das Verzeichnis wird
+dafür nur beim ersten Schreiben und beim Überschreiten durchsucht, dazwischen
+zählt jedes Objekt die Größe seiner eigenen Einträge mit.
+
+Für viele Läufe in einem Prozess (``varianten.py``) hält ``Speicher_begrenzen``
+die zuletzt benutzten Einträge zusätzlich im Arbeitsspeicher, so dass sie
+weder neu berechnet noch von der Platte gelesen werden müssen.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+_Version = 2  # erhöhen, wenn sich die Berechnung der Geometrie ändert
+_Verzeichnis = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Feldcache")
+_Groesse_max = 2**28  # 256 MiB (ein Lauf mit _Periode = 100: etwa 60 MB)
+_Nachraeumen = 0.9  # beim Aufräumen bis auf diesen Anteil von Groesse_max löschen
+_Speicher = OrderedDict()  # Pfad -> (Geometrie, Bytes), zuletzt benutzte am Ende
+_Speicher_max = 0  # Bytes im Arbeitsspeicher, 0 = aus (siehe Speicher_begrenzen)
+_Speicher_Sperre = threading.Lock()
+
+
+def Speicher_begrenzen(Groesse_max):
+    """Hält bis zu ``Groesse_max`` Bytes Geometrie zusätzlich im Arbeitsspeicher
+    (über alle ``Geometrie_Cache``-Objekte des Prozesses); 0 schaltet das ab."""
+    global _Speicher_max
+    with _Speicher_Sperre:
+        _Speicher_max = Groesse_max
+        _Speicher_kuerzen()
+
+
+def _Speicher_kuerzen():
+    belegt = sum(groesse for _, groesse in _Speicher.values())
+    while _Speicher and belegt > _Speicher_max:
+        _, (_, groesse) = _Speicher.popitem(last=False)
+        belegt -= groesse
+
+
+def _Speicher_holen(pfad):
+    with _Speicher_Sperre:
+        if pfad not in _Speicher:
+            return None
+        _Speicher.move_to_end(pfad)
+        geometrie = _Speicher[pfad][0]
+    # Flache Kopie: die Listen gehören dem Aufrufer, die Arrays bleiben geteilt
+    return {name: list(werte) for name, werte in geometrie.items()}
+
+
+def _Speicher_ablegen(pfad, geometrie):
+    if not _Speicher_max:
+        return
+    geometrie = {name: list(werte) for name, werte in geometrie.items()}
+    groesse = sum(np.asarray(pts).nbytes for pts in geometrie.get("Linien", []))
+    groesse += 8 * sum(len(w) for name, w in geometrie.items() if name != "Linien")
+    with _Speicher_Sperre:
+        _Speicher[pfad] = (geometrie, groesse)
+        _Speicher_kuerzen()
+
+
+class Geometrie_Cache:
+    """Cache für ``{"Linien", "Orientierungen", "Radien"}`` je Frame.
+
+    ``parameter`` (dict, JSON-serialisierbar) enthält alles, wovon die
+    Geometrie abhängt. Mehrere Prozesse und Threads dürfen dasselbe
+    Verzeichnis benutzen: Einträge werden unter einem temporären Namen
+    geschrieben und dann umbenannt, ein gleichzeitig gelöschter Eintrag
+    zählt als Fehltreffer.
+    """
+
+    def __init__(self, parameter, verzeichnis=_Verzeichnis, Groesse_max=_Groesse_max):
+        self.verzeichnis = verzeichnis
+        self.Groesse_max = Groesse_max
+        self._parameter = json.dumps(
+            dict(parameter, Version=_Version), sort_keys=True, default=float
+        )
+        self.treffer = 0
+        self.fehltreffer = 0
+        self._belegt = None  # Bytes im Verzeichnis, None = noch nicht gezählt
+        self._Sperre = threading.Lock()
+
+    def _pfad(self, frame):
+        schluessel = hashlib.sha256(
+            f"{self._parameter}|{int(frame)}".encode()
+        ).hexdigest()
+        return os.path.join(self.verzeichnis, schluessel + ".npz")
+
+    def laden(self, frame):
+        """Liefert die Geometrie von ``frame`` oder None, wenn sie fehlt."""
+        geometrie = self._laden(frame)
+        if geometrie is None:
+            self.fehltreffer += 1
+        else:
+            self.treffer += 1
+        return geometrie
+
+    def _laden(self, frame):
+        pfad = self._pfad(frame)
+        geometrie = _Speicher_holen(pfad)
+        if geometrie is not None:
+            return geometrie
+        try:
+            with np.load(pfad) as daten:
+                eintrag = {name: daten[name] for name in daten.files}
+            os.utime(pfad)  # zuletzt benutzt (für LRU)
+        except (OSError, EOFError, ValueError, zipfile.BadZipFile):
+            return None
+        geometrie = {}
+        if "Punkte" in eintrag:
+            laengen = eintrag["Laengen"]
+            geometrie["Linien"] = (
+                np.split(eintrag["Punkte"], np.cumsum(laengen)[:-1])
+                if len(laengen)
+                else []
+            )
+        if "Orientierungen" in eintrag:
+            geometrie["Orientierungen"] = eintrag["Orientierungen"].tolist()
+        if "Radien" in eintrag:
+            geometrie["Radien"] = eintrag["Radien"].tolist()
+        if "Starts" in eintrag:
+            geometrie["Starts"] = eintrag["Starts"].tolist()
+        _Speicher_ablegen(pfad, geometrie)
+        return geometrie
+
+    def speichern(self, frame, geometrie):
+        """Schreibt ``geometrie`` (dict wie bei ``laden``) für ``frame``."""
+        eintrag = {}
+        if "Linien" in geometrie:
+            linien = [
+                np.asarray(pts, dtype=float).reshape(-1, 2)
+                for pts in geometrie["Linien"]
+            ]
+            eintrag["Punkte"] = np.concatenate(linien) if linien else np.empty((0, 2))
+            eintrag["Laengen"] = np.array([len(pts) for pts in linien], dtype=np.int64)
+        if "Orientierungen" in geometrie:
+            eintrag["Orientierungen"] = np.asarray(geometrie["Orientierungen"])
+        if "Radien" in geometrie:
+            eintrag["Radien"] = np.asarray(geometrie["Radien"], dtype=float)
+        if "Starts" in geometrie:
+            eintrag["Starts"] = np.asarray(geometrie["Starts"], dtype=float)
+        pfad = self._pfad(frame)
+        os.makedirs(self.verzeichnis, exist_ok=True)  # erst beim ersten Eintrag
+        temp = f"{pfad[:-len('.npz')]}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez_compressed(temp, **eintrag)
+        groesse = os.path.getsize(temp)
+        try:
+            groesse -= os.path.getsize(pfad)  # ersetzter Eintrag
+        except OSError:
+            pass
+        os.replace(temp, pfad)
+        _Speicher_ablegen(pfad, geometrie)
+        with self._Sperre:
+            if self._belegt is not None:
+                self._belegt += groesse
+            voll = self._belegt is None or self._belegt > self.Groesse_max
+        if voll:
+            self.aufraeumen()
+
+    def holen(self, frame, berechnen):
+        """Geometrie von ``frame`` aus dem Cache oder über ``berechnen()``."""
+        geometrie = self.laden(frame)
+        if geometrie is None:
+            geometrie = berechnen()
+            self.speichern(frame, geometrie)
+        return geometrie
+
+    def holen_je_Start(self, frame, starts, integrieren):
+        """Feldlinien von ``frame`` für die Startpunkte ``starts`` (x-Werte).
+
+        Der Eintrag hält die Linien zusammen mit ihren Startpunkten
+        (``"Starts"``). Fehlen Startpunkte, rechnet ``integrieren(fehlende)``
+        nur diese (``{"Linien", "Orientierungen"}``) und der Eintrag wird um
+        sie ergänzt; ein Treffer zählt nur, wenn nichts fehlte. So teilen
+        sich z. B. Läufe mit anderem ``Groessenfaktor`` die gemeinsamen Linien.
+        """
+        eintrag = self._laden(frame) or dict(Starts=[], Linien=[], Orientierungen=[])
+        vorhanden = set(eintrag["Starts"])
+        fehlende = [x for x in dict.fromkeys(map(float, starts)) if x not in vorhanden]
+        if fehlende:
+            self.fehltreffer += 1
+            neu = integrieren(fehlende)
+            eintrag = {
+                name: list(eintrag[name]) + list(werte)
+                for name, werte in (
+                    ("Starts", fehlende),
+                    ("Linien", neu["Linien"]),
+                    ("Orientierungen", neu["Orientierungen"]),
+                )
+            }
+            self.speichern(frame, eintrag)
+        else:
+            self.treffer += 1
+        index = {x: i for i, x in enumerate(eintrag["Starts"])}
+        auswahl = [index[float(x)] for x in starts]
+        return dict(
+            Linien=[eintrag["Linien"][i] for i in auswahl],
+            Orientierungen=[eintrag["Orientierungen"][i] for i in auswahl],
+        )
+
+    def aufraeumen(self):
+        """Löscht die ältesten Einträge, wenn mehr als ``Groesse_max`` Bytes
+        belegt sind, und zwar bis auf ``_Nachraeumen * Groesse_max``, damit
+        nicht jeder weitere Eintrag wieder aufräumt. Zählt dabei auch
+        Einträge anderer Prozesse neu."""
+        eintraege = []
+        for name in os.listdir(self.verzeichnis):
+            if name.endswith(".npz") and ".tmp." not in name:
+                try:
+                    st = os.stat(os.path.join(self.verzeichnis, name))
+                except OSError:
+                    continue
+                eintraege.append((st.st_mtime, st.st_size, name))
+        belegt = sum(groesse for _, groesse, _ in eintraege)
+        ziel = self.Groesse_max * (_Nachraeumen if belegt > self.Groesse_max else 1)
+        for _, groesse, name in sorted(eintraege):
+            if belegt <= ziel:
+                break
+            try:
+                os.remove(os.path.join(self.verzeichnis, name))
+            except OSError:
+                pass
+            belegt -= groesse
+        with self._Sperre:
+            self._belegt = belegt
@@ -0,0 +1,149 @@
+"""Geometrie aller Frames in einer Datei: Rechenstufe und Renderstufe trennen.
+
+``Geometrie_schreiben`` legt die Feldlinien, Orientierungen und H-Radien
+aller Frames in einer einzigen Datei ab, ``Geometrie_Datei`` bildet sie mit
+``np.memmap`` wieder ein und liefert jeden Frame ohne Neuberechnung. So kann
+eine teure Berechnung viele billige Renderläufe (2D, 3D, andere Auflösung,
+andere Rechner) versorgen.
+
+Aufbau der Datei: Kennung, die Punkte aller Linien (float32, n x 2, beim
+Rechnen fortlaufend geschrieben), die kleinen Index-Arrays und am Ende ein
+JSON-Kopf mit Lage, Typ und Form jedes Arrays sowie den Parametern, gefolgt
+von dessen Länge (8 Bytes, little endian):
+
+- ``Linien_Offsets`` (int64, Linien + 1): erster Punkt jeder Linie
+- ``Frame_Linien`` (int64, Frames + 1): erste Linie jedes Frames
+- ``Orientierungen`` (int8, Linien)
+- ``Radien`` (float32) und ``Frame_Radien`` (int64, Frames + 1)
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+_Kennung = b"DIPOLGEO"
+_Version = 1
+_Ausrichtung = 64  # Arrays beginnen an Vielfachen davon (Bytes)
+
+
+def _Parameter_text(parameter):
+    return json.dumps(parameter, sort_keys=True, default=float)
+
+
+def Geometrie_schreiben(dateiname, geometrien, parameter=()):
+    """Schreibt die Geometrie-Dicts ``geometrien`` (einer je Frame, in
+    Frame-Reihenfolge, Schlüssel wie beim Geometrie-Cache) nach ``dateiname``.
+
+    Die Punkte werden sofort geschrieben, im Speicher bleiben nur die
+    Index-Arrays. ``parameter`` ist eine Folge von Parameter-Dicts mit dem
+    Schlüssel ``Inhalt`` (wie beim Geometrie-Cache); beim Einlesen wird
+    damit geprüft, ob die Datei zum Skript passt. Gibt die Anzahl der
+    Frames zurück.
+    """
+    offsets, frame_linien = [0], [0]
+    orientierungen, radien, frame_radien = [], [], [0]
+    inhalte = set()
+    temp = f"{dateiname}.{os.getpid()}.tmp"
+    with open(temp, "wb") as datei:
+        datei.write(_Kennung + struct.pack("<Q", _Version))
+        punkte_start = datei.tell()
+        for geometrie in geometrien:
+            inhalte.update(geometrie)
+            for pts in geometrie.get("Linien", []):
+                pts = np.asarray(pts, dtype="<f4").reshape(-1, 2)
+                datei.write(pts.tobytes())
+                offsets.append(offsets[-1] + len(pts))
+            frame_linien.append(len(offsets) - 1)
+            orientierungen.extend(geometrie.get("Orientierungen", []))
+            radien.extend(geometrie.get("Radien", []))
+            frame_radien.append(len(radien))
+        arrays = {"Punkte": (punkte_start, "<f4", (offsets[-1], 2))}
+        for name, werte, typ in (
+            ("Linien_Offsets", offsets, "<i8"),
+            ("Frame_Linien", frame_linien, "<i8"),
+            ("Orientierungen", orientierungen, "i1"),
+            ("Radien", radien, "<f4"),
+            ("Frame_Radien", frame_radien, "<i8"),
+        ):
+            datei.write(b"\0" * (-datei.tell() % _Ausrichtung))
+            werte = np.asarray(werte, dtype=typ)
+            arrays[name] = (datei.tell(), typ, werte.shape)
+            datei.write(werte.tobytes())
+        kopf = json.dumps(
+            {
+                "Frames": len(frame_linien) - 1,
+                "Inhalt": sorted(inhalte),
+                "Arrays": arrays,
+                "Parameter": {
+                    p["Inhalt"]: json.loads(_Parameter_text(p)) for p in parameter
+                },
+            }
+        ).encode()
+        datei.write(kopf + struct.pack("<Q", len(kopf)))
+    os.replace(temp, dateiname)
+    return len(frame_linien) - 1
+
+
+class Geometrie_Datei:
+    """Liest eine mit ``Geometrie_schreiben`` erzeugte Datei (per ``np.memmap``).
+
+    Mit ``parameter`` (Folge von Parameter-Dicts mit ``Inhalt``) wird
+    geprüft, dass die Datei für genau diese Parameter berechnet wurde;
+    andernfalls gibt es einen ``ValueError``.
+    """
+
+    def __init__(self, dateiname, parameter=()):
+        with open(dateiname, "rb") as datei:
+            if datei.read(len(_Kennung)) != _Kennung:
+                raise ValueError(f"{dateiname} is not a dipole geometry file")
+            (version,) = struct.unpack("<Q", datei.read(8))
+            if version != _Version:
+                raise ValueError(f"{dateiname}: unsupported version {version}")
+            datei.seek(-8, os.SEEK_END)
+            (laenge,) = struct.unpack("<Q", datei.read(8))
+            datei.seek(-8 - laenge, os.SEEK_END)
+            kopf = json.loads(datei.read(laenge))
+        self.anzahl = kopf["Frames"]
+        self.inhalt = set(kopf["Inhalt"])
+        self.parameter = kopf["Parameter"]
+        for p in parameter:
+            gespeichert = self.parameter.get(p["Inhalt"])
+            if gespeichert != json.loads(_Parameter_text(p)):
+                raise ValueError(
+                    f"{dateiname} was computed for other {p['Inhalt']} parameters: "
+                    f"{gespeichert} (expected {json.loads(_Parameter_text(p))})"
+                )
+        self._arrays = {}
+        for name, (start, typ, form) in kopf["Arrays"].items():
+            if np.prod(form) == 0:
+                self._arrays[name] = np.zeros(form, dtype=typ)
+            else:
+                self._arrays[name] = np.memmap(
+                    dateiname, dtype=typ, mode="r", offset=start, shape=tuple(form)
+                )
+
+    def __len__(self):
+        return self.anzahl
+
+    def frame(self, frame):
+        """Geometrie-Dict von ``frame`` (Linien als float32-Ansichten der Datei)."""
+        if not 0 <= frame < self.anzahl:
+            raise IndexError(f"frame {frame} not in file ({self.anzahl} frames)")
+        a = self._arrays
+        geometrie = {}
+        if "Linien" in self.inhalt:
+            erste, letzte = a["Frame_Linien"][frame : frame + 2]
+            offsets = np.asarray(a["Linien_Offsets"][erste : letzte + 1])
+            punkte = a["Punkte"][offsets[0] : offsets[-1]]
+            geometrie["Linien"] = (
+                np.split(punkte, offsets[1:-1] - offsets[0]) if letzte > erste else []
+            )
+        if "Orientierungen" in self.inhalt:
+            erste, letzte = a["Frame_Linien"][frame : frame + 2]
+            geometrie["Orientierungen"] = a["Orientierungen"][erste:letzte].tolist()
+        if "Radien" in self.inhalt:
+            erste, letzte = a["Frame_Radien"][frame : frame + 2]
+            geometrie["Radien"] = a["Radien"][erste:letzte].tolist()
+        return geometrie
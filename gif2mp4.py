@@ -1,35 +1,116 @@
+import argparse
+import multiprocessing
 import os
-from moviepy import VideoFileClip
+import time
 
 
-def convert_gif_to_mp4(gif_path):
+def convert_gif_to_mp4(gif_path, logger="bar"):
+    from moviepy import VideoFileClip  # erst hier laden (langsamer Import)
+
     mp4_path = gif_path.rsplit(".", 1)[0] + ".mp4"
     print(f"Converting: {gif_path} -> {mp4_path}")
+    # Erst unter temporärem Namen schreiben, damit ein abgebrochener Lauf
+    # kein halbes, aber "aktuelles" MP4 hinterlässt
+    tmp_path = mp4_path[: -len(".mp4")] + ".tmp.mp4"
     clip = VideoFileClip(gif_path)
-    clip.write_videofile(
-        mp4_path,
-        fps=clip.fps,  # FPS für die Konvertierung
-        codec="libx264",
-        audio=False,
-        bitrate="1000k",
-        ffmpeg_params=["-crf", "20", "-pix_fmt", "yuv420p"],
+    try:
+        clip.write_videofile(
+            tmp_path,
+            fps=clip.fps,  # FPS für die Konvertierung
+            codec="libx264",
+            audio=False,
+            bitrate="1000k",
+            ffmpeg_params=["-crf", "20", "-pix_fmt", "yuv420p"],
+            logger=logger,
+        )
+    finally:
+        clip.close()
+    os.replace(tmp_path, mp4_path)
+    return mp4_path
+
+
+def is_up_to_date(gif_path):
+    """True, wenn das MP4 zu ``gif_path`` existiert und nicht älter ist."""
+    mp4_path = gif_path.rsplit(".", 1)[0] + ".mp4"
+    return os.path.exists(mp4_path) and os.path.getmtime(mp4_path) >= os.path.getmtime(
+        gif_path
     )
 
 
-def convert_all_gifs_in_dir():
-    current_dir = os.getcwd()
-    gif_files = [f for f in os.listdir(current_dir) if f.lower().endswith(".gif")]
+def find_gifs(root):
+    """Alle .gif-Dateien unterhalb von ``root`` (sortiert)."""
+    gif_files = []
+    for dirpath, _, filenames in os.walk(root):
+        gif_files.extend(
+            os.path.join(dirpath, f) for f in filenames if f.lower().endswith(".gif")
+        )
+    return sorted(gif_files)
+
+
+def _convert_timed(gif_path):
+    start = time.perf_counter()
+    try:
+        mp4_path = convert_gif_to_mp4(gif_path, logger=None)
+        error = None
+    except Exception as e:
+        mp4_path, error = None, str(e)
+    return gif_path, mp4_path, time.perf_counter() - start, error
+
+
+def convert_all_gifs_in_dir(root=None, workers=1, force=False):
+    root = root or os.getcwd()
+    gif_files = find_gifs(root)
 
     if not gif_files:
-        print("No .gif files found in the current directory.")
+        print(f"No .gif files found in {root}.")
         return
 
-    for gif in gif_files:
-        try:
-            convert_gif_to_mp4(gif)
-        except Exception as e:
-            print(f"Failed to convert {gif}: {e}")
+    todo = [gif for gif in gif_files if force or not is_up_to_date(gif)]
+    skipped = len(gif_files) - len(todo)
+
+    start = time.perf_counter()
+    if workers > 1 and len(todo) > 1:
+        with multiprocessing.Pool(min(workers, len(todo))) as pool:
+            results = list(pool.imap_unordered(_convert_timed, todo))
+    else:
+        results = [_convert_timed(gif) for gif in todo]
+    total = time.perf_counter() - start
+
+    # Zusammenfassung
+    print()
+    failed = 0
+    for gif_path, mp4_path, seconds, error in sorted(results):
+        gif_size = os.path.getsize(gif_path) / 1e6
+        if error is None:
+            mp4_size = os.path.getsize(mp4_path) / 1e6
+            print(
+                f"{gif_path}: {seconds:.1f} s, {gif_size:.2f} MB -> {mp4_size:.2f} MB"
+            )
+        else:
+            failed += 1
+            print(f"Failed to convert {gif_path}: {error}")
+    print(
+        f"{len(results) - failed} converted, {failed} failed, "
+        f"{skipped} up to date, {total:.1f} s total"
+    )
 
 
 if __name__ == "__main__":
-    convert_all_gifs_in_dir()
+    parser = argparse.ArgumentParser(
+        description="Convert all GIFs below a directory to MP4."
+    )
+    parser.add_argument(
+        "root", nargs="?", default=None, help="directory (default: current)"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="number of parallel conversions",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="also convert up-to-date files"
+    )
+    args = parser.parse_args()
+    convert_all_gifs_in_dir(args.root, workers=args.jobs, force=args.force)
@@ -0,0 +1,224 @@
+"""Zeiten je Stufe, Zähler und Speicherbedarf eines Laufs (Profil_Flag).
+
+Die Stufen (Nullstellen, Startpunkte, Integration, Poynting-Gitter,
+Artists, Rastern, Screenshot, Kodieren, ...) sind im Code mit
+``with profil.Abschnitt("..."):`` markiert, Mengen (Feldauswertungen,
+Integrationsschritte, Linien) mit ``profil.zaehlen``. Solange ``aktivieren``
+nicht aufgerufen wurde, kostet das nur einen Funktionsaufruf.
+
+``Bericht`` gibt eine Tabelle mit Gesamt- und Frame-Zeiten je Stufe, den
+Zählern und dem maximalen RSS aus, ``Trace_schreiben`` eine JSON-Datei im
+Chrome-Trace-Format (chrome://tracing, https://ui.perfetto.dev). Erfasst wird
+nur der aufrufende Prozess (alle Threads), also mit ``_Prozesse = 1``
+vollständig.
+"""
+
+import bisect
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_Aktiv = False
+_Nullpunkt = time.perf_counter()
+_Ereignisse = []  # Chrome-Trace-Ereignisse ("X": Dauer, "C": Zähler)
+_Zaehler = Counter()
+_Verteilungen = defaultdict(list)  # Name -> Einzelwerte (z. B. Schritte je Linie)
+_Sperre = threading.Lock()
+_Offen = threading.local()  # je Thread die gerade offenen Abschnitte
+_Nichts = contextlib.nullcontext()
+
+
+def aktivieren():
+    """Startet die Aufzeichnung (verwirft eine vorherige)."""
+    global _Aktiv, _Nullpunkt
+    with _Sperre:
+        _Ereignisse.clear()
+        _Zaehler.clear()
+        _Verteilungen.clear()
+        _Nullpunkt = time.perf_counter()
+        _Aktiv = True
+
+
+def deaktivieren():
+    global _Aktiv
+    _Aktiv = False
+
+
+def _Mikrosekunden(zeit):
+    return (zeit - _Nullpunkt) * 1e6
+
+
+@contextlib.contextmanager
+def _Abschnitt(name, argumente):
+    if not hasattr(_Offen, "namen"):
+        _Offen.namen = []
+    offen = _Offen.namen
+    if name in offen:  # verschachtelt in derselben Stufe: nur außen zählen
+        yield
+        return
+    offen.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        ende = time.perf_counter()
+        offen.pop()
+        ereignis = dict(
+            name=name,
+            ph="X",
+            ts=_Mikrosekunden(start),
+            dur=(ende - start) * 1e6,
+            pid=os.getpid(),
+            tid=threading.get_ident(),
+        )
+        if argumente:
+            ereignis["args"] = argumente
+        _Ereignisse.append(ereignis)
+
+
+def Abschnitt(name, **argumente):
+    """Kontextmanager, der die Zeit von Stufe ``name`` misst (nur wenn aktiv).
+    ``argumente`` (z. B. ``frame=3``) erscheinen im Trace."""
+    if not _Aktiv:
+        return _Nichts
+    return _Abschnitt(name, argumente)
+
+
+def zaehlen(name, anzahl=1):
+    """Erhöht den Zähler ``name`` um ``anzahl`` (nur wenn aktiv)."""
+    if _Aktiv:
+        with _Sperre:
+            _Zaehler[name] += int(anzahl)
+
+
+def verteilen(name, werte):
+    """Merkt sich Einzelwerte (für Mittel und Maximum im Bericht)."""
+    if _Aktiv:
+        with _Sperre:
+            _Verteilungen[name].extend(int(w) for w in werte)
+
+
+def Speicher_max():
+    """Maximaler RSS des Prozesses in MB (None, wenn nicht verfügbar)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KiB, macOS: Bytes
+    return rss / (2**20 if os.uname().sysname == "Darwin" else 2**10)
+
+
+def Speicher_notieren():
+    """Trägt den aktuellen maximalen RSS als Zählerverlauf in den Trace ein."""
+    rss = Speicher_max()
+    if _Aktiv and rss is not None:
+        _Ereignisse.append(
+            dict(
+                name="Peak RSS (MB)",
+                ph="C",
+                ts=_Mikrosekunden(time.perf_counter()),
+                pid=os.getpid(),
+                args={"MB": round(rss, 1)},
+            )
+        )
+
+
+def _in_Frames(ereignisse):
+    """Dauer (ms) je Stufe, die innerhalb eines "frame"-Abschnitts desselben
+    Threads lag."""
+    frames = defaultdict(list)  # (pid, tid) -> [(Anfang, Ende), ...]
+    for e in ereignisse:
+        if e["name"] == "frame":
+            frames[e["pid"], e["tid"]].append((e["ts"], e["ts"] + e["dur"]))
+    for intervalle in frames.values():
+        intervalle.sort()
+    innen = defaultdict(float)
+    for e in ereignisse:
+        intervalle = frames.get((e["pid"], e["tid"]))
+        if not intervalle:
+            continue
+        i = bisect.bisect_right(intervalle, (e["ts"], float("inf"))) - 1
+        if i >= 0 and e["ts"] + e["dur"] <= intervalle[i][1]:
+            innen[e["name"]] += e["dur"] / 1e3
+    return innen
+
+
+def Bericht():
+    """Gibt Zeiten je Stufe, Zähler und maximalen RSS als Tabelle aus.
+
+    ``ms/frame`` zählt nur die Zeit innerhalb von "frame"-Abschnitten (im
+    selben Thread); Stufen außerhalb, z. B. die Geometrie vorab oder das
+    Kodieren, zeigen dort "-".
+    """
+    ereignisse = [e for e in list(_Ereignisse) if e["ph"] == "X"]
+    dauern = defaultdict(list)
+    for ereignis in ereignisse:
+        dauern[ereignis["name"]].append(ereignis["dur"] / 1e3)
+    frames = len(dauern.get("frame", ())) or None
+    innen = _in_Frames(ereignisse)
+    print(
+        f"\n{'stage':20s} {'calls':>7s} {'total s':>9s} {'ms/frame':>9s} "
+        f"{'mean ms':>9s} {'max ms':>9s}"
+    )
+    for name, ms in sorted(dauern.items(), key=lambda e: -sum(e[1])):
+        if frames and name in innen:
+            je_frame = f"{innen[name] / frames:9.2f}"
+        else:
+            je_frame = f"{'-':>9s}"
+        print(
+            f"{name:20s} {len(ms):7d} {sum(ms) / 1e3:9.2f} {je_frame} "
+            f"{sum(ms) / len(ms):9.2f} {max(ms):9.2f}"
+        )
+    for name, anzahl in sorted(_Zaehler.items()):
+        zeile = f"{name}: {anzahl}"
+        if frames:
+            zeile += f" ({anzahl / frames:.0f} per frame)"
+        print(zeile)
+    for name, werte in sorted(_Verteilungen.items()):
+        if werte:
+            print(
+                f"{name}: mean {sum(werte) / len(werte):.0f}, max {max(werte)} "
+                f"({len(werte)} values)"
+            )
+    rss = Speicher_max()
+    if rss is not None:
+        print(f"Peak RSS: {rss:.0f} MB")
+
+
+def Trace_schreiben(dateiname):
+    """Schreibt die Aufzeichnung im Chrome-Trace-Format nach ``dateiname``."""
+    Speicher_notieren()
+    namen = {threading.get_ident(): threading.current_thread().name}
+    namen.update((t.ident, t.name) for t in threading.enumerate())
+    metadaten = [
+        dict(name="thread_name", ph="M", pid=os.getpid(), tid=tid, args={"name": n})
+        for tid, n in namen.items()
+    ]
+    with open(dateiname, "w", encoding="utf-8") as datei:
+        json.dump(
+            {
+                "traceEvents": metadaten + list(_Ereignisse),
+                "displayTimeUnit": "ms",
+                "otherData": {
+                    "Zaehler": dict(_Zaehler),
+                    "Peak RSS (MB)": Speicher_max(),
+                },
+            },
+            datei,
+        )
+    print(f"Trace written to {dateiname}")
+
+
+def Abschluss(dateiname):
+    """Gibt den Bericht aus, schreibt den Trace nach ``dateiname`` und beendet
+    die Aufzeichnung."""
+    Bericht()
+    Trace_schreiben(dateiname)
+    deaktivieren()
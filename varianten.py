@@ -0,0 +1,268 @@
+"""Viele Varianten der Animationsskripte in einem Prozess rendern.
+
+Die Skripte werden über Konstanten am Dateianfang konfiguriert
+(``_Groessenfaktor``, ``Hertzdipol``, ``_dpi``, Farben, ...). Ein
+``Parameter``-Objekt beschreibt eine Variante: Skript, Name und die
+Konstanten, die anders sein sollen. ``Varianten_rendern`` führt das Skript
+dafür im selben Prozess aus, als wären nur diese Zuweisungen in der Datei
+geändert; abgeleitete Werte (``_dt``, ``_Lamda_viertel``, ...) folgen daraus
+wie bei einem normalen Lauf.
+
+Zwischen den Varianten bleiben Importe (NumPy, Matplotlib, PyVista), die
+Nullstellentabelle und die berechnete Geometrie erhalten: Der Geometrie-Cache
+hält seine Einträge zusätzlich im Arbeitsspeicher, Varianten mit denselben
+physikalischen Parametern (nur andere Farben, Titel, ``_dpi``, Kamera oder
+Ausgabeformat) integrieren die Feldlinien also nur einmal.
+
+Aufruf: ``python varianten.py varianten.json``, die Datei enthält eine Liste
+von Einträgen ``{"Skript": ..., "Name": ..., "Werte": {...}}``; mit
+``"Raster": {"_Groessenfaktor": [1, 2], ...}`` statt (oder zusätzlich zu)
+``"Werte"`` entsteht eine Variante je Kombination.
+"""
+
+import argparse
+import ast
+import itertools
+import json
+import os
+import sys
+import time
+import types
+
+import geometriecache
+
+_Speicher_max = 2**30  # Geometrie im Arbeitsspeicher während eines Sweeps (Bytes)
+
+
+def Konstanten(skript):
+    """Die über ``Parameter`` änderbaren Konstanten von ``skript``.
+
+    Das sind die Zuweisungen an einen einzelnen Namen auf oberster Ebene
+    (auch in ``if``-Blöcken) vor der ersten Funktionsdefinition, deren Wert
+    kein Funktionsaufruf ist. Gibt ``{Name: Quelltext des Werts}`` zurück.
+    """
+    with open(skript, encoding="utf-8") as datei:
+        quelltext = datei.read()
+    return {
+        knoten.targets[0].id: ast.get_source_segment(quelltext, knoten.value)
+        for knoten in _Zuweisungen(ast.parse(quelltext))
+    }
+
+
+def _Zuweisungen(modul):
+    """Zuweisungen im Konfigurationsteil (siehe ``Konstanten``)."""
+    zuweisungen = []
+    stapel = list(reversed(modul.body))
+    while stapel:
+        knoten = stapel.pop()
+        if isinstance(knoten, (ast.FunctionDef, ast.ClassDef)):
+            break
+        if isinstance(knoten, ast.If):
+            stapel.extend(reversed(knoten.body + knoten.orelse))
+        elif (
+            isinstance(knoten, ast.Assign)
+            and len(knoten.targets) == 1
+            and isinstance(knoten.targets[0], ast.Name)
+            and not isinstance(knoten.value, ast.Call)
+        ):
+            zuweisungen.append(knoten)
+    return zuweisungen
+
+
+def _Namensteil(werte):
+    return "".join(f"_{name.strip('_')}-{wert}" for name, wert in werte.items())
+
+
+class Parameter:
+    """Eine Variante: ``skript`` mit geänderten Konstanten ``werte``.
+
+    ``name`` wird, falls ``_Ausgabename`` nicht selbst gesetzt ist, auch
+    der Name der Ausgabedatei; ohne ``name`` wird er aus dem Skriptnamen und
+    den Werten gebildet.
+    """
+
+    def __init__(self, skript, name=None, **werte):
+        self.skript = skript
+        self.werte = werte
+        if name is None:
+            name = os.path.splitext(os.path.basename(skript))[0] + _Namensteil(werte)
+        self.name = "".join(z if z.isalnum() or z in "-_." else "-" for z in name)
+
+    def mit(self, name=None, **werte):
+        """Neue Variante mit zusätzlich (oder anders) gesetzten ``werte``; der
+        Name bekommt diese Werte angehängt, wenn ``name`` fehlt."""
+        if name is None:
+            name = self.name + _Namensteil(werte)
+        return Parameter(self.skript, name, **dict(self.werte, **werte))
+
+    def raster(self, **listen):
+        """Eine Variante je Kombination der Werte in ``listen``
+        (z. B. ``_Groessenfaktor=[1, 2], _dpi=[100, 300]``)."""
+        namen = list(listen)
+        return [
+            self.mit(**dict(zip(namen, kombination)))
+            for kombination in itertools.product(*listen.values())
+        ]
+
+    def __repr__(self):
+        werte = "".join(f", {k}={v!r}" for k, v in self.werte.items())
+        return f"Parameter({self.skript!r}, name={self.name!r}{werte})"
+
+
+def _Ausgabeteil(knoten):
+    """True für die erste Anweisung nach dem Aufbau eines Skripts
+    (``if Geometrie_Stufe == "berechnen":``, danach wird nur noch ausgegeben)."""
+    return isinstance(knoten, ast.If) and any(
+        isinstance(n, ast.Name) and n.id == "Geometrie_Stufe"
+        for n in ast.walk(knoten.test)
+    )
+
+
+def _Hauptteil(knoten):
+    """True für ``if __name__ == "__main__":``."""
+    return (
+        isinstance(knoten, ast.If)
+        and isinstance(knoten.test, ast.Compare)
+        and isinstance(knoten.test.left, ast.Name)
+        and knoten.test.left.id == "__name__"
+    )
+
+
+def _Programm(parameter, nur_Aufbau=False):
+    """Übersetzt das Skript; die Konstanten aus ``parameter.werte`` lesen ihren
+    Wert aus ``__Parameter__`` statt aus der Datei. Mit ``nur_Aufbau`` endet
+    es vor dem Ausgabeteil (auch innerhalb von ``if __name__ == ...``)."""
+    with open(parameter.skript, encoding="utf-8") as datei:
+        modul = ast.parse(datei.read(), parameter.skript)
+    if nur_Aufbau:
+        modul.body = [
+            anweisung
+            for knoten in modul.body
+            for anweisung in (knoten.body if _Hauptteil(knoten) else [knoten])
+        ]
+        ende = next(
+            (i for i, knoten in enumerate(modul.body) if _Ausgabeteil(knoten)),
+            len(modul.body),
+        )
+        modul.body = modul.body[:ende]
+    werte = dict(parameter.werte)
+    werte.setdefault("_Ausgabename", parameter.name)
+    gefunden = set()
+    for knoten in _Zuweisungen(modul):
+        name = knoten.targets[0].id
+        if name in werte:
+            knoten.value = ast.copy_location(
+                ast.Subscript(
+                    value=ast.Name("__Parameter__", ast.Load()),
+                    slice=ast.Constant(name),
+                    ctx=ast.Load(),
+                ),
+                knoten.value,
+            )
+            gefunden.add(name)
+    unbekannt = sorted(set(parameter.werte) - gefunden)
+    if unbekannt:
+        raise ValueError(
+            f"Unbekannte Konstante(n) {', '.join(unbekannt)} in {parameter.skript}."
+        )
+    ast.fix_missing_locations(modul)
+    return compile(modul, parameter.skript, "exec"), werte
+
+
+def _Ausfuehren(parameter, nur_Aufbau=False):
+    """Führt das Skript als ``__main__`` aus (wie mit ``python skript.py``),
+    damit die per ``fork`` gestarteten Render-Prozesse seine Funktionen
+    finden. Gibt das Modul zurück."""
+    programm, werte = _Programm(parameter, nur_Aufbau)
+    modul = types.ModuleType("__main__")
+    modul.__file__ = os.path.abspath(parameter.skript)
+    modul.__Parameter__ = werte
+    hauptmodul = sys.modules["__main__"]
+    sys.modules["__main__"] = modul
+    try:
+        exec(programm, modul.__dict__)
+    except SystemExit as ende:
+        if ende.code not in (None, 0):
+            raise
+    finally:
+        sys.modules["__main__"] = hauptmodul
+    return modul
+
+
+def Skript_laden(parameter):
+    """Führt nur den Aufbau des Skripts aus (Konstanten, Funktionen, Figur
+    bzw. Szene), nicht die Ausgabe, und gibt das Modul zurück; danach lassen
+    sich z. B. ``update(frame)`` oder ``Frame_rendern(frame)`` einzeln
+    aufrufen."""
+    return _Ausfuehren(parameter, nur_Aufbau=True)
+
+
+def Variante_rendern(parameter):
+    """Führt das Skript mit den Werten von ``parameter`` aus (im aktuellen
+    Prozess und Arbeitsverzeichnis) und gibt die Laufzeit in Sekunden zurück."""
+    start = time.perf_counter()
+    try:
+        _Ausfuehren(parameter)
+    finally:
+        if "matplotlib.pyplot" in sys.modules:
+            sys.modules["matplotlib.pyplot"].close("all")
+    return time.perf_counter() - start
+
+
+def Varianten_rendern(varianten, Speicher_max=_Speicher_max):
+    """Rendert alle ``varianten`` (Folge von ``Parameter``) nacheinander.
+
+    Die Geometrie bleibt dabei bis zu ``Speicher_max`` Bytes im
+    Arbeitsspeicher. Gibt ``[(Name, Sekunden), ...]`` zurück.
+    """
+    for parameter in varianten:  # Tippfehler melden, bevor etwas gerechnet wird
+        _Programm(parameter)
+    zeiten = []
+    geometriecache.Speicher_begrenzen(Speicher_max)
+    try:
+        for nummer, parameter in enumerate(varianten, 1):
+            print(f"\n=== Variant {nummer}/{len(varianten)}: {parameter.name}")
+            zeiten.append((parameter.name, Variante_rendern(parameter)))
+    finally:
+        geometriecache.Speicher_begrenzen(0)
+    print()
+    for name, sekunden in zeiten:
+        print(f"{name}: {sekunden:.1f} s")
+    print(f"{len(zeiten)} variants, {sum(s for _, s in zeiten):.1f} s total")
+    return zeiten
+
+
+def Varianten_laden(dateiname):
+    """Liest eine Variantenliste im JSON-Format (siehe Moduldokumentation)."""
+    with open(dateiname, encoding="utf-8") as datei:
+        eintraege = json.load(datei)
+    varianten = []
+    for eintrag in eintraege:
+        basis = Parameter(
+            eintrag["Skript"], eintrag.get("Name"), **eintrag.get("Werte", {})
+        )
+        if "Raster" in eintrag:
+            varianten.extend(basis.raster(**eintrag["Raster"]))
+        else:
+            varianten.append(basis)
+    return varianten
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Render many variants of the animation scripts in one process."
+    )
+    parser.add_argument("datei", nargs="?", help="JSON file with the variants")
+    parser.add_argument(
+        "--konstanten",
+        metavar="SKRIPT",
+        help="list the constants of SKRIPT that a variant can change",
+    )
+    args = parser.parse_args()
+    if args.konstanten:
+        for name, wert in Konstanten(args.konstanten).items():
+            print(f"{name} = {wert}")
+    elif args.datei:
+        Varianten_rendern(Varianten_laden(args.datei))
+    else:
+        parser.error("a JSON file with variants (or --konstanten SKRIPT) is required")